@@ -0,0 +1,242 @@
+import numpy as np
+import pandas as pd
+from config import ALL_CATEGORIES, LINEUP_SLOTS
+from utils.league_context import LeagueContext
+from utils.instrumentation import timed
+from analysis.valuation import ranking_scores
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # scipy is optional; fall back to the bundled Hungarian solver
+    linear_sum_assignment = None
+
+# Injury statuses that keep a player out of the lineup
+UNAVAILABLE_STATUSES = ['OUT', 'TEN_DAY_DL', 'FIFTEEN_DAY_DL', 'SIXTY_DAY_DL', 'SEVEN_DAY_DL', 'SUSPENSION']
+
+
+def hungarian(cost):
+    """Minimum-cost assignment of rows to columns for a square cost matrix
+
+    Shortest augmenting path with row/column potentials (O(n^3)), with the
+    inner scan over columns vectorized. Returns the column assigned to each row.
+    """
+    n = cost.shape[0]
+    u = np.zeros(n + 1)
+    v = np.zeros(n + 1)
+    match = np.zeros(n + 1, dtype=np.int64)  # match[column] = row, 1-based; 0 = free
+    padded = np.zeros((n + 1, n + 1))
+    padded[1:, 1:] = cost
+    for row in range(1, n + 1):
+        match[0] = row
+        column = 0
+        min_slack = np.full(n + 1, np.inf)
+        previous = np.zeros(n + 1, dtype=np.int64)
+        used = np.zeros(n + 1, dtype=bool)
+        while True:
+            used[column] = True
+            current_row = match[column]
+            slack = padded[current_row] - u[current_row] - v
+            free = ~used
+            better = free & (slack < min_slack)
+            min_slack[better] = slack[better]
+            previous[better] = column
+            candidates = np.where(free, min_slack, np.inf)
+            candidates[0] = np.inf
+            next_column = int(np.argmin(candidates))
+            delta = candidates[next_column]
+            u[match[used]] += delta
+            v[used] -= delta
+            min_slack[free] -= delta
+            column = next_column
+            if match[column] == 0:
+                break
+        while column:
+            prior = previous[column]
+            match[column] = match[prior]
+            column = prior
+    assignment = np.empty(n, dtype=np.int64)
+    assignment[match[1:] - 1] = np.arange(n)
+    return assignment
+
+
+def solve_assignment(cost):
+    """Row -> column assignment for a square cost matrix (scipy when installed)"""
+    if linear_sum_assignment is not None:
+        rows, columns = linear_sum_assignment(cost)
+        assignment = np.empty(len(rows), dtype=np.int64)
+        assignment[rows] = columns
+        return assignment
+    return hungarian(cost)
+
+
+def slot_list(slots=LINEUP_SLOTS):
+    """Expand {'OF': 3, ...} into one entry per lineup slot"""
+    return [slot for slot, count in slots.items() for _ in range(count)]
+
+
+def optimize_lineup(values, eligibility, slots):
+    """Assign players to lineup slots to maximize the total value started
+
+    `values` is one number per player, `eligibility` a (players x slots) bool
+    matrix and `slots` the expanded slot list. Filling a slot always beats
+    leaving it empty; among full lineups the highest total value wins.
+    Returns the player index per slot (-1 = empty).
+    """
+    values = np.asarray(values, dtype=float)
+    eligibility = np.asarray(eligibility, dtype=bool)
+    players, slot_count = eligibility.shape
+    size = max(players, slot_count)
+    if size == 0:
+        return np.empty(0, dtype=np.int64)
+    # Bonus large enough that an extra filled slot outweighs any value difference
+    fill_bonus = np.abs(values).sum() + 1.0
+    forbidden = fill_bonus * (size + 1) * 4
+    cost = np.zeros((size, size))
+    # Rows beyond `players` are empty-slot placeholders; columns beyond
+    # `slot_count` are bench spots. Both cost nothing.
+    cost[:players, :slot_count] = np.where(eligibility, -(values[:, None] + fill_bonus), forbidden)
+    assignment = solve_assignment(cost)
+
+    lineup = np.full(slot_count, -1, dtype=np.int64)
+    for player, slot in enumerate(assignment[:players]):
+        if slot < slot_count and eligibility[player, slot]:
+            lineup[slot] = player
+    return lineup
+
+
+def eligibility_matrix(players, slots, available=None):
+    """(players x slots) matrix of who may fill each slot"""
+    matrix = np.zeros((len(players), len(slots)), dtype=bool)
+    for i, player in enumerate(players):
+        if available is not None and not available[i]:
+            continue
+        eligible = set(getattr(player, 'eligibleSlots', None) or [])
+        matrix[i] = [slot in eligible for slot in slots]
+    return matrix
+
+
+def table_eligibility(table, slots):
+    """(rows x slots) matrix of who may fill each slot, from a player table's eligibleSlots
+
+    Players on IL or ruled out fill nothing, as in player_availability().
+    """
+    codes, names = pd.factorize(table['eligibleSlots'].astype(object))
+    by_code = np.array([[slot in set(slots_text.split(',')) for slot in slots] for slots_text in names]
+                       + [[False] * len(slots)], dtype=bool).reshape(-1, len(slots))
+    matrix = by_code[codes]  # code -1 (missing) picks the all-False last row
+    available = ((table['lineupSlot'].astype(object) != 'IL').to_numpy()
+                 & ~table['injuryStatus'].astype(object).isin(UNAVAILABLE_STATUSES).to_numpy())
+    return matrix & available[:, None]
+
+
+def filled_slots(eligibility, slots):
+    """How many lineup slots a roster can fill at once
+
+    The number of slots optimize_lineup() fills for the same eligibility,
+    since filling a slot always beats leaving it empty there, found as a
+    maximum matching by augmenting paths. That takes microseconds on a
+    roster instead of a full assignment solve, so callers can test many
+    hypothetical rosters.
+    """
+    eligibility = np.asarray(eligibility, dtype=bool).reshape(-1, len(slots))
+    options = [np.flatnonzero(row).tolist() for row in eligibility]
+    holder = [-1] * len(slots)  # player filling each slot
+
+    def place(player, visited):
+        for slot in options[player]:
+            if slot in visited:
+                continue
+            visited.add(slot)
+            if holder[slot] < 0 or place(holder[slot], visited):
+                holder[slot] = player
+                return True
+        return False
+
+    return sum(place(player, set()) for player in range(len(options)) if options[player])
+
+
+def player_availability(players):
+    """Players healthy enough to start (not on IL or ruled out)"""
+    return np.array([getattr(player, 'lineupSlot', None) != 'IL'
+                     and getattr(player, 'injuryStatus', 'ACTIVE') not in UNAVAILABLE_STATUSES
+                     for player in players])
+
+
+def roster_values(context, team):
+    """Projected value per roster player from the ranking scores (0 without stats)"""
+    table = context.team_table(team)
+    scores = ranking_scores(context)
+    by_id = dict(zip(table['id'].to_numpy(), scores.loc[table.index, 'value'].to_numpy()))
+    return np.array([by_id.get(getattr(player, 'playerId', None), 0.0) for player in team.roster])
+
+
+@timed()
+def optimize_week(players, day_values, slots, available=None):
+    """Solve the lineup for every day; `day_values` is (days x players), NaN = not playing
+
+    Returns one lineup (player index per slot) per day.
+    """
+    day_values = np.atleast_2d(np.asarray(day_values, dtype=float))
+    base = eligibility_matrix(players, slots, available)
+    lineups = []
+    for values in day_values:
+        playing = ~np.isnan(values)
+        lineups.append(optimize_lineup(np.nan_to_num(values), base & playing[:, None], slots))
+    return np.array(lineups).reshape(len(day_values), len(slots))
+
+
+def optimal_lineup(league, my_team, context=None, slots=LINEUP_SLOTS, day_values=None):
+    """Print and return the best lineup for my roster
+
+    Player value is the summed category z-score the waiver/trade rankers use.
+    `day_values` (days x roster players, NaN when a player has no game) lets a
+    caller with daily projections solve several days at once; without them
+    there is one lineup, since every day would be the same.
+    """
+    print("\n--- OPTIMAL LINEUP ---")
+    if context is None:
+        context = LeagueContext(league, ALL_CATEGORIES)
+    players = list(my_team.roster)
+    slot_names = slot_list(slots)
+    values = roster_values(context, my_team)
+    if day_values is None:
+        day_values = values[None, :]
+    available = player_availability(players)
+    lineups = optimize_week(players, day_values, slot_names, available)
+
+    current = sum(values[i] for i, player in enumerate(players)
+                  if getattr(player, 'lineupSlot', 'BE') not in ('BE', 'IL'))
+    results = []
+    for day, lineup in enumerate(lineups):
+        rows = []
+        for slot, player_index in zip(slot_names, lineup):
+            player = players[player_index] if player_index >= 0 else None
+            rows.append({
+                'day': day,
+                'slot': slot,
+                'id': getattr(player, 'playerId', None),
+                'name': getattr(player, 'name', None),
+                'current_slot': getattr(player, 'lineupSlot', None),
+                'value': float(day_values[day][player_index]) if player_index >= 0 else 0.0,
+            })
+        results.extend(rows)
+        if day == 0 or len(lineups) > 1:
+            total = sum(row['value'] for row in rows)
+            print(f"\n{'Day ' + str(day + 1) + ' lineup' if len(lineups) > 1 else 'Lineup'} "
+                  f"(value {total:.2f}, current lineup {current:.2f}):")
+            for row in rows:
+                moved = "" if row['current_slot'] == row['slot'] else f"  (now {row['current_slot']})"
+                print(f"  {row['slot']:<5} {row['name'] or '-- empty --'}{moved if row['name'] else ''}")
+
+    started = set(lineups[0][lineups[0] >= 0].tolist()) if len(lineups) else set()
+    bench = [players[i].name for i in range(len(players)) if i not in started]
+    if bench:
+        print("Bench:", ', '.join(bench))
+    return {
+        'team_id': my_team.team_id,
+        'team_name': my_team.team_name,
+        'current_value': float(current),
+        'lineup': results,
+        'bench': bench,
+    }
+
@@ -0,0 +1,54 @@
+import numpy as np
+from config import ALL_CATEGORIES, FREE_AGENT_POOL_SIZE
+from utils.league_context import LeagueContext
+from utils.instrumentation import timed
+
+# Columns reported for every match, before the categories
+SEARCH_COLUMNS = ['id', 'name', 'position', 'team', 'injuryStatus', 'fantasy_team', 'free_agent']
+
+
+@timed()
+def player_search(league, my_team, context=None, name=None, position=None, pro_team=None, owner=None,
+                  injury_status=None, healthy=None, free_agents=None, mine=False, minimum=None,
+                  maximum=None, limit=25):
+    """Print and return players matching a query against the league player index
+
+    `name` is a prefix (or, when nothing starts with it, fuzzy) match on any
+    part of the name and orders the results by closeness; otherwise players
+    are listed in table order. `free_agents` True/False keeps only free
+    agents / rostered players (the free-agent pool is fetched when it may be
+    needed) and `mine` only my roster. Returns {'query', 'total', 'players'}.
+    """
+    print("\n--- PLAYER SEARCH ---")
+    if context is None:
+        context = LeagueContext(league, ALL_CATEGORIES)
+    if free_agents is not False and not mine:
+        context.free_agents(FREE_AGENT_POOL_SIZE)
+    index = context.player_index()
+    table = context.player_table()
+
+    rows = index.find(position=position, team=pro_team, owner=owner, injury_status=injury_status,
+                      healthy=healthy, free_agent=free_agents,
+                      fantasy_team_id=my_team.team_id if mine else None,
+                      minimum=minimum, maximum=maximum)
+    if name:
+        ranked = index.search(name, limit=None)
+        rows = ranked[np.isin(ranked, rows)]
+    query = {key: value for key, value in (
+        ('name', name), ('position', position), ('pro_team', pro_team), ('owner', owner),
+        ('injury_status', injury_status), ('healthy', healthy), ('free_agents', free_agents),
+        ('mine', mine or None), ('minimum', minimum), ('maximum', maximum)) if value is not None}
+
+    print(f"{len(rows)} player(s) match {query or 'everything'}")
+    matches = table.iloc[rows[:limit]]
+    categories = [cat for cat in ALL_CATEGORIES if cat in table.columns]
+    players = []
+    for player in matches[SEARCH_COLUMNS + categories].to_dict('records'):
+        where = 'Free agent' if player['free_agent'] else player['fantasy_team']
+        injury = player['injuryStatus']
+        status = f" [{injury}]" if isinstance(injury, str) and injury != 'ACTIVE' else ""
+        print(f"- {player['name']} ({player['position']}, {player['team']}) #{player['id']}: {where}{status}")
+        players.append(player)
+    if len(rows) > limit:
+        print(f"... {len(rows) - limit} more")
+    return {'query': query, 'total': int(len(rows)), 'players': players}
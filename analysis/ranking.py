@@ -0,0 +1,66 @@
+import numpy as np
+from utils.scoring import ScoringSpec
+from utils.instrumentation import timed
+
+
+def ranking_keys(values, categories, bounds=True, worst=False, scores=None, spec=None):
+    """Sort keys for a (players x categories) matrix: smaller key = better rank
+
+    Values that are missing or fail the spec's sanity bounds get +inf so they
+    never rank. When `scores` (higher = better, e.g. z-scores) is given,
+    players are ordered by it instead of the raw values. With `worst=True` the
+    direction is flipped (weakest players first). `spec` is the league's
+    ScoringSpec (the built-in STAT_SPECS when None).
+    """
+    if spec is None:
+        spec = ScoringSpec(categories)
+    valid = spec.valid(values, categories) if bounds else np.isfinite(values)
+    if scores is not None:
+        ordered, sign = scores, np.full(len(categories), -1.0)
+    else:
+        ordered = values
+        sign = -spec.sign[spec.columns(categories)]
+    if worst:
+        sign = -sign
+    return np.where(valid, ordered * sign, np.inf)
+
+
+@timed()
+def rank_category_leaders(df, categories, k, bounds=True, worst=False, scores=None, spec=None):
+    """Top-k row positions of `df` for every category in one batched call
+
+    Uses argpartition-style selection over the whole (players x categories)
+    matrix, then sorts only the k survivors per category. Ties are broken by
+    row order. Returns {category: np.ndarray of iloc positions, best first};
+    categories missing from `df` are left out. `scores` is an optional
+    DataFrame aligned with `df` (e.g. from analysis.valuation) to rank by and
+    `spec` the league's ScoringSpec.
+    """
+    categories = [cat for cat in categories if cat in df.columns
+                  and (scores is None or cat in scores.columns)]
+    leaders = {}
+    if not categories:
+        return leaders
+    if df.empty or k <= 0:
+        return {cat: np.empty(0, dtype=np.int64) for cat in categories}
+
+    values = df[categories].to_numpy(dtype=float, na_value=np.nan)
+    score_values = None
+    if scores is not None:
+        score_values = scores.loc[df.index, categories].to_numpy(dtype=float)
+    keys = ranking_keys(values, categories, bounds=bounds, worst=worst, scores=score_values, spec=spec)
+
+    n = len(keys)
+    if n > k:
+        # k-th best key per category; everything at or below it is a candidate
+        threshold = np.partition(keys, k - 1, axis=0)[k - 1]
+        candidates = keys <= threshold
+    else:
+        candidates = np.ones_like(keys, dtype=bool)
+    candidates &= np.isfinite(keys)
+
+    for j, cat in enumerate(categories):
+        rows = np.flatnonzero(candidates[:, j])
+        order = np.lexsort((rows, keys[rows, j]))
+        leaders[cat] = rows[order[:k]]
+    return leaders
@@ -0,0 +1,322 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from config import (ALL_CATEGORIES, SIMULATIONS, SIM_PROCESSES, SIM_REGULAR_SEASON_WEEKS,
+                    SIM_PLAYOFF_TEAMS)
+from utils.league_context import LeagueContext
+from utils.scoring import RATE_VOLUME
+from utils.instrumentation import timed
+from analysis.trade_engine import player_contributions
+
+# How each rate stat's weekly value is sampled given its sampled volume:
+# ('binomial', scale) draws successes per unit of volume (hits per AB),
+# ('poisson', scale) draws events at rate/scale per unit (earned runs = ERA/9 per IP)
+RATE_MODELS = {
+    'AVG': ('binomial', 1.0),
+    'OBP': ('binomial', 1.0),
+    'ERA': ('poisson', 9.0),
+    'WHIP': ('poisson', 1.0),
+    'K/9': ('poisson', 9.0),
+}
+
+# Simulated seasons per batch; bounds memory at roughly batch * weeks * teams * categories floats
+BATCH_SIZE = 1000
+
+# Expected counts at or above this are drawn from the normal approximation,
+# which is several times cheaper than exact Poisson/binomial sampling
+NORMAL_APPROXIMATION = 15.0
+
+
+def weekly_rates(table, categories, weeks_played, rate_volume=RATE_VOLUME):
+    """Per-team expected weekly numerators and volumes from active players
+
+    Returns (team_ids, numerators, volumes, is_rate) where numerators and
+    volumes are (teams x categories). Counting stats only use numerators;
+    rate stats carry rate * volume over volume, as in the trade engine.
+    """
+    active = table[table['rostered'] & ~table['lineupSlot'].isin(['BE', 'IL'])]
+    num, den, is_rate = player_contributions(active, categories, rate_volume)
+    team_ids = active['fantasy_team_id'].to_numpy()
+    unique_ids = np.unique(team_ids)
+    position = np.searchsorted(unique_ids, team_ids)
+    team_num = np.zeros((len(unique_ids), len(categories)))
+    team_den = np.zeros((len(unique_ids), len(categories)))
+    np.add.at(team_num, position, num)
+    np.add.at(team_den, position, den)
+    weeks = max(float(weeks_played), 1.0)
+    return unique_ids, team_num / weeks, team_den / weeks, is_rate
+
+
+def round_robin(team_count, weeks):
+    """Opponent index per (week, team) for a repeating round-robin schedule (-1 = bye)"""
+    slots = list(range(team_count)) + ([-1] if team_count % 2 else [])
+    n = len(slots)
+    rounds = []
+    for r in range(n - 1):
+        opponents = [-1] * team_count
+        for i in range(n // 2):
+            a, b = slots[i], slots[n - 1 - i]
+            if a >= 0 and b >= 0:
+                opponents[a], opponents[b] = b, a
+        rounds.append(opponents)
+        slots = [slots[0]] + [slots[-1]] + slots[1:-1]
+    return np.array([rounds[w % len(rounds)] for w in range(weeks)], dtype=np.int64).reshape(weeks, team_count)
+
+
+def remaining_schedule(league, team_ids, weeks_left):
+    """Opponent indices for the rest of the regular season
+
+    Uses each team's espn_api schedule (Matchup objects) when available and
+    falls back to a round robin otherwise.
+    """
+    index_of = {team_id: i for i, team_id in enumerate(team_ids)}
+    start = max(getattr(league, 'currentMatchupPeriod', 1) or 1, 1) - 1
+    schedule = np.full((weeks_left, len(team_ids)), -1, dtype=np.int64)
+    found = False
+    for team in league.teams:
+        if team.team_id not in index_of:
+            continue
+        matchups = (getattr(team, 'schedule', None) or [])[start:start + weeks_left]
+        for week, matchup in enumerate(matchups):
+            home = getattr(getattr(matchup, 'home_team', None), 'team_id', getattr(matchup, 'home_team', None))
+            away = getattr(getattr(matchup, 'away_team', None), 'team_id', getattr(matchup, 'away_team', None))
+            opponent = away if home == team.team_id else home
+            if opponent in index_of:
+                schedule[week, index_of[team.team_id]] = index_of[opponent]
+                found = True
+    if not found:
+        return round_robin(len(team_ids), weeks_left)
+    return schedule
+
+
+def poisson(rng, lam, shape):
+    """Poisson draws of shape `shape` with per-team means `lam` (last axis)"""
+    lam = np.asarray(lam, dtype=float)
+    large = lam >= NORMAL_APPROXIMATION
+    if not large.any():
+        return rng.poisson(lam, size=shape).astype(float)
+    draws = np.empty(shape)
+    draws[..., large] = np.maximum(np.rint(lam[large] + np.sqrt(lam[large]) * rng.standard_normal(
+        shape[:-1] + (int(large.sum()),))), 0)
+    if not large.all():
+        draws[..., ~large] = rng.poisson(lam[~large], size=shape[:-1] + (int((~large).sum()),))
+    return draws
+
+
+def binomial(rng, trials, p, expected_trials):
+    """Binomial draws for sampled `trials`; normal approximation where the expected variance is large"""
+    large = expected_trials * p * (1 - p) >= NORMAL_APPROXIMATION
+    draws = np.empty(trials.shape)
+    if large.any():
+        n = trials[..., large]
+        spread = np.sqrt(n * p[large] * (1 - p[large]))
+        draws[..., large] = np.clip(np.rint(n * p[large] + spread * rng.standard_normal(n.shape)), 0, n)
+    if not large.all():
+        draws[..., ~large] = rng.binomial(trials[..., ~large].astype(np.int64), p[~large])
+    return draws
+
+
+def sample_weeks(rng, sims, weeks, num, den, is_rate, categories, volume_names):
+    """Sample (sims x weeks x teams x categories) weekly category values"""
+    teams = num.shape[0]
+    shape = (sims, weeks, teams)
+    values = np.empty(shape + (len(categories),))
+    volumes = {}
+    for j, cat in enumerate(categories):
+        if not is_rate[j]:
+            values[..., j] = poisson(rng, num[:, j], shape)
+            continue
+        # Categories weighted by the same volume (ERA/WHIP by IP) share one draw
+        name = volume_names[j]
+        if name not in volumes:
+            if name == 'IP':
+                volumes[name] = poisson(rng, den[:, j] * 3, shape) / 3
+            else:
+                volumes[name] = poisson(rng, den[:, j], shape)
+        volume = volumes[name]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = np.where(den[:, j] > 0, num[:, j] / np.where(den[:, j] > 0, den[:, j], 1), 0.0)
+        kind, scale = RATE_MODELS.get(cat, ('poisson', 1.0))
+        if kind == 'binomial':
+            events = binomial(rng, volume, np.clip(rate, 0, 1), den[:, j])
+        else:
+            expected = volume * rate / scale
+            large = expected >= NORMAL_APPROXIMATION
+            events = np.empty(shape)
+            events[large] = np.maximum(np.rint(expected[large] + np.sqrt(expected[large])
+                                               * rng.standard_normal(int(large.sum()))), 0)
+            events[~large] = rng.poisson(expected[~large])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values[..., j] = np.where(volume > 0, scale * events / volume, np.nan)
+    return values
+
+
+def category_points(mine, theirs, lower_is_better):
+    """1 / 0.5 / 0 per category; a missing value loses to any real one"""
+    with np.errstate(invalid='ignore'):
+        better = np.where(lower_is_better, mine < theirs, mine > theirs)
+        tie = mine == theirs
+    mine_missing = np.isnan(mine)
+    theirs_missing = np.isnan(theirs)
+    points = np.where(better, 1.0, np.where(tie, 0.5, 0.0))
+    points = np.where(mine_missing, np.where(theirs_missing, 0.5, 0.0), np.where(theirs_missing, 1.0, points))
+    return points
+
+
+def simulate_batch(task):
+    """Play out `sims` seasons and return summed outcomes (safe to run in a worker process)"""
+    (seed, sims, num, den, is_rate, categories, volume_names, schedule, current_points,
+     lower_is_better, playoff_teams, matchup_scoring) = task
+    rng = np.random.default_rng(seed)
+    weeks, teams = schedule.shape
+    totals = {
+        'sims': 0,
+        'playoffs': np.zeros(teams),
+        'rank': np.zeros(teams),
+        'points': np.zeros(teams),
+        'next_categories': np.zeros((teams, len(categories))),
+        'next_matchup': np.zeros(teams),
+    }
+    for start in range(0, sims, BATCH_SIZE):
+        batch = min(BATCH_SIZE, sims - start)
+        values = sample_weeks(rng, batch, weeks, num, den, is_rate, categories, volume_names)
+        has_game = schedule >= 0
+        opponents = np.where(has_game, schedule, np.arange(teams)[None, :])
+        theirs = np.take_along_axis(values, opponents[None, :, :, None], axis=2)
+        points = category_points(values, theirs, lower_is_better) * has_game[None, :, :, None]
+
+        won = points.sum(axis=-1)
+        lost = (1.0 - points).sum(axis=-1) * has_game[None, :, :]
+        if matchup_scoring:
+            weekly = np.where(won > lost, 1.0, np.where(won == lost, 0.5, 0.0)) * has_game[None, :, :]
+        else:
+            weekly = won
+        final = current_points[None, :] + weekly.sum(axis=1)
+
+        # Rank with a random tiebreak (0 = first place)
+        noise = rng.random(final.shape) * 1e-6
+        order = np.argsort(-(final + noise), axis=1)
+        rank = np.empty_like(order)
+        np.put_along_axis(rank, order, np.arange(teams)[None, :], axis=1)
+
+        totals['sims'] += batch
+        totals['playoffs'] += (rank < playoff_teams).sum(axis=0)
+        totals['rank'] += (rank + 1).sum(axis=0)
+        totals['points'] += final.sum(axis=0)
+        if weeks:
+            totals['next_categories'] += points[:, 0].sum(axis=0)
+            next_won, next_lost = won[:, 0], lost[:, 0]
+            totals['next_matchup'] += (np.where(next_won > next_lost, 1.0, np.where(next_won == next_lost, 0.5, 0.0))
+                                       * has_game[0][None, :]).sum(axis=0)
+    return totals
+
+
+def _league_setting(league, name, default):
+    value = getattr(getattr(league, 'settings', None), name, None)
+    return value if isinstance(value, int) and value > 0 else default
+
+
+@timed()
+def simulate_season(league, context=None, categories=ALL_CATEGORIES, simulations=SIMULATIONS,
+                    processes=SIM_PROCESSES, seed=None, weeks_left=None, playoff_teams=None):
+    """Monte Carlo the rest of the season from player-level stats
+
+    Each team's weekly expectation is the sum of its active players' per-week
+    season rates. These come from the season-to-date player table even with
+    PROJECTIONS, since the blended projections are scaled to projected
+    playing time rather than to the weeks already played. Counting categories are Poisson; rate categories sample
+    their volume (AB, PA, IP) first and then the events on it, so a small
+    sample can swing AVG or ERA. Every remaining matchup is played
+    `simulations` times in batched arrays, split across `processes` worker
+    processes when given.
+    Returns {'standings': DataFrame, 'categories': DataFrame, 'simulations': n}.
+    """
+    if context is None:
+        context = LeagueContext(league, categories)
+    table = context.player_table()
+    table = table[table['rostered']]
+    categories = [cat for cat in categories if cat in table.columns]
+
+    # Matchup week, not espn_api's current_week (the daily scoring period in baseball)
+    current_period = max(getattr(league, 'currentMatchupPeriod', None) or 1, 1)
+    season_weeks = _league_setting(league, 'reg_season_count', SIM_REGULAR_SEASON_WEEKS)
+    if weeks_left is None:
+        weeks_left = max(season_weeks - current_period + 1, 0)
+    if playoff_teams is None:
+        playoff_teams = _league_setting(league, 'playoff_team_count', SIM_PLAYOFF_TEAMS)
+
+    team_ids, num, den, is_rate = weekly_rates(table, categories, current_period - 1, context.spec.rate_volume)
+    teams_by_id = {team.team_id: team for team in league.teams}
+    schedule = remaining_schedule(league, list(team_ids), weeks_left)
+    current_points = np.array([getattr(teams_by_id[tid], 'wins', 0) + 0.5 * getattr(teams_by_id[tid], 'ties', 0)
+                               for tid in team_ids], dtype=float)
+    scoring_type = getattr(league, 'scoring_type', None) or getattr(getattr(league, 'settings', None), 'scoring_type', None)
+    matchup_scoring = scoring_type == 'H2H_MOST_CATEGORIES'
+    lower_is_better = context.spec.lower(categories)
+    volume_names = [context.spec.rate_volume.get(cat) for cat in categories]
+
+    workers = processes if processes and processes > 1 and simulations >= 2 * BATCH_SIZE else 1
+    counts = [simulations // workers + (1 if i < simulations % workers else 0) for i in range(workers)]
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    tasks = [(seeds[i], counts[i], num, den, is_rate, categories, volume_names, schedule, current_points,
+              lower_is_better, playoff_teams, matchup_scoring) for i in range(workers) if counts[i]]
+    if len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=len(tasks)) as pool:
+            results = list(pool.map(simulate_batch, tasks))
+    else:
+        results = [simulate_batch(task) for task in tasks]
+
+    sims = sum(r['sims'] for r in results) or 1
+    summed = {key: sum(r[key] for r in results) for key in results[0] if key != 'sims'} if results else {}
+    next_opponents = schedule[0] if weeks_left else np.full(len(team_ids), -1)
+    standings = pd.DataFrame({
+        'team_id': team_ids,
+        'team_name': [teams_by_id[tid].team_name for tid in team_ids],
+        'current_points': current_points,
+        'projected_points': summed['points'] / sims,
+        'mean_rank': summed['rank'] / sims,
+        'playoff_odds': summed['playoffs'] / sims,
+        'next_opponent': [teams_by_id[team_ids[o]].team_name if o >= 0 else None for o in next_opponents],
+        'next_matchup_win': summed['next_matchup'] / sims,
+    }).sort_values(['playoff_odds', 'projected_points'], ascending=False, kind='stable').reset_index(drop=True)
+    category_odds = pd.DataFrame(summed['next_categories'] / sims, columns=categories,
+                                 index=pd.Index(team_ids, name='team_id'))
+    return {'standings': standings, 'categories': category_odds, 'simulations': sims,
+            'weeks_left': weeks_left, 'playoff_teams': playoff_teams}
+
+
+def season_outlook(league, my_team, context=None, simulations=SIMULATIONS):
+    """Print next-matchup category odds and playoff odds for my team"""
+    print("\n--- SEASON SIMULATION ---")
+    if context is None:
+        context = LeagueContext(league, ALL_CATEGORIES)
+    result = context.memoize_table(f"season_simulation:{simulations}",
+                                   lambda table: simulate_season(league, context, simulations=simulations))
+    standings = result['standings']
+    categories = result['categories']
+    print(f"Simulated the remaining {result['weeks_left']} weeks {result['simulations']:,} times "
+          f"(top {result['playoff_teams']} make the playoffs)")
+
+    mine = standings[standings['team_id'] == my_team.team_id]
+    if not mine.empty and my_team.team_id in categories.index:
+        row = mine.iloc[0]
+        if row['next_opponent'] is not None:
+            print(f"\nNext matchup vs {row['next_opponent']}: {row['next_matchup_win']:.1%} to win")
+            print("Category win probabilities:")
+            for cat, probability in categories.loc[my_team.team_id].items():
+                print(f"  {cat}: {probability:.1%}")
+
+    print("\nProjected standings:")
+    for i, row in standings.iterrows():
+        marker = " <--" if row['team_id'] == my_team.team_id else ""
+        print(f"{i + 1:>2}. {row['team_name']}: {row['projected_points']:.1f} pts, "
+              f"avg finish {row['mean_rank']:.1f}, playoffs {row['playoff_odds']:.1%}{marker}")
+
+    return {
+        'team_id': my_team.team_id,
+        'team_name': my_team.team_name,
+        'simulations': result['simulations'],
+        'weeks_left': result['weeks_left'],
+        'standings': standings.to_dict('records'),
+        'category_odds': categories.loc[my_team.team_id].to_dict() if my_team.team_id in categories.index else {},
+    }
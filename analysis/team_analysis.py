@@ -1,125 +1,93 @@
-import pandas as pd
 import numpy as np
-from config import ALL_CATEGORIES
-from utils.data_helpers import get_league_averages, extract_player_stats
+from config import ALL_CATEGORIES, CATEGORY_MODEL, ZSCORE_THRESHOLD
+from utils.league_context import LeagueContext
+from analysis.valuation import league_team_scores, classify_categories
+from utils.scoring import ScoringSpec
+from utils.instrumentation import timed
 
-def analyze_team(league, my_team):
-    """Analyze team strengths and weaknesses by category"""
-    print("\n--- TEAM ANALYSIS ---")
-    players = my_team.roster
-    player_stats = []
+def team_report(context, my_team):
+    """Category comparison for one team as plain data, without printing
     
-    # Extract player stats
-    for player in players:
-        player_data = extract_player_stats(player, ALL_CATEGORIES)
-        if player_data:  
-            player_stats.append(player_data)
+    Returns None when none of the team's players have usable stats.
+    """
+    # Roster view on the league-wide player table (built once per session)
+    df = context.team_table(my_team)
 
-    if not player_stats:
-        print(f"\nTeam: {my_team.team_name}")
-        print("\nNo player statistics available. Check API connection and data.")
-        return [], []
-    
-    df = pd.DataFrame(player_stats)
+    if df.empty:
+        return None
     
     # Get league averages 
-    league_stats = get_league_averages(league, ALL_CATEGORIES)
-    
-    # Count active vs. total players 
-    active_players = 0
-    if 'lineupSlot' in df.columns:
-        active_players = df[~df['lineupSlot'].isin(['BE', 'IL'])].shape[0]
-    else:
-        active_players = len(df)
-    
-    total_players = len(df)
+    league_stats = context.league_averages()
     
-    # Calculate different versions of team stats
-    team_totals = {}
-    team_all_avgs = {}    # Average per roster spot
-    team_active_avgs = {} # Average per active player
+    team_totals, team_active_avgs, total_players, active_players = context.team_aggregates(my_team)
     
-    # Batting Average - weighted by AB
-    if 'AB' in df.columns and df['AB'].sum() > 0:
-        team_all_avgs['AVG'] = (df['AVG'] * df['AB']).sum() / df['AB'].sum()
+    if CATEGORY_MODEL == 'zscore':
+        # Compare the team's summed player z-scores with every other team's
+        strengths, weaknesses = classify_categories(
+            league_team_scores(context), my_team.team_id, ALL_CATEGORIES, ZSCORE_THRESHOLD)
     else:
-        team_all_avgs['AVG'] = df['AVG'].mean() if 'AVG' in df.columns else 0
+        strengths, weaknesses = threshold_categories(team_active_avgs, league_stats, context.spec)
     
-    team_active_avgs['AVG'] = team_all_avgs['AVG'] 
-    
-    # On-base Percentage - weighted by PA
-    if 'PA' in df.columns and df['PA'].sum() > 0:
-        team_all_avgs['OBP'] = (df['OBP'] * df['PA']).sum() / df['PA'].sum()
-    else:
-        team_all_avgs['OBP'] = df['OBP'].mean() if 'OBP' in df.columns else 0
-    
-    team_active_avgs['OBP'] = team_all_avgs['OBP']  
-    
-    # ERA - weighted by IP
-    if 'IP' in df.columns and df['IP'].sum() > 0:
-        team_all_avgs['ERA'] = (df['ERA'] * df['IP']).sum() / df['IP'].sum()
-    else:
-        team_all_avgs['ERA'] = df['ERA'].mean() if 'ERA' in df.columns else 0
-    
-    team_active_avgs['ERA'] = team_all_avgs['ERA'] 
-    
-    # WHIP - weighted by IP
-    if 'IP' in df.columns and df['IP'].sum() > 0:
-        team_all_avgs['WHIP'] = (df['WHIP'] * df['IP']).sum() / df['IP'].sum()
-    else:
-        team_all_avgs['WHIP'] = df['WHIP'].mean() if 'WHIP' in df.columns else 0
-    
-    team_active_avgs['WHIP'] = team_all_avgs['WHIP']  
-    
-    # Counting stats - calculate different versions
-    for stat in ['R', 'HR', 'RBI', 'SB', 'W', 'SV', 'K']:
-        if stat in df.columns:
-            team_totals[stat] = df[stat].sum()
-            team_all_avgs[stat] = team_totals[stat] / total_players
-            team_active_avgs[stat] = team_totals[stat] / active_players if active_players > 0 else 0
-        else:
-            team_totals[stat] = 0
-            team_all_avgs[stat] = 0
-            team_active_avgs[stat] = 0
-    
-    # Compare to league averages - use active player averages 
-    # (assuming league_stats is calculated the same way)
-    strengths = []
-    weaknesses = []
+    categories = []
+    for cat in ALL_CATEGORIES:
+        categories.append({
+            'category': cat,
+            'team_total': team_totals.get(cat),
+            'team_value': team_active_avgs.get(cat),
+            'league_average': league_stats.get(cat),
+            'status': 'strength' if cat in strengths else 'weakness' if cat in weaknesses else 'neutral',
+        })
+    
+    return {
+        'team_id': my_team.team_id,
+        'team_name': my_team.team_name,
+        'total_players': total_players,
+        'active_players': active_players,
+        'team_totals': team_totals,
+        'team_active_avgs': team_active_avgs,
+        'league_averages': league_stats,
+        'strengths': strengths,
+        'weaknesses': weaknesses,
+        'categories': categories,
+        'roster': df[['id', 'name', 'position', 'team', 'injured', 'injuryStatus', 'lineupSlot']]
+                  .astype(object).to_dict('records'),
+    }
+
+@timed()
+def analyze_team(league, my_team, context=None):
+    """Analyze team strengths and weaknesses by category"""
+    print("\n--- TEAM ANALYSIS ---")
+    if context is None:
+        context = LeagueContext(league, ALL_CATEGORIES)
     
-    # Choose which team stats to compare with the league
-    team_stats_to_compare = team_active_avgs
+    report = team_report(context, my_team)
+    if report is None:
+        print(f"\nTeam: {my_team.team_name}")
+        print("\nNo player statistics available. Check API connection and data.")
+        return [], []
     
-    for cat in ALL_CATEGORIES:
-        if cat not in team_stats_to_compare or cat not in league_stats:
-            continue
-            
-        if league_stats[cat] == 0:
-            continue
-            
-        if cat in ['ERA', 'WHIP']:  
-            if team_stats_to_compare[cat] < league_stats[cat] * 0.9:
-                strengths.append(cat)
-            elif team_stats_to_compare[cat] > league_stats[cat] * 1.1:
-                weaknesses.append(cat)
-        else: 
-            if team_stats_to_compare[cat] > league_stats[cat] * 1.1:
-                strengths.append(cat)
-            elif team_stats_to_compare[cat] < league_stats[cat] * 0.9:
-                weaknesses.append(cat)
+    df = context.team_table(my_team)
+    league_stats = report['league_averages']
+    team_totals = report['team_totals']
+    team_active_avgs = report['team_active_avgs']
+    total_players = report['total_players']
+    active_players = report['active_players']
+    strengths = report['strengths']
+    weaknesses = report['weaknesses']
     
     # Display team stats with multiple metrics
     print(f"\nTeam: {my_team.team_name}")
     print(f"Roster: {total_players} total players, {active_players} active players")
     
     print("\nTeam Statistics:")
+    spec = context.spec
     for cat in ALL_CATEGORIES:
-        if cat in ['R', 'HR', 'RBI', 'SB', 'W', 'SV', 'K']:
+        if cat not in spec.rate_volume:
             if cat in team_totals and cat in team_active_avgs and cat in league_stats:
-                print(f"{cat}: {team_totals[cat]:.0f} total, {team_active_avgs[cat]:.3f} per active (League Avg: {league_stats[cat]:.3f})")
+                print(f"{cat}: {spec.format(cat, team_totals[cat])} total, {team_active_avgs[cat]:.3f} per active (League Avg: {league_stats[cat]:.3f})")
         else:
             if cat in team_active_avgs and cat in league_stats:
-                print(f"{cat}: {team_active_avgs[cat]:.3f} (League Avg: {league_stats[cat]:.3f})")
+                print(f"{cat}: {spec.format(cat, team_active_avgs[cat])} (League Avg: {spec.format(cat, league_stats[cat])})")
     
     print("\nTeam Strengths:", ', '.join(strengths) if strengths else "None identified")
     print("Team Weaknesses:", ', '.join(weaknesses) if weaknesses else "None identified")
@@ -128,7 +96,7 @@ def analyze_team(league, my_team):
     print("\nPositional Breakdown:")
     try:
         if 'position' in df.columns:
-            position_groups = df.groupby('position')
+            position_groups = df.groupby('position', observed=True)
             for position, group in position_groups:
                 print(f"\n{position}:")
                 for _, player in group.iterrows():
@@ -145,4 +113,25 @@ def analyze_team(league, my_team):
         print(f"Error during positional breakdown: {e}")
         print("Check the 'position' field in your player data")
 
-    return strengths, weaknesses
\ No newline at end of file
+    return strengths, weaknesses
+
+def threshold_categories(team_stats_to_compare, league_stats, spec=None):
+    """Strengths/weaknesses from +/-10% bands around the league averages
+
+    Direction comes from `spec` (the built-in STAT_SPECS when None): for a
+    lower-is-better stat being 10% under the league is the strength.
+    """
+    if spec is None:
+        spec = ScoringSpec(ALL_CATEGORIES)
+    categories = [cat for cat in ALL_CATEGORIES if cat in team_stats_to_compare and cat in league_stats
+                  and league_stats[cat] != 0]
+    if not categories:
+        return [], []
+    team = np.array([team_stats_to_compare[cat] for cat in categories], dtype=float)
+    league = np.array([league_stats[cat] for cat in categories], dtype=float)
+    lower = spec.lower(categories)
+    strong = np.where(lower, team < league * 0.9, team > league * 1.1)
+    weak = ~strong & np.where(lower, team > league * 1.1, team < league * 0.9)
+    return ([cat for cat, flag in zip(categories, strong) if flag],
+            [cat for cat, flag in zip(categories, weak) if flag])
+
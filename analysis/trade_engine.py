@@ -0,0 +1,270 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from config import ALL_CATEGORIES
+from utils.scoring import RATE_VOLUME
+from analysis.valuation import league_scores, scoring_table
+from utils.instrumentation import timed
+
+
+def player_contributions(table, categories, rate_volume=RATE_VOLUME):
+    """Per-player numerators/denominators so team category values are sums
+
+    Counting stats contribute their value. Rate stats contribute rate * volume
+    over volume (AB for AVG, PA for OBP, IP for ERA/WHIP; `rate_volume` is a
+    ScoringSpec's mapping), matching how analyze_team weights team rate stats.
+    """
+    n = len(table)
+    num = np.zeros((n, len(categories)))
+    den = np.zeros((n, len(categories)))
+    is_rate = np.zeros(len(categories), dtype=bool)
+    for j, cat in enumerate(categories):
+        values = np.nan_to_num(table[cat].to_numpy(dtype=float, na_value=np.nan))
+        volume_col = rate_volume.get(cat)
+        if volume_col is None:
+            num[:, j] = values
+            continue
+        is_rate[j] = True
+        volume = (np.nan_to_num(table[volume_col].to_numpy(dtype=float, na_value=np.nan))
+                  if volume_col in table.columns else np.zeros(n))
+        if volume.sum() <= 0:
+            # No volume data: weight every player who has the stat equally
+            volume = (values != 0).astype(float)
+        num[:, j] = values * volume
+        den[:, j] = volume
+    return num, den, is_rate
+
+
+def category_values(num, den, is_rate):
+    """Team category values from summed numerators/denominators (last axis = category)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates = np.where(den > 0, num / np.where(den > 0, den, 1), np.nan)
+    return np.where(is_rate, rates, num)
+
+
+def standings_points(values, others, lower_is_better):
+    """Roto points earned against a fixed set of other teams (ties count half)
+
+    `values` is (..., categories) and `others` is (teams, categories).
+    """
+    points = np.zeros(values.shape)
+    for j in range(values.shape[-1]):
+        column = np.sort(others[:, j][~np.isnan(others[:, j])])
+        v = values[..., j]
+        below = np.searchsorted(column, v, side='left')
+        not_above = np.searchsorted(column, v, side='right')
+        ties = not_above - below
+        if lower_is_better[j]:
+            beaten = len(column) - not_above
+        else:
+            beaten = below
+        points[..., j] = np.where(np.isnan(v), 0.0, beaten + 0.5 * ties)
+    return points
+
+
+def _head_to_head(a, b, lower_is_better):
+    """Points a earns against b per category (1 win, 0.5 tie, 0 loss)"""
+    with np.errstate(invalid='ignore'):
+        better = np.where(lower_is_better, a < b, a > b)
+        tie = a == b
+    return np.where(np.isnan(a), 0.0, np.where(better, 1.0, np.where(tie, 0.5, 0.0)))
+
+
+def _side_options(count, values, pair_pool):
+    """Index tuples for single players and (pruned) pairs on one side of a trade"""
+    singles = [(i,) for i in range(count)]
+    pool = np.argsort(-values, kind='stable')[:pair_pool]
+    pairs = [tuple(sorted(pair)) for pair in itertools.combinations(sorted(pool), 2)]
+    return singles, pairs
+
+
+def _stack(options, num, den, value):
+    idx = np.array(options, dtype=np.int64)
+    return num[idx].sum(axis=1), den[idx].sum(axis=1), value[idx].sum(axis=1), idx
+
+
+def _roster_drops(singles, value):
+    """Player each single-player option's team would release to make room
+
+    The side that receives two players for one has to open a roster spot, so
+    it drops its least valuable player other than the one being traded away.
+    """
+    order = np.argsort(value, kind='stable')
+    if len(order) < 2:
+        return None
+    singles = np.array([option[0] for option in singles])
+    return np.where(singles == order[0], order[1], order[0])
+
+
+def evaluate_team_trades(my_num, my_den, my_value, their_num, their_den, their_value,
+                         others, is_rate, lower_is_better, pair_pool=12, top_n=25,
+                         min_partner_gain=None):
+    """Score every 1-for-1, 2-for-1 and 1-for-2 swap with one partner team
+
+    Inputs are per-player contribution matrices for both rosters and the
+    current category values of the remaining teams. In uneven trades the side
+    receiving two players drops its least valuable remaining player. With
+    `min_partner_gain`, trades gaining the partner fewer standings points
+    are skipped. Returns a list of dicts for the best `top_n` trades by my
+    standings gain.
+    """
+    my_totals = (my_num.sum(axis=0), my_den.sum(axis=0))
+    their_totals = (their_num.sum(axis=0), their_den.sum(axis=0))
+    my_before = category_values(*my_totals, is_rate)
+    their_before = category_values(*their_totals, is_rate)
+    my_points_before = (standings_points(my_before, others, lower_is_better)
+                        + _head_to_head(my_before, their_before, lower_is_better))
+    their_points_before = (standings_points(their_before, others, lower_is_better)
+                           + _head_to_head(their_before, my_before, lower_is_better))
+
+    my_singles, my_pairs = _side_options(len(my_num), my_value, pair_pool)
+    their_singles, their_pairs = _side_options(len(their_num), their_value, pair_pool)
+
+    results = []
+    for gives, gets in ((my_singles, their_singles), (my_pairs, their_singles), (my_singles, their_pairs)):
+        if not gives or not gets:
+            continue
+        g_num, g_den, g_val, g_idx = _stack(gives, my_num, my_den, my_value)
+        r_num, r_den, r_val, r_idx = _stack(gets, their_num, their_den, their_value)
+        # Players leaving each roster: the traded side plus, in uneven trades,
+        # the release made by the side receiving two players for one
+        my_out_num, my_out_den = g_num, g_den
+        their_out_num, their_out_den = r_num, r_den
+        my_drop = their_drop = None
+        if len(gives[0]) > len(gets[0]):
+            their_drop = _roster_drops(gets, their_value)
+            if their_drop is None:
+                continue
+            their_out_num, their_out_den = r_num + their_num[their_drop], r_den + their_den[their_drop]
+        elif len(gets[0]) > len(gives[0]):
+            my_drop = _roster_drops(gives, my_value)
+            if my_drop is None:
+                continue
+            my_out_num, my_out_den = g_num + my_num[my_drop], g_den + my_den[my_drop]
+
+        # (gives x gets x categories) totals via broadcasting
+        my_after = category_values(my_totals[0] - my_out_num[:, None, :] + r_num[None, :, :],
+                                   my_totals[1] - my_out_den[:, None, :] + r_den[None, :, :], is_rate)
+        their_after = category_values(their_totals[0] - their_out_num[None, :, :] + g_num[:, None, :],
+                                      their_totals[1] - their_out_den[None, :, :] + g_den[:, None, :], is_rate)
+
+        my_points = (standings_points(my_after, others, lower_is_better)
+                     + _head_to_head(my_after, their_after, lower_is_better))
+        their_points = (standings_points(their_after, others, lower_is_better)
+                        + _head_to_head(their_after, my_after, lower_is_better))
+        my_gain = (my_points - my_points_before).sum(axis=-1).ravel()
+        their_gain = (their_points - their_points_before).sum(axis=-1).ravel()
+        value_delta = (r_val[None, :] - g_val[:, None]).ravel()
+        category_gain = (my_points - my_points_before).reshape(-1, len(is_rate))
+
+        # Keep only the best top_n of this shape before building any Python objects
+        order = np.lexsort((-value_delta, -their_gain, -my_gain))
+        if min_partner_gain is not None:
+            order = order[their_gain[order] >= min_partner_gain]
+        order = order[:top_n]
+        for flat in order:
+            gi, ri = divmod(int(flat), len(gets))
+            results.append({
+                'give': g_idx[gi].tolist(),
+                'receive': r_idx[ri].tolist(),
+                'my_drop': None if my_drop is None else int(my_drop[gi]),
+                'partner_drop': None if their_drop is None else int(their_drop[ri]),
+                'my_gain': float(my_gain[flat]),
+                'partner_gain': float(their_gain[flat]),
+                'value_delta': float(value_delta[flat]),
+                'category_gain': category_gain[flat],
+            })
+
+    results.sort(key=lambda r: (-r['my_gain'], -r['partner_gain'], -r['value_delta']))
+    return results[:top_n]
+
+
+def _evaluate_task(task):
+    return task[0], evaluate_team_trades(*task[1:])
+
+
+@timed()
+def best_trades(context, my_team, categories=ALL_CATEGORIES, top_n=10, pair_pool=12,
+                min_partner_gain=None, processes=None):
+    """Rank every 1-for-1 and 2-for-1 trade between my roster and each other team
+
+    Each candidate's before/after category totals are computed for both sides
+    with vectorized deltas (counting stats added/removed, rate stats
+    reweighted by AB/PA/IP), then scored by the change in roto standings
+    points. Pairs are drawn from each roster's `pair_pool` most valuable
+    players, and only trades that gain the partner at least `min_partner_gain`
+    standings points are kept (0 = the partner must not lose any, None = no
+    limit). With `processes` > 1 teams are evaluated on
+    a process pool.
+    Returns a DataFrame sorted by my standings gain.
+    """
+    table = scoring_table(context)
+    rostered = table[table['rostered']]
+    categories = [cat for cat in categories if cat in rostered.columns]
+    if rostered.empty or not categories:
+        return pd.DataFrame()
+
+    num, den, is_rate = player_contributions(rostered, categories, context.spec.rate_volume)
+    value = league_scores(context).loc[rostered.index, 'value'].to_numpy(dtype=float)
+    lower_is_better = context.spec.lower(categories)
+
+    team_ids = rostered['fantasy_team_id'].to_numpy()
+    rows_by_team = {team_id: np.flatnonzero(team_ids == team_id) for team_id in np.unique(team_ids)}
+    if my_team.team_id not in rows_by_team:
+        return pd.DataFrame()
+    mine = rows_by_team[my_team.team_id]
+
+    team_values = {team_id: category_values(num[rows].sum(axis=0), den[rows].sum(axis=0), is_rate)
+                   for team_id, rows in rows_by_team.items()}
+
+    tasks = []
+    for team_id, theirs in rows_by_team.items():
+        if team_id == my_team.team_id:
+            continue
+        others = np.array([v for tid, v in team_values.items() if tid not in (team_id, my_team.team_id)])
+        others = others.reshape(-1, len(categories))
+        tasks.append((team_id, num[mine], den[mine], value[mine], num[theirs], den[theirs], value[theirs],
+                      others, is_rate, lower_is_better, pair_pool, top_n, min_partner_gain))
+
+    if processes and processes > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            evaluated = list(pool.map(_evaluate_task, tasks))
+    else:
+        evaluated = [_evaluate_task(task) for task in tasks]
+
+    names = rostered['name'].to_numpy()
+    team_names = rostered['fantasy_team'].astype(object).to_numpy()
+    owners = rostered['owner'].astype(object).to_numpy()
+    rows = []
+    for team_id, trades in evaluated:
+        theirs = rows_by_team[team_id]
+        for trade in trades:
+            give_rows = mine[trade['give']]
+            receive_rows = theirs[trade['receive']]
+            rows.append({
+                'fantasy_team_id': int(team_id),
+                'fantasy_team': team_names[theirs[0]],
+                'owner': owners[theirs[0]],
+                'give': [names[i] for i in give_rows],
+                'receive': [names[i] for i in receive_rows],
+                'give_ids': rostered['id'].to_numpy()[give_rows].tolist(),
+                'receive_ids': rostered['id'].to_numpy()[receive_rows].tolist(),
+                'drop': None if trade['my_drop'] is None else names[mine[trade['my_drop']]],
+                'partner_drop': None if trade['partner_drop'] is None else names[theirs[trade['partner_drop']]],
+                'my_gain': trade['my_gain'],
+                'partner_gain': trade['partner_gain'],
+                'value_delta': trade['value_delta'],
+                'improves': [cat for cat, gain in zip(categories, trade['category_gain']) if gain > 0],
+                'hurts': [cat for cat, gain in zip(categories, trade['category_gain']) if gain < 0],
+            })
+
+    if not rows:
+        return pd.DataFrame()
+    trades = pd.DataFrame(rows)
+    # Object columns keep None for "no drop"; a string column would turn it into NaN
+    for column in ('drop', 'partner_drop'):
+        trades[column] = pd.Series([row[column] for row in rows], dtype=object)
+    trades = trades.sort_values(['my_gain', 'partner_gain', 'value_delta'],
+                                ascending=False, kind='stable').head(top_n)
+    return trades.reset_index(drop=True)
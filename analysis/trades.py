@@ -1,175 +1,120 @@
 import pandas as pd
-from config import ALL_CATEGORIES, BATTING_CATEGORIES, PITCHING_CATEGORIES
-from utils.data_helpers import extract_player_stats
+from config import ALL_CATEGORIES, CATEGORY_MODEL, TRADE_ENGINE_TOP, TRADE_MIN_PARTNER_GAIN, TRADE_PROCESSES
+from utils.league_context import LeagueContext
 from analysis.team_analysis import analyze_team
+from analysis.ranking import rank_category_leaders
+from analysis.valuation import ranking_scores, scoring_table
+from analysis.trade_engine import best_trades
+from utils.instrumentation import timed, timer
 
-def trade_recommendations(league, my_team):
-    """Find potential trade targets based on team needs"""
+@timed()
+def trade_recommendations(league, my_team, context=None, all_categories=None):
+    """Find potential trade targets based on team needs
+    
+    all_categories answers the "search all categories?" prompt up front (None
+    asks the user). Returns the trade options as a dict, or None when there is
+    nothing to analyze.
+    """
     print("\n--- TRADE RECOMMENDATIONS ---")
+    if context is None:
+        context = LeagueContext(league, ALL_CATEGORIES)
     
     # Get team strengths and weaknesses
-    strengths, weaknesses = analyze_team(league, my_team)
+    strengths, weaknesses = analyze_team(league, my_team, context)
     
     if not weaknesses:
         print("\nYour team doesn't have clear weaknesses to address via trades.")
-        print("Would you like to search for top players in all categories? (y/n)")
-        response = input("> ").lower()
-        if response == 'y':
+        if all_categories is None:
+            print("Would you like to search for top players in all categories? (y/n)")
+            all_categories = input("> ").lower() == 'y'
+        if all_categories:
             weaknesses = ALL_CATEGORIES
         else:
             return
     
     # Get my team players for potential trades
-    my_players = []
-    for player in my_team.roster:
-        player_data = extract_player_stats(player, ALL_CATEGORIES)
-        if player_data:  
-            my_players.append(player_data)
+    my_df = context.team_table(my_team)
+    my_df = scoring_table(context).loc[my_df.index]
     
-    if not my_players:
+    if my_df.empty:
         print("No usable player data found for your team.")
         return
-        
-    my_df = pd.DataFrame(my_players)
-    
-    # Find trade targets on other teams
-    all_targets = []
-    
-    for team in league.teams:
-        if team.team_id == my_team.team_id:
-            continue
-        print(f"\nAnalyzing {team.team_name}...")
-        
-        # Find players who help in my weak categories
-        team_players = []
-        for player in team.roster:
-            player_data = extract_player_stats(player, ALL_CATEGORIES)
-            if player_data:  
-                player_data['fantasy_team'] = team.team_name
-                player_data['owner'] = getattr(team, 'owner', 'Unknown')
-                team_players.append(player_data)
-        
-        if not team_players:
-            print(f"  No usable player data found for {team.team_name}")
-            continue
     
-        all_targets.extend(team_players)
+    # Every rostered player outside my team, as a view on the league table
+    table = scoring_table(context)
+    targets_df = table[table['rostered'] & (table['fantasy_team_id'] != my_team.team_id)]
     
-    if not all_targets:
+    if targets_df.empty:
         print("\nNo viable trade targets found. Check data availability.")
         return
-        
-    targets_df = pd.DataFrame(all_targets)
     
     # For each weakness, find top trade targets
     trade_options = []
     
-    for weakness in weaknesses:
-        print(f"\nTop trade targets for {weakness}:")
+    # Rank targets for every weakness in one batched pass
+    scores = ranking_scores(context) if CATEGORY_MODEL == 'zscore' else None
+    target_leaders = rank_category_leaders(targets_df, weaknesses, 3, scores=scores, spec=context.spec)
+    
+    # Trade chips: my best players in my first strength, or (with no clear
+    # strengths) my weakest players in each weak category
+    if strengths:
+        chip_leaders = rank_category_leaders(my_df, strengths[:1], 3, bounds=False, scores=scores,
+                                             spec=context.spec)
+    else:
+        chip_leaders = rank_category_leaders(my_df, weaknesses, 3, bounds=False, worst=True,
+                                             scores=scores, spec=context.spec)
+    
+    with timer('trades.category_loop'):
+        for weakness in weaknesses:
+            print(f"\nTop trade targets for {weakness}:")
         
-        if weakness not in targets_df.columns:
-            print(f"  No data available for {weakness}")
-            continue
-            
-        if weakness in PITCHING_CATEGORIES:
-            # For pitching stats, identify pitchers using stat values
-            valid_players = targets_df[targets_df[weakness].notna()]
-            
-            if weakness in ['ERA', 'WHIP']:
-                # For ERA/WHIP: Filter reasonable values
-                filtered_targets = valid_players[(valid_players[weakness] > 0) & 
-                                              (valid_players[weakness] < 10)]
-                
-                # Sort ascending (lower is better)
-                top_targets = filtered_targets.sort_values(by=weakness, ascending=True).head(3)
-            
-            elif weakness in ['W', 'SV', 'K']:
-                # For W/SV/K: Filter non-zero values
-                filtered_targets = valid_players[valid_players[weakness] > 0]
-                
-                # Sort descending (higher is better)
-                top_targets = filtered_targets.sort_values(by=weakness, ascending=False).head(3)
+            if weakness not in target_leaders:
+                print(f"  No data available for {weakness}")
+                continue
             
-            else:
-                top_targets = valid_players.sort_values(by=weakness, ascending=False).head(3)
+            if len(target_leaders[weakness]) == 0:
+                print(f"  No suitable trade targets found for {weakness}")
+                continue
         
-        else:  # Batting categories or others
-            valid_players = targets_df[targets_df[weakness].notna()]
+            top_targets = targets_df.iloc[target_leaders[weakness]]
             
-            # Higher is better for batting stats
-            top_targets = valid_players.sort_values(by=weakness, ascending=False).head(3)
+            # Find players from my team who are strong in areas I can afford to lose
+            chip_category = strengths[0] if strengths else weakness
         
-        if top_targets.empty:
-            print(f"  No suitable trade targets found for {weakness}")
-            continue
-            
-        # Find players from my team who are strong in areas I can afford to lose
-        if strengths:
-            # Use first strength as trade chip
-            trade_strength = strengths[0]
-            
-            # Skip if the trade strength isn't in my team's data
-            if trade_strength not in my_df.columns:
-                print(f"  No data available for {trade_strength} in your roster")
+            if chip_category not in chip_leaders:
+                print(f"  No data available for {chip_category} in your roster")
                 continue
-                
-            # Filter and sort my players
-            valid_chips = my_df[my_df[trade_strength].notna()]
             
-            if valid_chips.empty:
-                print(f"  No valid trade chips found with {trade_strength} stats")
-                continue
-                
-            if trade_strength in ['ERA', 'WHIP']: 
-                my_trade_chips = valid_chips.sort_values(by=trade_strength, ascending=True).head(3)
-            else:  
-                my_trade_chips = valid_chips.sort_values(by=trade_strength, ascending=False).head(3)
-        else:
-            # If no clear strengths, use players who don't help with weaknesses
-            if weakness not in my_df.columns:
-                print(f"  No data available for {weakness} in your roster")
+            if len(chip_leaders[chip_category]) == 0:
+                print(f"  No valid trade chips found with {chip_category} stats")
                 continue
+        
+            my_trade_chips = my_df.iloc[chip_leaders[chip_category]]
                 
-            valid_chips = my_df[my_df[weakness].notna()]
-            
-            if valid_chips.empty:
-                print(f"  No valid trade chips found with {weakness} stats")
-                continue
-                
-            if weakness in ['ERA', 'WHIP']: 
-                # For ERA/WHIP, higher values are worse, so use those as trade chips
-                my_trade_chips = valid_chips.sort_values(by=weakness, ascending=False).head(3)
-            else:
-                # For other stats, lower values are worse
-                my_trade_chips = valid_chips.sort_values(by=weakness, ascending=True).head(3)
-                
-        # Display trade possibilities
-        for _, target in top_targets.iterrows():
-            # Format the value based on category type
-            if weakness in ['ERA', 'WHIP', 'AVG', 'OBP']:
-                stat_value = f"{target[weakness]:.3f}"
-            else:
-                stat_value = f"{target[weakness]:.0f}"
+            # Display trade possibilities
+            for _, target in top_targets.iterrows():
+                # Format the value based on category type
+                stat_value = context.spec.format(weakness, target[weakness])
                 
-            print(f"\n- Target: {target['name']} ({target['position']}, {target['team']})")
-            print(f"  Owner: {target['owner']} ({target['fantasy_team']})")
-            print(f"  {weakness} value: {stat_value}")
+                print(f"\n- Target: {target['name']} ({target['position']}, {target['team']})")
+                print(f"  Owner: {target['owner']} ({target['fantasy_team']})")
+                print(f"  {weakness} value: {stat_value}")
             
-            print("  Possible trade chips:")
-            for _, chip in my_trade_chips.iterrows():
-                status = f" [INJURED: {chip['injuryStatus']}]" if chip.get('injured', False) else ""
-                print(f"  - {chip['name']} ({chip['position']}, {chip['team']}){status}")
+                print("  Possible trade chips:")
+                for _, chip in my_trade_chips.iterrows():
+                    status = f" [INJURED: {chip['injuryStatus']}]" if chip.get('injured', False) else ""
+                    print(f"  - {chip['name']} ({chip['position']}, {chip['team']}){status}")
                 
-            # Add to trade options
-            trade_options.append({
-                'target': target['name'],
-                'target_team': target['fantasy_team'],
-                'target_owner': target['owner'],
-                'target_position': target['position'],
-                'target_value': target[weakness],
-                'improves': weakness,
-                'trade_chips': [chip['name'] for _, chip in my_trade_chips.iterrows()]
-            })
+                # Add to trade options
+                trade_options.append({
+                    'target': target['name'],
+                    'target_team': target['fantasy_team'],
+                    'target_owner': target['owner'],
+                    'target_position': target['position'],
+                    'target_value': target[weakness],
+                    'improves': weakness,
+                    'trade_chips': [chip['name'] for _, chip in my_trade_chips.iterrows()]
+                })
     
     # Summary of trade recommendations        
     if trade_options:
@@ -189,12 +134,35 @@ def trade_recommendations(league, my_team):
             
             for trade in trades:
                 # Format the stat value
-                if trade['improves'] in ['ERA', 'WHIP', 'AVG', 'OBP']:
-                    stat_value = f"{trade['target_value']:.3f}"
-                else:
-                    stat_value = f"{trade['target_value']:.0f}"
+                stat_value = context.spec.format(trade['improves'], trade['target_value'])
                     
                 print(f"  * Target: {trade['target']} ({trade['target_position']}) - {trade['improves']}: {stat_value}")
                 print(f"    Offer: {', '.join(trade['trade_chips'])}")
     else:
-        print("\nNo viable trade options were found.")
\ No newline at end of file
+        print("\nNo viable trade options were found.")
+    
+    # Whole-profile search: every 1-for-1 and 2-for-1 swap scored by standings impact
+    best = best_trades(context, my_team, top_n=TRADE_ENGINE_TOP,
+                       min_partner_gain=TRADE_MIN_PARTNER_GAIN, processes=TRADE_PROCESSES)
+    if not best.empty:
+        print("\nBest Overall Trades (by projected standings points):")
+        for _, trade in best.iterrows():
+            print(f"\n* {trade['fantasy_team']} - Owner: {trade['owner']}")
+            print(f"  Give: {', '.join(trade['give'])}")
+            print(f"  Get: {', '.join(trade['receive'])}")
+            if pd.notna(trade['drop']):
+                print(f"  Drop: {trade['drop']}")
+            if pd.notna(trade['partner_drop']):
+                print(f"  They drop: {trade['partner_drop']}")
+            print(f"  Standings: {trade['my_gain']:+.1f} for you, {trade['partner_gain']:+.1f} for them")
+            print(f"  Improves: {', '.join(trade['improves']) or 'None'}"
+                  f" | Hurts: {', '.join(trade['hurts']) or 'None'}")
+    
+    return {
+        'team_id': my_team.team_id,
+        'team_name': my_team.team_name,
+        'strengths': list(strengths),
+        'weaknesses': list(weaknesses),
+        'trade_options': trade_options,
+        'best_trades': best.to_dict('records'),
+    }
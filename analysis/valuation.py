@@ -0,0 +1,287 @@
+import numpy as np
+import pandas as pd
+from config import (ALL_CATEGORIES, BATTING_CATEGORIES, PITCHING_CATEGORIES, RECENT_FORM_DAYS, RECENT_FORM_WEIGHT,
+                    FREE_AGENT_POOL_SIZE, FREE_AGENT_PAGE_SIZE, FREE_AGENT_CONCURRENCY, FREE_AGENT_POSITIONS,
+                    PROJECTIONS, PROJECTION_STABILIZATION, PROJECTION_RECENT_DAYS, PROJECTION_RECENT_WEIGHT)
+from utils.instrumentation import timed
+from utils.projections import ProjectionBlender
+from utils.stat_history import recent_table
+from utils.scoring import ScoringSpec
+
+
+def _has_volume(table, volume):
+    return volume in table.columns and table[volume].fillna(0).gt(0).any()
+
+
+class CategoryScorer:
+    """Per-category z-score parameters fitted on a player table
+
+    Counting stats are standardized directly. Rate stats are converted to
+    volume-weighted contributions first, e.g. AB * (AVG - league AVG) and
+    IP * (league ERA - ERA), the same AB/PA/IP weighting analyze_team uses for
+    team totals, so a hot streak in 10 AB is not worth a full season.
+    Means and spreads come from rostered players; players outside a
+    category's population (hitters for pitching stats and vice versa) score 0.
+    Direction and volumes come from `spec` (a ScoringSpec, the built-in
+    STAT_SPECS when None) and are held as arrays, so score() handles every
+    category in one pass over the (players x categories) matrix; for a points
+    league it scores stats times points instead, with their matrix product as
+    'value'. Once fitted, score() can be applied to any rows with the same
+    columns, e.g. chunks of a streamed free-agent pool.
+    """
+
+    def __init__(self, table, categories, batting_categories, pitching_categories, spec=None):
+        # Hitters are whoever has PA (else AB), pitchers whoever has IP
+        self.hitter_volume = 'PA' if _has_volume(table, 'PA') else 'AB' if _has_volume(table, 'AB') else None
+        self.pitcher_volume = 'IP' if _has_volume(table, 'IP') else None
+        self.batting_categories = batting_categories
+        self.pitching_categories = pitching_categories
+        self.categories = [cat for cat in categories if cat in table.columns]
+        self.spec = spec if spec is not None else ScoringSpec(self.categories)
+        columns = self.spec.columns(self.categories)
+        self.points = self.spec.points[columns] if self.spec.points is not None else None
+        self._sign = self.spec.sign[columns]
+        self._volumes = [self.spec.volumes[j] for j in columns]
+        self._pitching = np.array([cat in pitching_categories for cat in self.categories], dtype=bool)
+        self._batting = np.array([cat in batting_categories and cat not in pitching_categories
+                                  for cat in self.categories], dtype=bool)
+        self.league_rates = {}
+        self.weighted = {}   # rate categories with volume data (else scored on the plain rate)
+        self.spreads = {}
+
+        rostered = table['rostered'].to_numpy() if 'rostered' in table.columns else np.ones(len(table), dtype=bool)
+        values, population, volume = self._inputs(table)
+        bases = population & rostered
+        bases = np.where(bases.any(axis=1)[:, None], bases, population)
+        for j, cat in enumerate(self.categories):
+            basis = bases[j]
+            if self._volumes[j] is not None:
+                self.weighted[cat] = volume[j, basis].sum() > 0
+                if self.weighted[cat]:
+                    self.league_rates[cat] = (values[j, basis] * volume[j, basis]).sum() / volume[j, basis].sum()
+                else:
+                    # No volume data at all: fall back to the unweighted rate
+                    self.league_rates[cat] = values[j, basis].mean() if basis.any() else 0.0
+        self._rates = np.array([self.league_rates.get(cat, 0.0) for cat in self.categories], dtype=float)
+        self._weighted = np.array([self.weighted.get(cat, False) for cat in self.categories], dtype=bool)
+        contribution = self._contribution(values, volume)
+        for j, cat in enumerate(self.categories):
+            basis = bases[j]
+            if basis.any():
+                self.spreads[cat] = (contribution[j, basis].mean(), contribution[j, basis].std())
+            else:
+                self.spreads[cat] = (0.0, 0.0)
+        self._means = np.array([self.spreads[cat][0] for cat in self.categories], dtype=float)[:, None]
+        self._stds = np.array([self.spreads[cat][1] for cat in self.categories], dtype=float)[:, None]
+
+    def _population(self, table, volume):
+        if volume is None or not len(table):
+            return None
+        if volume not in table.columns:
+            return np.zeros(len(table), dtype=bool)
+        return table[volume].fillna(0).to_numpy() > 0
+
+    def _inputs(self, table):
+        """(values, population mask, volumes) as (categories x players) arrays
+
+        Volumes are 0 where missing and for counting stats.
+        """
+        n = len(table)
+        values = np.empty((len(self.categories), n))
+        for j, cat in enumerate(self.categories):
+            values[j] = table[cat].to_numpy(dtype=float, na_value=np.nan)
+        population = ~np.isnan(values)
+        for mask, volume in ((self._pitching, self.pitcher_volume), (self._batting, self.hitter_volume)):
+            side = self._population(table, volume) if mask.any() else None
+            if side is not None:
+                population[mask] &= side
+
+        volume = np.zeros((len(self.categories), n))
+        columns = {}
+        for j, volume_col in enumerate(self._volumes):
+            if volume_col is not None and volume_col in table.columns:
+                if volume_col not in columns:
+                    columns[volume_col] = np.nan_to_num(table[volume_col].to_numpy(dtype=float, na_value=np.nan))
+                volume[j] = columns[volume_col]
+        return values, population, volume
+
+    def _contribution(self, values, volume):
+        # Counting stats are taken as they are, rates relative to the league (times volume when weighted)
+        contribution = values - self._rates[:, None]
+        contribution[self._weighted] *= volume[self._weighted]
+        contribution *= self._sign[:, None]
+        return contribution
+
+    @timed('CategoryScorer.score')
+    def score(self, table):
+        """Z-scores (or points) per category, plus their sum as 'value', for every row of `table`"""
+        values, population, volume = self._inputs(table)
+        if self.points is not None:
+            result = pd.DataFrame((np.nan_to_num(values) * self.points[:, None]).T, columns=self.categories,
+                                  index=table.index)
+            result['value'] = self.spec.points_value(values.T, self.categories)
+            return result
+        contribution = self._contribution(values, volume)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            contribution -= self._means
+            contribution /= self._stds
+        scores = np.where(population & (self._stds > 0), contribution, 0.0)
+        result = pd.DataFrame(scores.T, columns=self.categories, index=table.index)
+        result['value'] = scores.sum(axis=0)
+        return result
+
+
+@timed()
+def category_scores(table, categories, batting_categories, pitching_categories, spec=None):
+    """Per-category z-scores for every row of the player table (see CategoryScorer)"""
+    return CategoryScorer(table, categories, batting_categories, pitching_categories, spec).score(table)
+
+
+def team_category_scores(table, scores, categories):
+    """Sum of player z-scores per fantasy team, for rostered players in active slots"""
+    active = table['rostered'] & ~table['lineupSlot'].isin(['BE', 'IL'])
+    cats = [cat for cat in categories if cat in scores.columns]
+    return scores.loc[active, cats].groupby(table.loc[active, 'fantasy_team_id']).sum()
+
+
+def classify_categories(team_scores, team_id, categories, threshold=0.5):
+    """Strengths/weaknesses from a team's standing among all teams' z-score sums
+
+    A category is a strength when the team sits `threshold` standard deviations
+    above the league's team mean, and a weakness when it sits as far below.
+    """
+    strengths = []
+    weaknesses = []
+    if team_id not in team_scores.index:
+        return strengths, weaknesses
+    for cat in categories:
+        if cat not in team_scores.columns:
+            continue
+        column = team_scores[cat]
+        std = column.std()
+        if not std or np.isnan(std):
+            continue
+        standing = (column.loc[team_id] - column.mean()) / std
+        if standing >= threshold:
+            strengths.append(cat)
+        elif standing <= -threshold:
+            weaknesses.append(cat)
+    return strengths, weaknesses
+
+
+def projection_blender(registry, recent_weight=PROJECTION_RECENT_WEIGHT, rate_volume=None):
+    """ProjectionBlender for a registry's field layout, using the configured weights"""
+    return ProjectionBlender(registry.fields, registry.categories, BATTING_CATEGORIES, PITCHING_CATEGORIES,
+                             PROJECTION_STABILIZATION, recent_weight, rate_volume)
+
+
+def stack_records(records, registry):
+    """(season, projected) matrices for PlayerRecords, NaN where a record has no such stats
+
+    A record whose season line came from its projection (empty season
+    breakdown) has no season stats of its own.
+    """
+    width = len(registry.fields)
+    season = np.vstack([record.stats for record in records]) if records else np.empty((0, width))
+    missing = np.full(width, np.nan)
+    projected = (np.vstack([missing if record.projected is None else record.projected for record in records])
+                 if records else np.empty((0, width)))
+    season[[record.projected is record.stats for record in records]] = np.nan
+    return season, projected
+
+
+def blended_table(table, records, registry, recent=None, recent_weight=PROJECTION_RECENT_WEIGHT,
+                  rate_volume=None):
+    """Copy of a player table with categories and AB/PA/IP replaced by blended projections"""
+    season, projected = stack_records(records, registry)
+    blended = projection_blender(registry, recent_weight, rate_volume).blend(season, projected, recent)
+    result = table.copy()
+    for j, field in enumerate(registry.fields):
+        # Same conventions as the player table: missing categories 0, missing volume NaN
+        result[field] = np.nan_to_num(blended[:, j], nan=0.0) if field in registry.categories else blended[:, j]
+    return result
+
+
+def projection_table(context, days=PROJECTION_RECENT_DAYS, weight=PROJECTION_RECENT_WEIGHT):
+    """The context's player table on blended rest-of-season projections, cached per table snapshot
+
+    Season stats, the projected breakdowns the records carry (contexts built
+    with projections=True) and, with a stat history, the last `days` days
+    are blended in one batched pass over every player.
+    """
+    def compute(table):
+        registry = context.registry
+        recent = None
+        history = getattr(context, 'history', None)
+        if history is not None and days and weight:
+            recent = recent_table(history, context.league, table, days, registry.fields)
+            recent = recent.reindex(columns=registry.fields).to_numpy(dtype=float)
+        return blended_table(table, context.table_records(), registry, recent, weight, context.spec.rate_volume)
+    return context.memoize_table(f"projection_table:{days}:{weight}", compute)
+
+
+def scoring_table(context):
+    """The table players are valued on: blended projections with PROJECTIONS, else season stats"""
+    return projection_table(context) if PROJECTIONS else context.player_table()
+
+
+def league_scorer(context):
+    """CategoryScorer fitted on the context's scoring table, cached with it"""
+    return context.memoize_table('category_scorer', lambda table: CategoryScorer(
+        scoring_table(context), ALL_CATEGORIES, BATTING_CATEGORIES, PITCHING_CATEGORIES, context.spec))
+
+
+def league_scores(context):
+    """Z-scores for the context's scoring table, computed once per table snapshot"""
+    return context.memoize_table('category_scores', lambda table: league_scorer(context).score(
+        scoring_table(context)))
+
+
+def league_team_scores(context):
+    """Per-team z-score sums for the context's player table, cached alongside it"""
+    scores = league_scores(context)
+    return context.memoize_table('team_category_scores', lambda table: team_category_scores(
+        table, scores, ALL_CATEGORIES))
+
+
+def blend_scores(season, recent, weight):
+    """Mix season and recent-form z-scores; players without recent data keep season scores"""
+    cats = [cat for cat in season.columns if cat != 'value' and cat in recent.columns]
+    has_recent = recent['has_recent'].to_numpy() if 'has_recent' in recent.columns else np.ones(len(season), dtype=bool)
+    blended = season.copy()
+    mixed = (1 - weight) * season[cats].to_numpy() + weight * recent[cats].to_numpy()
+    blended[cats] = np.where(has_recent[:, None], mixed, season[cats].to_numpy())
+    blended['value'] = blended[cats].sum(axis=1) if cats else 0.0
+    return blended
+
+
+def ranking_scores(context, days=RECENT_FORM_DAYS, weight=RECENT_FORM_WEIGHT):
+    """Scores the waiver and trade rankers order players by
+
+    Season z-scores, blended with z-scores over the last `days` days when the
+    context has a stat history and `weight` is above zero. With PROJECTIONS
+    recent form is already part of the blended projections.
+    """
+    season = league_scores(context)
+    history = getattr(context, 'history', None)
+    if history is None or not weight or PROJECTIONS:
+        return season
+
+    def compute(table):
+        recent = recent_table(history, context.league, table, days, ALL_CATEGORIES)
+        recent_scores = category_scores(recent, ALL_CATEGORIES, BATTING_CATEGORIES, PITCHING_CATEGORIES,
+                                        context.spec)
+        recent_scores['has_recent'] = recent['days'].notna().to_numpy()
+        return blend_scores(season, recent_scores, weight)
+    return context.memoize_table(f"ranking_scores:{days}:{weight}", compute)
+
+
+def warm_context(context, free_agents=True):
+    """Build everything the analyses share: league averages, the free-agent pool, table and scores"""
+    context.league_averages()
+    if free_agents:
+        context.free_agents(FREE_AGENT_POOL_SIZE, page_size=FREE_AGENT_PAGE_SIZE,
+                            concurrency=FREE_AGENT_CONCURRENCY, positions=FREE_AGENT_POSITIONS)
+    context.player_table()
+    league_scores(context)
+    league_team_scores(context)
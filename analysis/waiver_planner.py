@@ -0,0 +1,288 @@
+import numpy as np
+import pandas as pd
+from config import ALL_CATEGORIES, LINEUP_SLOTS, WAIVER_PLAN_MOVES, WAIVER_PLAN_CANDIDATES
+from analysis.trade_engine import player_contributions, category_values, standings_points
+from analysis.lineup import slot_list, table_eligibility, filled_slots, optimize_lineup
+from analysis.valuation import league_scorer, scoring_table
+from utils.instrumentation import timed, count
+
+# Positions only a pitcher fills; pitchers are swapped for pitchers, hitters for hitters
+PITCHER_POSITIONS = ('SP', 'RP', 'P')
+
+# Local-search sweeps over the plan before settling for what greedy found
+MAX_SWEEPS = 10
+
+# Searches run, each started from one of the best single claims
+RESTARTS = 5
+
+# Standings points are multiples of 0.5; smaller differences are float residue
+EPSILON = 1e-9
+
+
+class ClaimPlanner:
+    """Best set of add/drop pairs for one roster, scored by roto standings points
+
+    My category values are sums of per-player numerators and denominators,
+    as in the trade engine, so any plan is the current sums plus the deltas
+    of its pairs. The (adds x drops x categories) deltas are built once;
+    every greedy step and every local-search move then scores all open pairs
+    against the plan so far in one broadcast pass instead of re-totalling
+    the roster per candidate. Plans are compared by standings points against
+    the other (fixed) teams, then by the z-score value they add. `allowed`
+    masks the (adds x drops) pairs that may be claimed at all and
+    `feasible(plan)`, when given, vets every plan before it is accepted.
+    """
+
+    def __init__(self, base_num, base_den, add_num, add_den, add_value, drop_num, drop_den, drop_value,
+                 others, is_rate, lower_is_better, allowed=None, feasible=None):
+        self.base_num = base_num
+        self.base_den = base_den
+        self.others = others
+        self.is_rate = is_rate
+        self.lower_is_better = lower_is_better
+        self.delta_num = add_num[:, None, :] - drop_num[None, :, :]
+        self.delta_den = add_den[:, None, :] - drop_den[None, :, :]
+        self.delta_value = add_value[:, None] - drop_value[None, :]
+        shape = self.delta_value.shape
+        self.allowed = np.ones(shape, dtype=bool) if allowed is None else allowed
+        self.feasible = feasible
+        self.evaluated = 0
+
+    def category_points(self, num, den):
+        """Standings points per category for my sums (leading axes are kept)"""
+        values = category_values(num, den, self.is_rate)
+        return standings_points(values, self.others, self.lower_is_better)
+
+    def points(self, num, den):
+        return self.category_points(num, den).sum(axis=-1)
+
+    def totals(self, plan):
+        """(numerators, denominators, value delta) of my roster after a plan"""
+        num, den, value = self.base_num.copy(), self.base_den.copy(), 0.0
+        for add, drop in plan:
+            num += self.delta_num[add, drop]
+            den += self.delta_den[add, drop]
+            value += self.delta_value[add, drop]
+        return num, den, value
+
+    def _best_pairs(self, plan, k=1):
+        """(add, drop, points, value delta) of the k best open pairs on top of a plan"""
+        mask = self._open(plan)
+        if not mask.any():
+            return []
+        num, den, _ = self.totals(plan)
+        adds, drops = np.nonzero(mask)
+        self.evaluated += len(adds)
+        points = self.points(num + self.delta_num[adds, drops], den + self.delta_den[adds, drops])
+        value = self.delta_value[adds, drops]
+        best = []
+        for j in np.lexsort((-value, -points)):
+            pair = (int(adds[j]), int(drops[j]))
+            if self.feasible is None or self.feasible(plan + [pair]):
+                best.append(pair + (float(points[j]), float(value[j])))
+                if len(best) == k:
+                    break
+        return best
+
+    def _open(self, plan):
+        mask = self.allowed.copy()
+        for add, drop in plan:
+            mask[add, :] = False
+            mask[:, drop] = False
+        return mask
+
+    def score(self, plan):
+        """(standings points, value delta) of a plan"""
+        num, den, value = self.totals(plan)
+        return float(self.points(num, den)), value
+
+    def plan(self, moves, starts=RESTARTS):
+        """Up to `moves` (add, drop) index pairs: greedy, then pair-by-pair local search
+
+        Greedy fills every slot with the best open pair even when it costs
+        points, since two claims can pay off together when neither does alone
+        (a second closer passing a rival in saves). Local search then takes
+        each pair out in turn and puts back the best open pair, or leaves the
+        slot empty when that scores higher, until a sweep changes nothing.
+        This runs from each of the `starts` best single pairs and the best
+        plan wins.
+        """
+        best_plan, best_score = [], self.score([])
+        for first in self._best_pairs([], starts) if moves > 0 else []:
+            plan, score = self._search([first[:2]], moves)
+            if _better(score, best_score):
+                best_plan, best_score = plan, score
+        count('claim_pairs_evaluated', self.evaluated)
+        return best_plan
+
+    def _search(self, plan, moves):
+        """Fill `plan` greedily up to `moves` pairs, then improve it pair by pair"""
+        while len(plan) < moves:
+            best = self._best_pairs(plan)
+            if not best:
+                break
+            plan.append(best[0][:2])
+
+        score = self.score(plan)
+        for _ in range(MAX_SWEEPS):
+            improved = False
+            for i in range(min(len(plan) + 1, moves)):
+                rest = plan[:i] + plan[i + 1:]
+                rest_num, rest_den, rest_value = self.totals(rest)
+                options = []
+                if self.feasible is None or self.feasible(rest):
+                    options.append((float(self.points(rest_num, rest_den)), rest_value, None))
+                options += [(points, rest_value + value, (add, drop))
+                            for add, drop, points, value in self._best_pairs(rest)]
+                for option in options:
+                    if _better(option[:2], score):
+                        plan = rest[:i] + ([option[2]] if option[2] else []) + rest[i:]
+                        score = option[:2]
+                        improved = True
+            if not improved:
+                break
+        return plan, score
+
+
+class LineupCoverage:
+    """Keeps claims from leaving a lineup slot that nobody on the roster can fill
+
+    `mine` and `adds` are (players x slots) eligibility matrices over the
+    expanded lineup slots. A plan is feasible when the roster after it fills
+    as many slots as it does now, counted with the lineup solver.
+    pairs() pre-screens single claims: only a starter whose slot nobody on
+    the bench can take over needs checking, and then only once per distinct
+    eligibility of the players that could replace him. feasible() checks
+    whole plans and remembers each answer.
+    """
+
+    def __init__(self, mine, adds, slots):
+        self.mine = mine
+        self.adds = adds
+        self.slots = slots
+        self.filled = filled_slots(mine, slots)
+        self._plans = {}
+
+    def _keeps_lineup(self, keep, added):
+        return filled_slots(np.vstack([self.mine[keep], added]), self.slots) >= self.filled
+
+    def pairs(self):
+        """(adds x drops) mask of single claims that keep every fillable slot filled"""
+        allowed = np.ones((len(self.adds), len(self.mine)), dtype=bool)
+        if not self.filled:
+            return allowed
+        lineup = optimize_lineup(np.zeros(len(self.mine)), self.mine, self.slots)
+        signatures, inverse = np.unique(self.adds, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        for drop in lineup[lineup >= 0].tolist():
+            keep = np.arange(len(self.mine)) != drop
+            if self._keeps_lineup(keep, self.adds[:0]):
+                continue
+            for s, signature in enumerate(signatures):
+                # A player eligible wherever the dropped one was can simply take his place
+                covers = bool((signature >= self.mine[drop]).all())
+                allowed[inverse == s, drop] = covers or self._keeps_lineup(keep, signature[None, :])
+        return allowed
+
+    def feasible(self, plan):
+        """Whether a list of (add, drop) index pairs keeps every fillable slot filled"""
+        # Single claims were screened by pairs()
+        if len(plan) <= 1 or not self.filled:
+            return True
+        key = frozenset(plan)
+        if key not in self._plans:
+            keep = np.ones(len(self.mine), dtype=bool)
+            keep[[drop for _, drop in plan]] = False
+            self._plans[key] = self._keeps_lineup(keep, self.adds[[add for add, _ in plan]])
+        return self._plans[key]
+
+
+def _better(score, than):
+    """Whether (points, value) beats another: more points, or as many and more value"""
+    if score[0] > than[0] + EPSILON:
+        return True
+    return abs(score[0] - than[0]) <= EPSILON and score[1] > than[1] + EPSILON
+
+
+@timed()
+def plan_claims(context, my_team, candidates, categories=ALL_CATEGORIES, moves=WAIVER_PLAN_MOVES,
+                pool=WAIVER_PLAN_CANDIDATES):
+    """Best set of up to `moves` waiver claims (add a free agent, drop one of mine)
+
+    `candidates` is a table of free agents (e.g. the filtered pool from
+    waiver_recommendations); the `pool` most valuable by z-score value are
+    paired with every player on my roster. Pitchers only replace pitchers,
+    hitters hitters, and no set of claims may leave a LINEUP_SLOTS slot
+    unfilled that my roster can fill today. In a points league the only category is fantasy points
+    (PTS). Returns {'claims': one dict per pair in plan order with
+    its standings gain given the claims before it, 'standings_before',
+    'standings_after', 'evaluated': pairs scored}.
+    """
+    table = scoring_table(context)
+    rostered = table[table['rostered']]
+    categories = [cat for cat in categories if cat in rostered.columns and cat in candidates.columns]
+    result = {'claims': [], 'standings_before': 0.0, 'standings_after': 0.0, 'evaluated': 0}
+    if rostered.empty or candidates.empty or not categories:
+        return result
+
+    scorer = league_scorer(context)
+    combined = pd.concat([rostered, candidates], ignore_index=True)
+    value = scorer.score(combined)['value'].to_numpy(dtype=float)
+    if context.spec.points is not None:
+        # Points league: teams are ranked on one column, their fantasy points
+        categories = ['PTS']
+        num, den = value[:, None], np.zeros((len(value), 1))
+        is_rate, lower_is_better = np.zeros(1, dtype=bool), np.zeros(1, dtype=bool)
+    else:
+        num, den, is_rate = player_contributions(combined, categories, context.spec.rate_volume)
+        lower_is_better = context.spec.lower(categories)
+
+    owners = combined['fantasy_team_id'].to_numpy(dtype=np.int64).copy()
+    owners[len(rostered):] = -1
+    mine = np.flatnonzero(owners == my_team.team_id)
+    if not len(mine):
+        return result
+    adds = len(rostered) + np.argsort(-value[len(rostered):], kind='stable')
+    if pool is not None:
+        adds = adds[:pool]
+    others = np.array([category_values(num[owners == team_id].sum(axis=0), den[owners == team_id].sum(axis=0),
+                                       is_rate)
+                       for team_id in np.unique(owners[:len(rostered)]) if team_id != my_team.team_id])
+    others = others.reshape(-1, len(categories))
+
+    pitcher = combined['position'].astype(object).isin(PITCHER_POSITIONS).to_numpy()
+    slots = slot_list(LINEUP_SLOTS)
+    eligibility = table_eligibility(combined, slots)
+    lineup = LineupCoverage(eligibility[mine], eligibility[adds], slots)
+    planner = ClaimPlanner(num[mine].sum(axis=0), den[mine].sum(axis=0),
+                           num[adds], den[adds], value[adds], num[mine], den[mine], value[mine],
+                           others, is_rate, lower_is_better,
+                           allowed=(pitcher[adds][:, None] == pitcher[mine][None, :]) & lineup.pairs(),
+                           feasible=lineup.feasible)
+    plan = planner.plan(moves)
+
+    names = combined['name'].to_numpy()
+    positions = combined['position'].astype(object).to_numpy()
+    ids = combined['id'].to_numpy()
+    before = planner.category_points(planner.base_num, planner.base_den)
+    result['standings_before'] = float(before.sum())
+    result['evaluated'] = planner.evaluated
+    for step, (add, drop) in enumerate(plan):
+        after = planner.category_points(*planner.totals(plan[:step + 1])[:2])
+        gain = after - before
+        add_row, drop_row = adds[add], mine[drop]
+        result['claims'].append({
+            'add': names[add_row],
+            'add_id': int(ids[add_row]),
+            'add_position': positions[add_row],
+            'drop': names[drop_row],
+            'drop_id': int(ids[drop_row]),
+            'drop_position': positions[drop_row],
+            'standings_gain': float(gain.sum()),
+            'value_gain': float(planner.delta_value[add, drop]),
+            'improves': [cat for cat, delta in zip(categories, gain) if delta > 0],
+            'hurts': [cat for cat, delta in zip(categories, gain) if delta < 0],
+        })
+        before = after
+    result['standings_after'] = float(before.sum())
+    return result
@@ -1,116 +1,209 @@
-import pandas as pd
-from config import ALL_CATEGORIES, BATTING_CATEGORIES, PITCHING_CATEGORIES
-from utils.data_helpers import extract_player_stats
+import math
+import numpy as np
+from config import (ALL_CATEGORIES, FREE_AGENT_POOL_SIZE, FREE_AGENT_PAGE_SIZE, FREE_AGENT_CONCURRENCY,
+                    FREE_AGENT_POSITIONS, CATEGORY_MODEL, FREE_AGENT_STREAMING, STREAM_CHUNK_SIZE, PROJECTIONS,
+                    WAIVER_PLAN_CANDIDATES)
+from utils.league_context import LeagueContext
+from utils.free_agents import free_agent_transport
+from utils.player_stream import stream_pages, stream_records, TopK
+from utils.player_records import PlayerRegistry
+from utils.player_table import records_to_table
+from analysis.ranking import rank_category_leaders, ranking_keys
+from analysis.valuation import ranking_scores, league_scorer, scoring_table, blended_table
 from analysis.team_analysis import analyze_team
+from analysis.waiver_planner import plan_claims
+from utils.instrumentation import timed, timer
 
-def waiver_recommendations(league, my_team):
-    """Find valuable players on the waiver wire"""
+# Injury statuses still worth picking up when injured players are excluded
+HEALTHY_STATUSES = ['ACTIVE', 'NA', 'PROBABLE', 'QUESTIONABLE']
+
+
+def _records_table(context, records, registry):
+    """Player table for streamed records, blended like each chunk with PROJECTIONS"""
+    table = records_to_table(records, registry)
+    if PROJECTIONS:
+        table = blended_table(table, records, registry, recent_weight=0.0, rate_volume=context.spec.rate_volume)
+    return table
+
+@timed()
+def stream_free_agent_leaders(context, categories, k, include_injured, transport=None,
+                              max_players=FREE_AGENT_POOL_SIZE, chunk_size=STREAM_CHUNK_SIZE,
+                              candidates=WAIVER_PLAN_CANDIDATES):
+    """Top-k free agents per category, ranked chunk by chunk as the pool streams in
+
+    Pages are turned into PlayerRecords, scored with the z-score model fitted
+    on the league table (or ranked on raw values under the threshold model)
+    and folded into running per-category heaps, so memory stays at one chunk
+    plus k players per category however large the pool. With PROJECTIONS each
+    chunk is blended before scoring (without recent form, which needs the
+    stat history of the whole table); otherwise season z-scores only. A
+    second heap keeps the `candidates` most valuable players by z-score value
+    (None keeps all) for the claim planner, which ranks its pool the same way
+    on the table path. Returns (table of the leaders, {category: iloc
+    positions best first}, table of the planner candidates, players with
+    stats seen, injured or not).
+    """
+    categories = [cat for cat in categories if cat in context.categories]
+    value_scorer = league_scorer(context)
+    scorer = value_scorer if CATEGORY_MODEL == 'zscore' else None
+    if scorer is not None:
+        categories = [cat for cat in categories if cat in scorer.categories]
+    healthy_leaders = TopK(categories, k)
+    all_leaders = TopK(categories, k)
+    pool_size = math.inf if candidates is None else candidates
+    healthy_pool = TopK(['value'], pool_size)
+    all_pool = TopK(['value'], pool_size)
+    # A private registry: interning every streamed name would grow with the pool
+    registry = PlayerRegistry(context.categories, intern_names=False, projections=PROJECTIONS)
+    pages = stream_pages(transport or free_agent_transport(context.league), page_size=FREE_AGENT_PAGE_SIZE,
+                         positions=FREE_AGENT_POSITIONS, max_players=max_players)
+    for records in stream_records(pages, registry, chunk_size):
+        chunk = _records_table(context, records, registry)
+        scored = value_scorer.score(chunk)
+        scores = scored[categories].to_numpy(dtype=float) if scorer is not None else None
+        keys = ranking_keys(chunk[categories].to_numpy(dtype=float, na_value=np.nan), categories, scores=scores,
+                            spec=context.spec)
+        value = scored['value'].to_numpy(dtype=float)
+        value_keys = np.where(np.isnan(value), np.inf, -value)[:, None]
+        all_leaders.push(keys, records)
+        all_pool.push(value_keys, records)
+        if not include_injured:
+            healthy = chunk['injuryStatus'].isin(HEALTHY_STATUSES).to_numpy()
+            healthy_records = [record for record, ok in zip(records, healthy) if ok]
+            healthy_leaders.push(keys[healthy], healthy_records)
+            healthy_pool.push(value_keys[healthy], healthy_records)
+
+    leaders, pool = all_leaders, all_pool
+    if not include_injured:
+        if healthy_leaders.seen:
+            leaders, pool = healthy_leaders, healthy_pool
+        elif all_leaders.seen:
+            print("No active players found. Showing all players including injured.")
+    ranked = leaders.results()
+
+    # One row per distinct leader; positions point into that small table
+    records, row_of = [], {}
+    for items in ranked.values():
+        for record in items:
+            if id(record) not in row_of:
+                row_of[id(record)] = len(records)
+                records.append(record)
+    table = _records_table(context, records, registry)
+    positions = {cat: np.array([row_of[id(record)] for record in items], dtype=np.int64)
+                 for cat, items in ranked.items()}
+    return table, positions, _records_table(context, pool.results()['value'], registry), all_leaders.seen
+
+@timed()
+def waiver_recommendations(league, my_team, context=None, include_injured=None, all_categories=None):
+    """Find valuable players on the waiver wire
+    
+    include_injured/all_categories answer the interactive prompts up front
+    (None asks the user). Returns the recommendations as a dict, or None when
+    there is nothing to analyze.
+    """
     print("\n--- WAIVER WIRE RECOMMENDATIONS ---")
+    if context is None:
+        context = LeagueContext(league, ALL_CATEGORIES)
     
     # Get team weaknesses
-    strengths, weaknesses = analyze_team(league, my_team)
+    strengths, weaknesses = analyze_team(league, my_team, context)
     
     if not weaknesses:
         print("\nYour team has no clear weaknesses to address.")
-        print("Would you like to see top available players in all categories? (y/n)")
-        response = input("> ").lower()
-        if response == 'y':
+        if all_categories is None:
+            print("Would you like to see top available players in all categories? (y/n)")
+            all_categories = input("> ").lower() == 'y'
+        if all_categories:
             weaknesses = ALL_CATEGORIES
         else:
             return
 
     # Get free agents
     print("\nSearching free agents...")
-    free_agents = league.free_agents(size=100)  # Top 100 free agents
-    print(f"Found {len(free_agents)} free agents. Analyzing stats...")
- 
-    fa_stats = []
-    for player in free_agents:
-        player_data = extract_player_stats(player, ALL_CATEGORIES)
-        if player_data:  
-            fa_stats.append(player_data)
-    if not fa_stats:
-        print("No usable stats found for free agents.")
-        return
-    fa_df = pd.DataFrame(fa_stats)
-    
-    # Filter out injured players (with option to include)
-    include_injured = input("Include injured players? (y/n): ").lower() == 'y'
-    if not include_injured:
-        if 'injuryStatus' in fa_df.columns:
-            active_fa = fa_df[fa_df['injuryStatus'].isin(['ACTIVE', 'NA', 'PROBABLE', 'QUESTIONABLE'])]
+    if FREE_AGENT_STREAMING:
+        if include_injured is None:
+            include_injured = input("Include injured players? (y/n): ").lower() == 'y'
+        active_fa, leaders, plan_pool, scanned = stream_free_agent_leaders(context, weaknesses, 5, include_injured,
+                                                                            max_players=FREE_AGENT_POOL_SIZE)
+        if not scanned:
+            print("No usable stats found for free agents.")
+            return
+        print(f"Analyzed {scanned} available players in chunks of {STREAM_CHUNK_SIZE}")
+    else:
+        fetch_options = {
+            'page_size': FREE_AGENT_PAGE_SIZE,
+            'concurrency': FREE_AGENT_CONCURRENCY,
+            'positions': FREE_AGENT_POSITIONS,
+        }
+        free_agents = context.free_agents(FREE_AGENT_POOL_SIZE, **fetch_options)
+        print(f"Found {len(free_agents)} free agents. Analyzing stats...")
+
+        fa_df = context.free_agent_table(FREE_AGENT_POOL_SIZE, **fetch_options)
+        fa_df = scoring_table(context).loc[fa_df.index]
+        if fa_df.empty:
+            print("No usable stats found for free agents.")
+            return
+
+        # Filter out injured players (with option to include)
+        if include_injured is None:
+            include_injured = input("Include injured players? (y/n): ").lower() == 'y'
+        if not include_injured:
+            if 'injuryStatus' in fa_df.columns:
+                active_fa = fa_df[fa_df['injuryStatus'].isin(HEALTHY_STATUSES)]
+            else:
+                active_fa = fa_df[~fa_df['injured']]
+
+            if active_fa.empty:
+                print("No active players found. Showing all players including injured.")
+                active_fa = fa_df
         else:
-            active_fa = fa_df[~fa_df['injured']]
-            
-        if active_fa.empty:
-            print("No active players found. Showing all players including injured.")
             active_fa = fa_df
-    else:
-        active_fa = fa_df
-    
-    print(f"Analyzing {len(active_fa)} available players...")
-    
+
+        print(f"Analyzing {len(active_fa)} available players...")
+
+        # Rank every weak category in one batched pass (ERA/WHIP ascending,
+        # position players filtered out of pitching categories by the sanity bounds)
+        scores = ranking_scores(context) if CATEGORY_MODEL == 'zscore' else None
+        leaders = rank_category_leaders(active_fa, weaknesses, 5, scores=scores, spec=context.spec)
+        plan_pool = active_fa
+
     # Find players who help in weak categories
     recommendations = []
-    
-    for weakness in weaknesses:
-        print(f"\nTop free agents for {weakness}:")
+    recommendation_rows = []
+
+    with timer('waiver_wire.category_loop'):
+        for weakness in weaknesses:
+            print(f"\nTop free agents for {weakness}:")
         
-        # Skip processing if category not in DataFrame
-        if weakness not in active_fa.columns:
-            print(f"  No data available for {weakness}")
-            continue
-            
-        if weakness in PITCHING_CATEGORIES:
-            # For pitching categories
-            valid_players = active_fa[active_fa[weakness].notna()]
-            
-            if weakness in ['ERA', 'WHIP']:
-                # For ERA/WHIP: 
-                # 1. Exclude zeros (likely position players)
-                # 2. Include reasonable ranges for these stats
-                filtered_players = valid_players[(valid_players[weakness] > 0) & 
-                                               (valid_players[weakness] < 10)] 
-            
-            elif weakness in ['W', 'SV', 'K']:
-                # For W/SV/K:
-                # Include only players with non-zero values (actual pitchers)
-                filtered_players = valid_players[valid_players[weakness] > 0]
-            
-            else:
-                filtered_players = valid_players
-            
-            if filtered_players.empty:
-                print(f"  No players found with valid {weakness} stats")
+            # Skip processing if category not in DataFrame
+            if weakness not in leaders:
+                print(f"  No data available for {weakness}")
                 continue
             
-            if weakness in ['ERA', 'WHIP']:
-                top_players = filtered_players.sort_values(by=weakness, ascending=True).head(5)
-            else:
-                top_players = filtered_players.sort_values(by=weakness, ascending=False).head(5)
-            
-        else: 
-            # For batting categories
-            valid_players = active_fa[active_fa[weakness].notna()]
-            
-            if valid_players.empty:
+            if len(leaders[weakness]) == 0:
                 print(f"  No players found with valid {weakness} stats")
                 continue
-                
-            top_players = valid_players.sort_values(by=weakness, ascending=False).head(5)
         
-        # Display and record recommendations
-        for _, player in top_players.iterrows():
-            status = f" [INJURED: {player['injuryStatus']}]" if player.get('injured', False) else ""
+            top_players = active_fa.iloc[leaders[weakness]]
+        
+            # Display and record recommendations
+            for _, player in top_players.iterrows():
+                status = f" [INJURED: {player['injuryStatus']}]" if player.get('injured', False) else ""
             
-            # Format the value based on category type
-            if weakness in ['ERA', 'WHIP', 'AVG', 'OBP']:
-                formatted_value = f"{player[weakness]:.3f}"
-            else:
-                formatted_value = f"{player[weakness]:.0f}"
+                # Format the value based on category type
+                formatted_value = context.spec.format(weakness, player[weakness])
                 
-            print(f"- {player['name']} ({player['position']}, {player['team']}): {formatted_value}{status}")
-            recommendations.append((player['name'], player['position'], weakness, player[weakness]))
+                print(f"- {player['name']} ({player['position']}, {player['team']}): {formatted_value}{status}")
+                recommendations.append((player['name'], player['position'], weakness, player[weakness]))
+                recommendation_rows.append({
+                    'category': weakness,
+                    'id': int(player['id']),
+                    'name': player['name'],
+                    'position': player['position'],
+                    'team': player['team'],
+                    'value': float(player[weakness]),
+                    'injuryStatus': player['injuryStatus'],
+                })
             
     # Recommended pickups
     if recommendations:
@@ -121,10 +214,7 @@ def waiver_recommendations(league, my_team):
             if name not in player_recommendations:
                 player_recommendations[name] = {"position": pos, "helps_with": []}
             
-            if cat in ['ERA', 'WHIP', 'AVG', 'OBP']:
-                formatted_value = f"{value:.3f}"
-            else:
-                formatted_value = f"{value:.0f}"
+            formatted_value = context.spec.format(cat, value)
                 
             player_recommendations[name]["helps_with"].append(f"{cat}: {formatted_value}")
         
@@ -132,4 +222,26 @@ def waiver_recommendations(league, my_team):
             helps_with = ", ".join(details["helps_with"])
             print(f"* {name} ({details['position']}) - Helps with: {helps_with}")
     else:
-        print("\nNo suitable recommendations found. Try including injured players or checking more categories.")
\ No newline at end of file
+        print("\nNo suitable recommendations found. Try including injured players or checking more categories.")
+
+    # Best set of add/drop pairs by projected standings points
+    plan = plan_claims(context, my_team, plan_pool)
+    if plan['claims']:
+        print("\nSuggested Claims (by projected standings points):")
+        for claim in plan['claims']:
+            effects = ", ".join(claim['improves']) or "value only"
+            if claim['hurts']:
+                effects += f"; hurts {', '.join(claim['hurts'])}"
+            print(f"* Add {claim['add']} ({claim['add_position']}) / Drop {claim['drop']} ({claim['drop_position']}): "
+                  f"{claim['standings_gain']:+.1f} standings points - {effects}")
+        print(f"Standings points: {plan['standings_before']:.1f} -> {plan['standings_after']:.1f} "
+              f"({plan['evaluated']} pairs evaluated)")
+
+    return {
+        'team_id': my_team.team_id,
+        'team_name': my_team.team_name,
+        'weaknesses': list(weaknesses),
+        'include_injured': include_injured,
+        'recommendations': recommendation_rows,
+        'claims': plan['claims'],
+    }
\ No newline at end of file
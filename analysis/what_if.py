@@ -0,0 +1,267 @@
+import numpy as np
+from config import ALL_CATEGORIES, CATEGORY_MODEL, ZSCORE_THRESHOLD, FREE_AGENT_POOL_SIZE
+from utils.league_context import LeagueContext
+from utils.instrumentation import timed
+from analysis.valuation import league_scores, league_team_scores
+
+
+def scenario(add=(), drop=(), label=None):
+    """A hypothetical move for my team: player ids to add and to drop
+
+    Added players may be free agents or rostered elsewhere; when any of them
+    is on another team the move is a trade and the dropped players go to that
+    team, otherwise they go to free agency.
+    """
+    add = [int(player_id) for player_id in add]
+    drop = [int(player_id) for player_id in drop]
+    if label is None:
+        label = ' '.join([f"+{player_id}" for player_id in add] + [f"-{player_id}" for player_id in drop])
+    return {'add': add, 'drop': drop, 'label': label}
+
+
+def waiver_scenarios(waivers, drop=()):
+    """One add per free agent recommended by waiver_recommendations()"""
+    seen = set()
+    scenarios = []
+    for row in (waivers or {}).get('recommendations') or []:
+        if row['id'] in seen:
+            continue
+        seen.add(row['id'])
+        scenarios.append(scenario([row['id']], drop, label=f"add {row['name']}"))
+    return scenarios
+
+
+def trade_scenarios(trades):
+    """One swap per trade found by trade_recommendations()' whole-profile search"""
+    return [scenario(trade['receive_ids'], trade['give_ids'],
+                     label=f"{', '.join(trade['give'])} for {', '.join(trade['receive'])}")
+            for trade in (trades or {}).get('best_trades') or []]
+
+
+class WhatIf:
+    """Batched evaluation of hypothetical roster moves for one team
+
+    The league's per-team running sums and per-team z-score sums are shared,
+    read-only, by every scenario; a scenario only carries the deltas of the
+    players it moves. A batch of K scenarios is stacked into (K x teams)
+    arrays and every team's averages, the league averages and my category
+    standing are recomputed for all of them in a few vectorized passes.
+    Player z-scores are held at their current values.
+    """
+
+    def __init__(self, context, my_team, categories=ALL_CATEGORIES, model=CATEGORY_MODEL,
+                 threshold=ZSCORE_THRESHOLD):
+        self.context = context
+        self.my_team = my_team
+        self.model = model
+        self.threshold = threshold
+        self.totals = context.totals
+        table = context.player_table()
+        self.categories = [cat for cat in categories if cat in self.totals.categories]
+        self._columns = [self.totals.categories.index(cat) for cat in self.categories]
+
+        self.team_ids = [team.team_id for team in context.league.teams]
+        self._team_index = {team_id: i for i, team_id in enumerate(self.team_ids)}
+        self.mine = self._team_index[my_team.team_id]
+        self.base_sums = self.totals.team_matrix(self.team_ids)
+
+        # Per-player vectors: exact ones for rostered players, table-built for free agents
+        self.ids = table['id'].to_numpy()
+        self.names = table['name'].to_numpy()
+        self._row = {int(player_id): i for i, player_id in enumerate(self.ids)}
+        self.owner = table['fantasy_team_id'].to_numpy()
+        self.vectors = self.totals.table_vectors(table)
+        for team_id in self.team_ids:
+            for player_id, vector in self.totals.members(team_id).items():
+                if player_id in self._row:
+                    self.vectors[self._row[player_id]] = vector
+
+        scores = league_scores(context)
+        self.scores = np.zeros((len(table), len(self.categories)))
+        for j, cat in enumerate(self.categories):
+            if cat in scores.columns:
+                self.scores[:, j] = scores[cat].to_numpy(dtype=float)
+        self.base_team_scores = (league_team_scores(context).reindex(self.team_ids)
+                                 .reindex(columns=self.categories).fillna(0.0).to_numpy(dtype=float))
+
+    def _moves(self, scenario):
+        """(team index, table row, sign) for every player a scenario moves"""
+        moves = []
+        partner = None
+        for player_id in scenario['add']:
+            if player_id not in self._row:
+                raise ValueError(f"Unknown player id {player_id}")
+            row = self._row[player_id]
+            owner = self.owner[row]
+            if owner == self.my_team.team_id:
+                raise ValueError(f"{self.names[row]} is already on {self.my_team.team_name}")
+            if owner in self._team_index:
+                moves.append((self._team_index[owner], row, -1))
+                partner = self._team_index[owner] if partner is None else partner
+            moves.append((self.mine, row, 1))
+        for player_id in scenario['drop']:
+            row = self._row.get(player_id)
+            if row is None or self.owner[row] != self.my_team.team_id:
+                raise ValueError(f"Player {player_id} is not on {self.my_team.team_name}")
+            moves.append((self.mine, row, -1))
+            if partner is not None:
+                moves.append((partner, row, 1))
+        return moves
+
+    def _deltas(self, scenarios):
+        """Stacked (K x teams x size) sum deltas and (K x teams x categories) z-score deltas"""
+        k_index, team_index, rows, signs = [], [], [], []
+        for k, item in enumerate(scenarios):
+            for team, row, sign in self._moves(item):
+                k_index.append(k)
+                team_index.append(team)
+                rows.append(row)
+                signs.append(sign)
+        shape = (len(scenarios), len(self.team_ids))
+        sum_deltas = np.zeros(shape + (self.totals.size,))
+        score_deltas = np.zeros(shape + (len(self.categories),))
+        if not rows:
+            return sum_deltas, score_deltas
+        rows = np.array(rows)
+        signs = np.array(signs, dtype=float)
+        vectors = self.vectors[rows].copy()
+        # Arriving players are assumed to start; departing ones leave with their real slot
+        was_active = vectors[:, self.totals.active_index].copy()
+        vectors[signs > 0, self.totals.active_index] = 1.0
+        counted = np.where(signs > 0, 1.0, was_active)
+        np.add.at(sum_deltas, (k_index, team_index), signs[:, None] * vectors)
+        np.add.at(score_deltas, (k_index, team_index), (signs * counted)[:, None] * self.scores[rows])
+        return sum_deltas, score_deltas
+
+    def _standing(self, sums, team_scores):
+        """My per-category comparison for stacked league states
+
+        Returns (team values, league averages, standing, status) with one row
+        per state; status is 1 = strength, -1 = weakness, 0 = neutral.
+        """
+        team_avgs, active_avgs, _, _ = self.totals.summarize(sums)
+        team_avgs = team_avgs[..., self._columns]
+        mine = active_avgs[:, self.mine][:, self._columns]
+        has_value = ~np.isnan(team_avgs)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            league = np.where(has_value.any(axis=1),
+                              np.nansum(team_avgs, axis=1) / has_value.sum(axis=1), 0.0)
+        lower = self.context.spec.lower(self.categories)
+
+        if self.model == 'zscore':
+            std = team_scores.std(axis=1, ddof=1) if len(self.team_ids) > 1 else np.zeros_like(mine)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                standing = (team_scores[:, self.mine] - team_scores.mean(axis=1)) / std
+            standing = np.where((std > 0) & np.isfinite(standing), standing, 0.0)
+            status = np.where(standing >= self.threshold, 1, np.where(standing <= -self.threshold, -1, 0))
+            status = np.where(std > 0, status, 0)
+        else:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                relative = np.where(league != 0, (mine - league) / np.abs(league), 0.0)
+            standing = np.where(lower, -relative, relative)
+            status = np.where(standing > 0.1, 1, np.where(standing < -0.1, -1, 0))
+            status = np.where(league != 0, status, 0)
+        return mine, league, standing, status
+
+    @timed('WhatIf.evaluate')
+    def evaluate(self, scenarios):
+        """Category comparison before and after each scenario, as plain data"""
+        sum_deltas, score_deltas = self._deltas(scenarios)
+        base_sums = self.base_sums[None]
+        base_scores = self.base_team_scores[None]
+        before = self._standing(base_sums, base_scores)
+        after = self._standing(base_sums + sum_deltas, base_scores + score_deltas)
+        labels = {1: 'strength', -1: 'weakness', 0: 'neutral'}
+
+        results = []
+        for k, item in enumerate(scenarios):
+            categories = []
+            for j, cat in enumerate(self.categories):
+                categories.append({
+                    'category': cat,
+                    'team_before': float(before[0][0, j]),
+                    'team_after': float(after[0][k, j]),
+                    'team_delta': float(after[0][k, j] - before[0][0, j]),
+                    'league_before': float(before[1][0, j]),
+                    'league_after': float(after[1][k, j]),
+                    'standing_delta': float(after[2][k, j] - before[2][0, j]),
+                    'status_before': labels[int(before[3][0, j])],
+                    'status_after': labels[int(after[3][k, j])],
+                })
+            status_before = {row['category']: row['status_before'] for row in categories}
+            status_after = {row['category']: row['status_after'] for row in categories}
+            results.append({
+                'label': item['label'],
+                'add': [self.names[self._row[player_id]] for player_id in item['add']],
+                'drop': [self.names[self._row[player_id]] for player_id in item['drop']],
+                'add_ids': list(item['add']),
+                'drop_ids': list(item['drop']),
+                'standing_delta': float((after[2][k] - before[2][0]).sum()),
+                'strengths': [cat for cat, status in status_after.items() if status == 'strength'],
+                'weaknesses': [cat for cat, status in status_after.items() if status == 'weakness'],
+                'new_strengths': [cat for cat in self.categories
+                                  if status_after[cat] == 'strength' and status_before[cat] != 'strength'],
+                'lost_strengths': [cat for cat in self.categories
+                                   if status_before[cat] == 'strength' and status_after[cat] != 'strength'],
+                'new_weaknesses': [cat for cat in self.categories
+                                   if status_after[cat] == 'weakness' and status_before[cat] != 'weakness'],
+                'fixed_weaknesses': [cat for cat in self.categories
+                                     if status_before[cat] == 'weakness' and status_after[cat] != 'weakness'],
+                'categories': categories,
+            })
+        return results
+
+
+def free_agent_scan(context, drop=(), size=FREE_AGENT_POOL_SIZE):
+    """One add scenario per fetched free agent (each paired with the same drops)"""
+    table = context.free_agent_table(size)
+    return [scenario([player_id], drop, label=f"add {name}")
+            for player_id, name in zip(table['id'].to_numpy(), table['name'].to_numpy())]
+
+
+def what_if(league, my_team, context=None, add=(), drop=(), scan=False, top=10):
+    """Print and return how hypothetical moves would change my category standing
+
+    With `scan`, every free agent in the pool is tried as an add (alongside
+    `drop`) and the `top` scenarios by summed standing change are shown.
+    """
+    print("\n--- WHAT IF ---")
+    if context is None:
+        context = LeagueContext(league, ALL_CATEGORIES)
+    if add or scan:
+        # Added players may come from the free-agent pool
+        context.free_agents(FREE_AGENT_POOL_SIZE)
+    scenarios = free_agent_scan(context, drop) if scan else []
+    if add or drop:
+        scenarios.insert(0, scenario(add, drop))
+    if not scenarios:
+        print("No moves given. Pass player ids to add and/or drop, or scan the free agents.")
+        return None
+
+    try:
+        results = WhatIf(context, my_team).evaluate(scenarios)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return None
+
+    ranked = sorted(results, key=lambda result: -result['standing_delta'])
+    shown = ranked[:top] if scan else results
+    print(f"\nEvaluated {len(results)} scenario(s) for {my_team.team_name}")
+    for result in shown:
+        moves = [f"add {name}" for name in result['add']] + [f"drop {name}" for name in result['drop']]
+        print(f"\n* {', '.join(moves)}: standing {result['standing_delta']:+.2f}")
+        changes = [f"{row['category']} {row['team_before']:.3f} -> {row['team_after']:.3f}"
+                   for row in result['categories'] if abs(row['team_delta']) > 1e-12]
+        if changes:
+            print(f"  {' | '.join(changes)}")
+        for key, text in (('new_strengths', 'New strengths'), ('lost_strengths', 'Lost strengths'),
+                          ('fixed_weaknesses', 'Fixed weaknesses'), ('new_weaknesses', 'New weaknesses')):
+            if result[key]:
+                print(f"  {text}: {', '.join(result[key])}")
+
+    return {
+        'team_id': my_team.team_id,
+        'team_name': my_team.team_name,
+        'scenarios': [{key: value for key, value in result.items() if key != 'categories'} for result in ranked],
+        'categories': [dict(row, label=result['label']) for result in ranked for row in result['categories']],
+    }
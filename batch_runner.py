@@ -0,0 +1,129 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import YEAR, ESPN_S2, SWID, CACHE_DIR, CACHE_TTL, ALL_CATEGORIES, STAT_HISTORY_PATH, PROJECTIONS
+from analysis.valuation import warm_context
+from utils.snapshot_cache import load_league, replay_snapshot
+from utils.league_context import LeagueContext
+from utils.stat_history import StatHistory
+from utils.output import quiet_output
+from main import run_team, write_results, record_history
+
+def parse_jobs(pairs=None, jobs_file=None):
+    """Group (league, team) pairs into one job per league
+
+    `pairs` are "LEAGUE_ID:TEAM_NUMBER" strings. A jobs file is a JSON list of
+    {"league_id", "teams", optional "year", "espn_s2", "swid", "snapshot"}.
+    Credentials default to the values in config.py.
+    """
+    jobs = {}
+    if jobs_file:
+        with open(jobs_file) as f:
+            for job in json.load(f):
+                entry = jobs.setdefault(job['league_id'], {'league_id': job['league_id'], 'teams': []})
+                for key in ('year', 'espn_s2', 'swid', 'snapshot'):
+                    if key in job:
+                        entry[key] = job[key]
+                entry['teams'].extend(t for t in job.get('teams', []) if t not in entry['teams'])
+    for pair in pairs or []:
+        league_id, team_number = pair.split(':')
+        league_id = int(league_id)
+        entry = jobs.setdefault(league_id, {'league_id': league_id, 'teams': []})
+        if int(team_number) not in entry['teams']:
+            entry['teams'].append(int(team_number))
+    return list(jobs.values())
+
+def load_job_league(job):
+    """Load (or replay) the league for one job through the snapshot cache"""
+    loader = None
+    if job.get('snapshot'):
+        loader = lambda: replay_snapshot(job['snapshot'])
+    return load_league(job['league_id'], job.get('year', YEAR),
+                       espn_s2=job.get('espn_s2', ESPN_S2), swid=job.get('swid', SWID),
+                       cache_dir=CACHE_DIR, ttl=CACHE_TTL, loader=loader)
+
+def run_league(job, args, workers):
+    """Load one league once and analyze all of its requested teams on a thread pool"""
+    started = time.perf_counter()
+    league = load_job_league(job)
+    history = StatHistory(STAT_HISTORY_PATH) if STAT_HISTORY_PATH else None
+    record_history(history, league)
+    context = LeagueContext(league, ALL_CATEGORIES, history, projections=PROJECTIONS)
+    warm_context(context, free_agents=args.command in ('waivers', 'all'))
+
+    teams = list(league.teams) if not job['teams'] else [league.teams[n - 1] for n in job['teams']]
+    output_dir = os.path.join(args.output_dir, str(job['league_id']))
+    # Printed analyses from concurrent teams would interleave, so each runs quietly
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(lambda team: run_team(league, team, context, args, quiet=True), teams))
+    record_history(history, league, context)
+    written = []
+    for result in results:
+        written.extend(write_results(result, output_dir, args.format))
+    return {
+        'league_id': job['league_id'],
+        'league': league.settings.name,
+        'teams': len(teams),
+        'files': written,
+        'seconds': time.perf_counter() - started,
+    }
+
+def run_league_safely(job, args, workers):
+    """run_league(), with a failure recorded in the summary instead of raised"""
+    started = time.perf_counter()
+    try:
+        with quiet_output():
+            return run_league(job, args, workers)
+    except Exception as error:
+        return {
+            'league_id': job['league_id'],
+            'league': None,
+            'teams': 0,
+            'files': [],
+            'seconds': time.perf_counter() - started,
+            'error': f"{type(error).__name__}: {error}",
+        }
+
+def run_jobs(jobs, args, workers=4):
+    """Run every league job; leagues load in parallel and share nothing
+
+    A league that fails does not stop the others; its summary carries an
+    'error' message instead of files.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, len(jobs))) as pool:
+        return list(pool.map(lambda job: run_league_safely(job, args, workers), jobs))
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Analyze many teams across several leagues in one run")
+    parser.add_argument('command', choices=['analyze', 'waivers', 'trades', 'simulate', 'lineup', 'all'])
+    parser.add_argument('--job', action='append', default=[], metavar='LEAGUE_ID:TEAM_NUMBER',
+                        help="League and 1-based team number to analyze; repeat as needed")
+    parser.add_argument('--jobs-file', help="JSON list of league jobs (see parse_jobs)")
+    parser.add_argument('--workers', type=int, default=4, help="Worker threads per league")
+    parser.add_argument('--include-injured', action='store_true')
+    parser.add_argument('--all-categories', action='store_true')
+    parser.add_argument('--output-dir', default='reports')
+    parser.add_argument('--format', choices=['json', 'csv', 'both'], default='json')
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    jobs = parse_jobs(args.job, args.jobs_file)
+    if not jobs:
+        print("No jobs given. Use --job LEAGUE_ID:TEAM_NUMBER or --jobs-file.")
+        return
+    summaries = run_jobs(jobs, args, args.workers)
+    for summary in summaries:
+        if summary.get('error'):
+            print(f"League {summary['league_id']} failed after {summary['seconds']:.1f}s: {summary['error']}")
+            continue
+        print(f"{summary['league']} ({summary['league_id']}): {summary['teams']} teams, "
+              f"{len(summary['files'])} files in {summary['seconds']:.1f}s")
+    if any(summary.get('error') for summary in summaries):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from config import ALL_CATEGORIES
+from utils.data_helpers import get_league_averages
+from utils.league_context import LeagueContext
+from utils.synthetic_league import SyntheticLeague
+from analysis.team_analysis import analyze_team
+from analysis.trades import trade_recommendations
+import analysis.waiver_wire as waiver_wire
+
+RESULTS_PATH = os.path.join('.benchmarks', 'results.jsonl')
+# A stage is flagged when its best time grows by more than this factor
+REGRESSION_RATIO = 1.2
+# Everything main.py used to import before showing the menu or --help
+EAGER_IMPORTS = ['espn_api.baseball', 'utils.snapshot_cache', 'utils.league_context', 'utils.stat_history',
+                 'analysis.team_analysis', 'analysis.waiver_wire', 'analysis.trades', 'analysis.simulation',
+                 'analysis.lineup', 'analysis.what_if']
+# --help and the menu must come up within this fraction of the eager import time
+STARTUP_MAX_RATIO = 0.25
+# Free-agent pool sizes for --stream; the fetch-everything baseline stops at STREAM_BASELINE_MAX
+STREAM_POOL_SIZES = [1000, 10000, 100000]
+STREAM_BASELINE_MAX = 10000
+# Free agents paired with the roster for --claims; None pairs the whole pool
+CLAIM_POOL_SIZES = [100, 1000, None]
+
+
+def entry_points(league, team):
+    """Analysis entry points to time, each run cold (no shared context)"""
+    return {
+        'get_league_averages': lambda: get_league_averages(league, ALL_CATEGORIES),
+        'analyze_team': lambda: analyze_team(league, team),
+        'waiver_recommendations': lambda: waiver_wire.waiver_recommendations(
+            league, team, include_injured=False, all_categories=True),
+        'trade_recommendations': lambda: trade_recommendations(league, team, all_categories=True),
+        'all_shared_context': lambda: run_all_shared(league, team),
+    }
+
+
+def run_all_shared(league, team):
+    """The interactive menu path: every action on one LeagueContext"""
+    context = LeagueContext(league, ALL_CATEGORIES)
+    analyze_team(league, team, context)
+    waiver_wire.waiver_recommendations(league, team, context, include_injured=False, all_categories=True)
+    trade_recommendations(league, team, context, all_categories=True)
+
+
+def measure(func, repeat):
+    """Best/median wall time over `repeat` runs, then one traced run for peak memory"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        times.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'best': min(times), 'median': statistics.median(times), 'peak_kb': peak / 1024}
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def load_results(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_results(records, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'a') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+
+
+def previous_result(history, record):
+    """Most recent stored result for the same stage and size from another revision"""
+    for old in reversed(history):
+        if (old['stage'] == record['stage'] and old['teams'] == record['teams']
+                and old['free_agents'] == record['free_agents'] and old['revision'] != record['revision']):
+            return old
+    return None
+
+
+def run_benchmarks(team_counts, free_agent_counts, repeat=3, seed=0, stages=None, full_pool=True):
+    """Time every entry point on each synthetic league size; returns result records"""
+    if full_pool:
+        # Rank the whole synthetic pool rather than the configured top-N fetch
+        waiver_wire.FREE_AGENT_POOL_SIZE = None
+    revision = git_revision()
+    timestamp = datetime.now().isoformat(timespec='seconds')
+    records = []
+    for teams in team_counts:
+        for free_agents in free_agent_counts:
+            started = time.perf_counter()
+            league = SyntheticLeague(teams=teams, free_agents=free_agents, seed=seed)
+            build_seconds = time.perf_counter() - started
+            print(f"\n{league.settings.name} (built in {build_seconds:.2f}s)")
+            for stage, func in entry_points(league, league.teams[0]).items():
+                if stages and stage not in stages:
+                    continue
+                result = measure(func, repeat)
+                record = {'revision': revision, 'timestamp': timestamp, 'python': platform.python_version(),
+                          'teams': teams, 'free_agents': free_agents, 'stage': stage, 'repeat': repeat}
+                record.update(result)
+                records.append(record)
+                print(f"  {stage:<24} best {result['best'] * 1000:9.1f} ms  "
+                      f"median {result['median'] * 1000:9.1f} ms  peak {result['peak_kb'] / 1024:7.1f} MB")
+    return records
+
+
+def report_regressions(records, history):
+    """Print each stage's change against the last stored run from another revision"""
+    print("\nComparison with previous revision:")
+    compared = False
+    for record in records:
+        old = previous_result(history, record)
+        if old is None:
+            continue
+        compared = True
+        ratio = record['best'] / old['best'] if old['best'] else float('inf')
+        flag = "  REGRESSION" if ratio > REGRESSION_RATIO else ""
+        print(f"  {record['teams']:>3} teams {record['free_agents']:>6} FA  {record['stage']:<24} "
+              f"{old['best'] * 1000:9.1f} -> {record['best'] * 1000:9.1f} ms ({ratio:.2f}x vs {old['revision']}){flag}")
+    if not compared:
+        print("  No earlier results stored for these sizes.")
+
+
+def time_command(command, stdin=None, repeat=5):
+    """Best wall time of a subprocess run from the repository root"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(command, input=stdin, capture_output=True, text=True, cwd=root, check=True)
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def startup_benchmark(repeat=5, max_ratio=STARTUP_MAX_RATIO):
+    """Time `main.py --help` and opening/closing the menu against the eager import chain
+
+    Returns True when both come up within `max_ratio` of the time it takes
+    just to import what main.py used to load up front.
+    """
+    python = sys.executable
+    eager = time_command([python, '-c', 'import ' + ', '.join(EAGER_IMPORTS)], repeat=repeat)
+    timings = {
+        'interpreter': time_command([python, '-c', 'pass'], repeat=repeat),
+        'main.py --help': time_command([python, 'main.py', '--help'], repeat=repeat),
+        'main.py menu + exit': time_command([python, 'main.py'], stdin='7\n', repeat=repeat),
+    }
+    print(f"\nStartup (best of {repeat}):")
+    print(f"  {'eager imports':<22} {eager * 1000:8.1f} ms")
+    passed = True
+    for name, seconds in timings.items():
+        ratio = seconds / eager if eager else 0.0
+        flag = ""
+        if name != 'interpreter' and ratio > max_ratio:
+            flag = f"  TOO SLOW (limit {max_ratio:.2f}x)"
+            passed = False
+        print(f"  {name:<22} {seconds * 1000:8.1f} ms ({ratio:.2f}x){flag}")
+    return passed
+
+
+def api_benchmark(requests=200, workers=16, error_rate=0.1, server_rate=100):
+    """Hammer a local mock ESPN server through ApiClient; returns True if every request succeeded
+
+    The server fails `error_rate` of requests with 503 and answers 429 above
+    `server_rate` requests/second (and throttles the first few outright);
+    every fourth request repeats the one before it to exercise de-duplication.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from utils.api_client import ApiClient
+    from utils.mock_espn import MockEspnServer
+
+    with MockEspnServer(failures=[429, 429, 429], error_rate=error_rate, rate_limit=server_rate,
+                        latency=0.005) as server:
+        client = ApiClient(max_connections=8, rate=server_rate * 0.8, burst=8, retries=6,
+                           backoff=0.02, max_backoff=0.5, timeout=5)
+        urls = [f"{server.url}/players/{i - 1 if i % 4 == 3 else i}" for i in range(requests)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            responses = list(pool.map(client.get, urls))
+        elapsed = time.perf_counter() - started
+        client.close()
+        ok = sum(response.status_code == 200 for response in responses)
+        print(f"\nAPI client against mock server: {ok}/{len(urls)} succeeded in {elapsed:.2f}s "
+              f"({server.requests} server hits, statuses {server.statuses})")
+        client.metrics.report()
+    return ok == len(urls)
+
+
+def retained_bytes(build, snapshots, teams, free_agents, seed):
+    """Bytes still held by build(league) results after `snapshots` fresh league loads"""
+    import gc
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    kept = []
+    for _ in range(snapshots):
+        # A fresh league per snapshot, as every ESPN refresh parses new strings
+        league = SyntheticLeague(teams=teams, free_agents=free_agents, seed=seed)
+        kept.append(build(league))
+        del league
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    players = sum(len(snapshot) for snapshot in kept)
+    return retained, players
+
+
+def memory_benchmark(teams=30, free_agents=3000, snapshots=5, seed=0):
+    """Memory kept per tracked player: extract_player_stats dicts vs interned PlayerRecords"""
+    from utils.data_helpers import extract_player_stats
+    from utils.player_records import PlayerRegistry
+
+    def all_players(league):
+        return [player for team in league.teams for player in team.roster] + league.free_agents(size=None)
+
+    def as_dicts(league):
+        return [data for data in (extract_player_stats(player, ALL_CATEGORIES) for player in all_players(league))
+                if data]
+
+    registry = PlayerRegistry(ALL_CATEGORIES)
+
+    def as_records(league):
+        return [record for record in (registry.record(player) for player in all_players(league)) if record]
+
+    print(f"\nMemory ({teams} teams, {free_agents} free agents, {snapshots} snapshots):")
+    results = {}
+    for name, build in (('dicts', as_dicts), ('records', as_records)):
+        retained, players = retained_bytes(build, snapshots, teams, free_agents, seed)
+        results[name] = retained
+        print(f"  {name:<8} {retained / 1024 / 1024:8.1f} MB  {retained / max(players, 1):7.0f} bytes/player")
+    if results['dicts']:
+        print(f"  reduction {1 - results['records'] / results['dicts']:.0%}")
+    return results
+
+
+def stream_benchmark(pool_sizes=STREAM_POOL_SIZES, k=5, chunk_size=1000, seed=0):
+    """Peak traced memory of ranking free agents streamed in chunks vs. fetched into one table"""
+    from utils.free_agents import fetch_free_agents
+    from utils.player_table import records_to_table
+    from utils.synthetic_league import GeneratedFreeAgentTransport
+    from analysis.ranking import rank_category_leaders
+    from analysis.valuation import league_scorer
+    from analysis.waiver_wire import stream_free_agent_leaders
+
+    league = SyntheticLeague(teams=12, free_agents=0, seed=seed)
+    context = LeagueContext(league, ALL_CATEGORIES)
+    scorer = league_scorer(context)
+
+    def streamed(size):
+        return stream_free_agent_leaders(context, ALL_CATEGORIES, k, True, max_players=None, chunk_size=chunk_size,
+                                         transport=GeneratedFreeAgentTransport(size, seed))
+
+    def fetched(size):
+        players = fetch_free_agents(GeneratedFreeAgentTransport(size, seed), max_players=None, concurrency=1)
+        table = records_to_table(context.registry.free_agent_records(players), context.registry)
+        return rank_category_leaders(table, ALL_CATEGORIES, k, scores=scorer.score(table))
+
+    print(f"\nFree-agent ranking memory (top {k} per category, chunks of {chunk_size}):")
+    results = []
+    for size in pool_sizes:
+        row = {'players': size}
+        for name, run in (('stream', streamed), ('table', fetched)):
+            if name == 'table' and size > STREAM_BASELINE_MAX:
+                continue
+            tracemalloc.start()
+            started = time.perf_counter()
+            run(size)
+            row[f"{name}_seconds"] = time.perf_counter() - started
+            row[f"{name}_peak_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+            tracemalloc.stop()
+        results.append(row)
+        table = (f"table peak {row['table_peak_kb'] / 1024:7.1f} MB ({row['table_seconds']:.2f}s)"
+                 if 'table_peak_kb' in row else "table skipped")
+        print(f"  {size:>7} players: stream peak {row['stream_peak_kb'] / 1024:6.1f} MB "
+              f"({row['stream_seconds']:.2f}s)  {table}")
+    return results
+
+
+def claims_benchmark(free_agents=10000, moves=3, pool_sizes=CLAIM_POOL_SIZES, seed=0):
+    """Time of the waiver claim planner against how many add/drop pairs it scores"""
+    from analysis.valuation import scoring_table
+    from analysis.waiver_planner import plan_claims
+
+    league = SyntheticLeague(teams=12, free_agents=free_agents, seed=seed)
+    context = LeagueContext(league, ALL_CATEGORIES)
+    candidates = context.free_agent_table(None)
+    candidates = scoring_table(context).loc[candidates.index]
+    team = league.teams[0]
+
+    print(f"\nWaiver claim planning (up to {moves} claims, {len(candidates)} free agents):")
+    results = []
+    for pool in pool_sizes:
+        started = time.perf_counter()
+        plan = plan_claims(context, team, candidates, moves=moves, pool=pool)
+        row = {'pool': pool or len(candidates), 'seconds': time.perf_counter() - started,
+               'evaluated': plan['evaluated'], 'before': plan['standings_before'],
+               'after': plan['standings_after']}
+        results.append(row)
+        print(f"  {row['pool']:>6} candidates: {row['evaluated']:>8} pairs in {row['seconds']:.3f}s  "
+              f"standings {row['before']:.1f} -> {row['after']:.1f}")
+    return results
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the analysis entry points on synthetic leagues (offline)")
+    parser.add_argument('--teams', type=int, nargs='+', default=[10, 20, 30])
+    parser.add_argument('--free-agents', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--stage', action='append', help="Only run this entry point; repeat as needed")
+    parser.add_argument('--configured-pool', action='store_true',
+                        help="Fetch FREE_AGENT_POOL_SIZE free agents instead of the whole pool")
+    parser.add_argument('--results', default=RESULTS_PATH, help="JSON-lines file results are appended to")
+    parser.add_argument('--no-save', action='store_true')
+    parser.add_argument('--api', action='store_true',
+                        help="Only exercise the API client against a local mock server; exits 1 on failures")
+    parser.add_argument('--memory', action='store_true',
+                        help="Only compare memory held by player stat dicts and compact player records")
+    parser.add_argument('--stream', action='store_true',
+                        help="Only compare memory of streamed vs. fully fetched free-agent ranking")
+    parser.add_argument('--claims', action='store_true',
+                        help="Only time the waiver claim planner on growing candidate pools")
+    parser.add_argument('--startup', action='store_true',
+                        help="Only check CLI startup time against the eager import chain; exits 1 if too slow")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.api:
+        sys.exit(0 if api_benchmark() else 1)
+    if args.memory:
+        memory_benchmark(max(args.teams), max(args.free_agents))
+        return
+    if args.stream:
+        stream_benchmark(seed=args.seed)
+        return
+    if args.claims:
+        claims_benchmark(max(args.free_agents), seed=args.seed)
+        return
+    if args.startup:
+        sys.exit(0 if startup_benchmark(max(args.repeat, 5)) else 1)
+    history = load_results(args.results)
+    records = run_benchmarks(args.teams, args.free_agents, repeat=args.repeat, seed=args.seed,
+                             stages=args.stage, full_pool=not args.configured_pool)
+    report_regressions(records, history)
+    if not args.no_save:
+        save_results(records, args.results)
+        print(f"\nSaved {len(records)} results to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,108 @@
-LEAGUE_ID = # Replace with your own
+LEAGUE_ID = None  # Replace with your own
 YEAR = 2025
-ESPN_S2 = # Replace with your own
-SWID = # Replace with your own
-TEAM_ID = # Replace with your own
+ESPN_S2 = None  # Replace with your own (not needed for public leagues)
+SWID = None  # Replace with your own (not needed for public leagues)
+TEAM_ID = 1  # Replace with your own (1-based team number)
 
 # Scoring categories
 BATTING_CATEGORIES = ['R', 'HR', 'RBI', 'SB', 'AVG', 'OBP']
 PITCHING_CATEGORIES = ['W', 'SV', 'K', 'ERA', 'WHIP']
 ALL_CATEGORIES = BATTING_CATEGORIES + PITCHING_CATEGORIES
+# Per-category overrides of utils.scoring.STAT_SPECS (and of the league's ESPN
+# settings), e.g. {'P_BB': {'lower': True, 'bounds': (0, None)}, 'SLG': {'decimals': 4}}
+CATEGORY_SPECS = {}
+# Points per stat for points leagues, e.g. {'R': 1, 'HR': 4, 'K': 1, 'ERA': 0}
+# (None uses the league's ESPN settings; categories without points score 0)
+POINTS_SCORING = None
 
+
+# Local snapshot cache (seconds before each kind of entity is refetched)
+CACHE_DIR = '.cache'
+CACHE_TTL = {
+    'league': 24 * 60 * 60,
+    'team': 15 * 60,
+    'player': 15 * 60,
+    'free_agents': 10 * 60,
+}
+# Path to a snapshot written by utils.snapshot_cache.record_snapshot to replay offline
+REPLAY_SNAPSHOT = None
+
+# Free-agent pool fetched for waiver recommendations (None fetches every available player)
+FREE_AGENT_POOL_SIZE = 100
+FREE_AGENT_PAGE_SIZE = 50
+FREE_AGENT_CONCURRENCY = 4
+# Positions to query separately and merge, e.g. ['C', 'SS', 'SP', 'RP'] (None = one unfiltered query)
+FREE_AGENT_POSITIONS = None
+# Rank the free-agent pool as it streams in, chunk by chunk with running top-k
+# heaps, instead of fetching it into one table (bounded memory for huge pools)
+FREE_AGENT_STREAMING = False
+# Players per chunk when streaming the free-agent pool
+STREAM_CHUNK_SIZE = 1000
+
+# How categories are judged and players ranked: 'zscore' uses volume-weighted
+# z-scores over the whole league; 'threshold' uses +/-10% bands vs. league averages
+CATEGORY_MODEL = 'zscore'
+# Team z-score standing (in league standard deviations) marking a strength/weakness
+ZSCORE_THRESHOLD = 0.5
+
+# Waiver claim planner: most add/drop pairs to suggest, and how many of the most
+# valuable free agents are paired with every player on the roster (None = all)
+WAIVER_PLAN_MOVES = 3
+WAIVER_PLAN_CANDIDATES = 200
+
+# Whole-roster trade search (1-for-1 and 2-for-1 swaps scored by roto standings points)
+TRADE_ENGINE_TOP = 5
+# Only suggest trades that gain the other team at least this many standings points
+# (0 = they must not lose any, None = no limit)
+TRADE_MIN_PARTNER_GAIN = 0
+# Worker processes for the trade search (None = evaluate teams in this process)
+TRADE_PROCESSES = None
+
+# Daily player stat snapshots recorded on every run (None disables the history)
+STAT_HISTORY_PATH = '.cache/stat_history.sqlite'
+# Blend z-scores over the last RECENT_FORM_DAYS into waiver/trade rankings
+# (0 ranks on season stats only, 1 on recent form only)
+RECENT_FORM_DAYS = 14
+RECENT_FORM_WEIGHT = 0.0
+# Rank players on blended rest-of-season projections (season, projected and
+# recent stats weighted by sample size) instead of season-to-date stats
+PROJECTIONS = False
+# Playing time a projection counts as when blended: smaller samples regress toward it
+PROJECTION_STABILIZATION = {'PA': 200, 'AB': 180, 'IP': 60}
+# Recent window blended into projections (needs STAT_HISTORY_PATH); each recent
+# PA/AB/IP counts this much on top of its share of the season
+PROJECTION_RECENT_DAYS = 14
+PROJECTION_RECENT_WEIGHT = 1.0
+
+# Starting lineup slots for the lineup optimizer (everyone else sits on the bench)
+LINEUP_SLOTS = {'C': 1, '1B': 1, '2B': 1, '3B': 1, 'SS': 1, 'OF': 3, 'UTIL': 1,
+                'SP': 5, 'RP': 2, 'P': 2}
+
+# Monte Carlo season simulator
+SIMULATIONS = 10000
+# Worker processes for large simulation runs (None = simulate in this process)
+SIM_PROCESSES = None
+# Used when the league settings don't provide the regular-season length / playoff size
+SIM_REGULAR_SEASON_WEEKS = 22
+SIM_PLAYOFF_TEAMS = 6
+
+# Report per-stage timings, call counts and API requests/bytes for every run (same as --instrument)
+INSTRUMENT = False
+# Path prefix for a cProfile dump (.prof) and JSON trace (.json) of every run (same as --profile)
+PROFILE_OUTPUT = None
+
+# Load the league on a background thread as soon as the menu starts and keep it fresh
+PREFETCH = True
+# Seconds between background refreshes (the snapshot cache TTLs decide what is re-read)
+PREFETCH_INTERVAL = 10 * 60
+
+# ESPN API client: pooled connections (also the cap on requests in flight),
+# token-bucket rate limit (requests/second and burst), and retries with
+# exponential backoff plus jitter for throttling and server errors
+API_MAX_CONNECTIONS = 8
+API_RATE_LIMIT = 5.0
+API_BURST = 10
+API_MAX_RETRIES = 5
+API_BACKOFF = 0.5
+API_MAX_BACKOFF = 30.0
+API_TIMEOUT = 30.0
@@ -1,42 +1,321 @@
-from espn_api.baseball import League
-from config import LEAGUE_ID, YEAR, ESPN_S2, SWID, TEAM_ID
-from analysis.team_analysis import analyze_team
-from analysis.waiver_wire import waiver_recommendations
-from analysis.trades import trade_recommendations
+import argparse
+import os
+from config import (LEAGUE_ID, YEAR, ESPN_S2, SWID, TEAM_ID, CACHE_DIR, CACHE_TTL, REPLAY_SNAPSHOT, ALL_CATEGORIES,
+                    INSTRUMENT, PROFILE_OUTPUT, STAT_HISTORY_PATH, PREFETCH, PREFETCH_INTERVAL, PROJECTIONS)
+from utils.output import write_json, write_csv, quiet_output
+from utils.instrumentation import timer, profile
 
-def main():
+# The analyses pull in pandas/NumPy and the league loader espn_api, so they
+# are imported where they are first used: --help and the menu come up
+# without paying for them, and nothing connects until an action needs data.
+
+COMMANDS = ['analyze', 'waivers', 'trades', 'simulate', 'lineup', 'whatif', 'search', 'all']
+
+def stat_bound(text):
+    """argparse type for STAT=VALUE (e.g. SB=10)"""
+    stat, _, value = text.partition('=')
+    try:
+        return stat.strip().upper(), float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected STAT=VALUE, got {text!r}")
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="ESPN Fantasy Baseball Analyzer. Run without a command for the interactive menu.")
+    parser.add_argument('--instrument', action='store_true',
+                        help="Report per-stage wall time, call counts and API requests/bytes at exit")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="Also write a cProfile dump (PATH.prof) and JSON trace (PATH.json)")
+    subparsers = parser.add_subparsers(dest='command')
+    for command in COMMANDS:
+        sub = subparsers.add_parser(command, help=f"Run the {command} analysis non-interactively")
+        sub.add_argument('--team', type=int, action='append',
+                         help="Team number (1-based, like TEAM_ID); repeat for several teams")
+        sub.add_argument('--all-teams', action='store_true', help="Analyze every team in the league")
+        sub.add_argument('--include-injured', action='store_true',
+                         help="Include injured free agents in waiver recommendations")
+        sub.add_argument('--all-categories', action='store_true',
+                         help="Search all categories when a team has no clear weaknesses")
+        if command == 'whatif':
+            sub.add_argument('--add', type=int, action='append', default=[], metavar='PLAYER_ID',
+                             help="Player to add (free agent, or another team's player for a trade)")
+            sub.add_argument('--drop', type=int, action='append', default=[], metavar='PLAYER_ID',
+                             help="Player of mine to drop (or give up, in a trade)")
+            sub.add_argument('--scan', action='store_true',
+                             help="Try every free agent in the pool as an add")
+            sub.add_argument('--top', type=int, default=10, help="Scenarios to show with --scan")
+        if command == 'search':
+            sub.add_argument('--name', help="Name prefix (fuzzy if nothing starts with it)")
+            sub.add_argument('--position', action='append', help="Position; repeat for any of several")
+            sub.add_argument('--pro-team', action='append', help="MLB team abbreviation; repeatable")
+            sub.add_argument('--owner', action='append', help="Fantasy owner; repeatable")
+            sub.add_argument('--injury-status', action='append', help="Injury status; repeatable")
+            sub.add_argument('--healthy', action='store_true', help="Only players available to play")
+            pool = sub.add_mutually_exclusive_group()
+            pool.add_argument('--free-agents', action='store_true', help="Only free agents")
+            pool.add_argument('--rostered', action='store_true', help="Only rostered players")
+            pool.add_argument('--mine', action='store_true', help="Only players on the team")
+            sub.add_argument('--min', type=stat_bound, action='append', default=[], metavar='STAT=VALUE',
+                             help="Stat lower bound, e.g. SB=10; repeatable")
+            sub.add_argument('--max', type=stat_bound, action='append', default=[], metavar='STAT=VALUE',
+                             help="Stat upper bound, e.g. ERA=3.5; repeatable")
+            sub.add_argument('--limit', type=int, default=25, help="Players to show")
+        sub.add_argument('--output-dir', default='reports', help="Directory for the result files")
+        sub.add_argument('--format', choices=['json', 'csv', 'both'], default='json')
+        sub.add_argument('--quiet', action='store_true', help="Suppress the printed analysis")
+    return parser
+
+def connect():
+    from utils.snapshot_cache import load_league, replay_snapshot
+    loader = (lambda: replay_snapshot(REPLAY_SNAPSHOT)) if REPLAY_SNAPSHOT else None
+    return load_league(LEAGUE_ID, YEAR, espn_s2=ESPN_S2, swid=SWID,
+                       cache_dir=CACHE_DIR, ttl=CACHE_TTL, loader=loader)
+
+def open_history():
+    if not STAT_HISTORY_PATH:
+        return None
+    from utils.stat_history import StatHistory
+    return StatHistory(STAT_HISTORY_PATH)
+
+def record_history(history, league, context=None):
+    """Add today's stats for rostered players (and any fetched free agents) to the history"""
+    if history is None:
+        return
+    from utils.stat_history import record_league
+    free_agents = context.fetched_free_agents() if context is not None else None
+    with timer('record_history'):
+        record_league(history, league, free_agents)
+
+def run_team(league, team, context, args, quiet=False):
+    """Run the requested analyses for one team and return their structured results
+
+    With `quiet`, what the analyses print on this thread is discarded.
+    """
+    if quiet:
+        with quiet_output():
+            return run_team(league, team, context, args)
+    results = {'league': league.settings.name, 'team_id': team.team_id, 'team_name': team.team_name}
+    if args.command in ('analyze', 'all'):
+        from analysis.team_analysis import analyze_team, team_report
+        analyze_team(league, team, context)
+        results['analysis'] = team_report(context, team)
+    if args.command in ('waivers', 'all'):
+        from analysis.waiver_wire import waiver_recommendations
+        results['waivers'] = waiver_recommendations(league, team, context,
+                                                    include_injured=args.include_injured,
+                                                    all_categories=args.all_categories)
+    if args.command in ('trades', 'all'):
+        from analysis.trades import trade_recommendations
+        results['trades'] = trade_recommendations(league, team, context,
+                                                  all_categories=args.all_categories)
+    if args.command in ('simulate', 'all'):
+        from analysis.simulation import season_outlook
+        results['simulation'] = season_outlook(league, team, context)
+    if args.command in ('lineup', 'all'):
+        from analysis.lineup import optimal_lineup
+        results['lineup'] = optimal_lineup(league, team, context)
+    if args.command == 'search':
+        from analysis.player_search import player_search
+        results['search'] = player_search(league, team, context, name=args.name, position=args.position,
+                                          pro_team=args.pro_team, owner=args.owner,
+                                          injury_status=args.injury_status, healthy=args.healthy or None,
+                                          free_agents=True if args.free_agents else False if args.rostered else None,
+                                          mine=args.mine, minimum=dict(args.min) or None,
+                                          maximum=dict(args.max) or None, limit=args.limit)
+    if args.command == 'whatif':
+        from analysis.what_if import what_if
+        results['what_if'] = what_if(league, team, context, add=args.add, drop=args.drop,
+                                     scan=args.scan, top=args.top)
+    return results
+
+def write_results(results, output_dir, fmt):
+    """Write one JSON report and/or a CSV per result table for a team"""
+    prefix = os.path.join(output_dir, f"team_{results['team_id']}")
+    written = []
+    if fmt in ('json', 'both'):
+        written.append(write_json(results, f"{prefix}.json"))
+    if fmt in ('csv', 'both'):
+        tables = {
+            'categories': (results.get('analysis') or {}).get('categories'),
+            'waivers': (results.get('waivers') or {}).get('recommendations'),
+            'claims': (results.get('waivers') or {}).get('claims'),
+            'trade_options': (results.get('trades') or {}).get('trade_options'),
+            'best_trades': (results.get('trades') or {}).get('best_trades'),
+            'standings': (results.get('simulation') or {}).get('standings'),
+            'lineup': (results.get('lineup') or {}).get('lineup'),
+            'what_if': (results.get('what_if') or {}).get('scenarios'),
+            'search': (results.get('search') or {}).get('players'),
+        }
+        for name, rows in tables.items():
+            if rows:
+                written.append(write_csv(rows, f"{prefix}_{name}.csv"))
+    return written
+
+def run_batch(league, context, args):
+    """Non-interactive mode: every requested team shares one league load and context"""
+    if args.all_teams:
+        teams = list(league.teams)
+    else:
+        teams = [league.teams[number - 1] for number in (args.team or [TEAM_ID])]
+
+    for team in teams:
+        results = run_team(league, team, context, args, quiet=args.quiet)
+        for path in write_results(results, args.output_dir, args.format):
+            print(f"Wrote {path}")
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    profile_path = args.profile or PROFILE_OUTPUT
+    if args.instrument or profile_path or INSTRUMENT:
+        with profile(profile_path):
+            run(args)
+            from utils.api_client import report_metrics
+            report_metrics()
+    else:
+        run(args)
+
+class Session:
+    """League, shared context and stat history, loaded on first use
+
+    The league comes from the local snapshot cache when it is fresh; the live
+    ESPN connection is only made when the snapshot is missing or stale. With
+    PREFETCH, start() loads the league, free agents and player stats on a
+    background thread while the menu is shown and keeps them fresh every
+    PREFETCH_INTERVAL seconds; actions then run on the latest snapshot and
+    only ever wait for the first load.
+    """
+
+    def __init__(self):
+        self.league = None
+        self.context = None
+        self.history = None
+        self.my_team = None
+        self.version = None
+        self.worker = None
+        self.registry = None  # interned player strings, shared by every refreshed context
+
+    def start(self):
+        """Begin loading in the background (no-op without PREFETCH)"""
+        if PREFETCH and self.worker is None:
+            from utils.prefetch import PrefetchWorker
+            self.worker = PrefetchWorker(connect, self._build, PREFETCH_INTERVAL).start()
+        return self
+
+    def _open_history(self):
+        if self.history is None:
+            self.history = open_history()
+        return self.history
+
+    def _build(self, league):
+        """League-wide stats, computed once per loaded league and shared by every action"""
+        from utils.league_context import LeagueContext
+        context = LeagueContext(league, ALL_CATEGORIES, self._open_history(), self.registry,
+                                PROJECTIONS)
+        self.registry = context.registry
+        if self.worker is not None:
+            from analysis.valuation import warm_context
+            warm_context(context)
+        return context
+
+    def connect(self, show_team=True):
+        if self.worker is not None:
+            if self.worker.current() is None:
+                print("Waiting for league data...")
+            snapshot = self.worker.wait()
+            if snapshot.version != self.version:
+                self._use(snapshot.league, snapshot.context, show_team)
+                self.version = snapshot.version
+        elif self.league is None:
+            print("Connecting to ESPN Fantasy API...")
+            with timer('load_league'):
+                league = connect()
+            self._use(league, self._build(league), show_team)
+        return self
+
+    def _use(self, league, context, show_team):
+        first = self.league is None
+        self.league = league
+        self.context = context
+        self.my_team = league.teams[TEAM_ID-1]
+        if first:
+            print(f"Connected successfully to: {league.settings.name}")
+            record_history(self._open_history(), league)
+            if show_team:
+                print(f"Analyzing team: {self.my_team.team_name}")
+
+    def close(self):
+        if self.worker is not None:
+            self.worker.stop(timeout=0)
+        if self.league is not None:
+            record_history(self.history, self.league, self.context)
+
+def run(args):
     print("ESPN Fantasy Baseball Analyzer")
-    print("Connecting to ESPN Fantasy API...")
-    
+    session = Session()
+
     try:
-        league = League(league_id=LEAGUE_ID, year=YEAR, espn_s2=ESPN_S2, swid=SWID)
-        print(f"Connected successfully to: {league.settings.name}")
-        
-        my_team = league.teams[TEAM_ID-1]  
-        print(f"Analyzing team: {my_team.team_name}")
-        
+        if args.command:
+            session.connect(show_team=False)
+            run_batch(session.league, session.context, args)
+            session.close()
+            return
+
+        # Rosters, free agents and stats load in the background while the menu is up
+        session.start()
+
         # Main menu
         while True:
             print("\nWhat would you like to do?")
             print("1. Analyze my team strengths/weaknesses")
             print("2. Get waiver wire recommendations")
             print("3. Find trade targets")
-            print("4. Exit")
-            
-            choice = input("Enter your choice (1-4): ")
-            
+            print("4. Simulate the rest of the season")
+            print("5. Optimize my lineup")
+            print("6. Try hypothetical roster moves")
+            print("7. Exit")
+
+            choice = input("Enter your choice (1-7): ")
+
             if choice == '1':
-                analyze_team(league, my_team)
+                from analysis.team_analysis import analyze_team
+                session.connect()
+                analyze_team(session.league, session.my_team, session.context)
             elif choice == '2':
-                waiver_recommendations(league, my_team)
+                from analysis.waiver_wire import waiver_recommendations
+                session.connect()
+                waiver_recommendations(session.league, session.my_team, session.context)
             elif choice == '3':
-                trade_recommendations(league, my_team)
+                from analysis.trades import trade_recommendations
+                session.connect()
+                trade_recommendations(session.league, session.my_team, session.context)
             elif choice == '4':
+                from analysis.simulation import season_outlook
+                session.connect()
+                season_outlook(session.league, session.my_team, session.context)
+            elif choice == '5':
+                from analysis.lineup import optimal_lineup
+                session.connect()
+                optimal_lineup(session.league, session.my_team, session.context)
+            elif choice == '6':
+                add = input("Player ids to add (comma separated, blank to scan free agents): ")
+                drop = input("Player ids to drop (comma separated): ")
+                try:
+                    add_ids = [int(x) for x in add.replace(',', ' ').split()]
+                    drop_ids = [int(x) for x in drop.replace(',', ' ').split()]
+                except ValueError:
+                    print("Player ids must be numbers.")
+                    continue
+                from analysis.what_if import what_if
+                session.connect()
+                what_if(session.league, session.my_team, session.context,
+                        add=add_ids, drop=drop_ids, scan=not add_ids)
+            elif choice == '7':
+                session.close()
                 print("Goodbye, may you not be the Rockies!")
                 break
             else:
                 print("Invalid choice, please try again.")
-                
+
     except Exception as e:
         print(f"Error: {e}")
         print("Please check your credentials and internet connection.")
@@ -0,0 +1,27 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.snapshot_cache import record_snapshot, replay_snapshot
+from utils.synthetic_league import SyntheticLeague
+
+
+@pytest.fixture
+def live_league():
+    """Small synthetic league standing in for a live espn_api League"""
+    return SyntheticLeague(teams=6, free_agents=60, seed=3)
+
+
+@pytest.fixture
+def snapshot_path(live_league, tmp_path):
+    """The live league written to a JSON snapshot with record_snapshot, for replay tests"""
+    path = tmp_path / 'snapshot.json'
+    record_snapshot(live_league, str(path), free_agent_sizes=(60,))
+    return str(path)
+
+
+@pytest.fixture
+def replayed_league(snapshot_path):
+    return replay_snapshot(snapshot_path)
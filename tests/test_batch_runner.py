@@ -0,0 +1,33 @@
+import pytest
+
+import batch_runner
+
+
+def test_failed_league_is_reported_without_stopping_the_batch(snapshot_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_runner, 'CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(batch_runner, 'STAT_HISTORY_PATH', None)
+    jobs = [
+        {'league_id': 1, 'teams': [1], 'snapshot': snapshot_path},
+        {'league_id': 2, 'teams': [1], 'snapshot': str(tmp_path / 'missing.json')},
+    ]
+    args = batch_runner.build_parser().parse_args(['analyze', '--output-dir', str(tmp_path / 'reports')])
+
+    good, bad = batch_runner.run_jobs(jobs, args, workers=1)
+
+    assert 'error' not in good
+    assert good['teams'] == 1 and good['files']
+    assert bad['league_id'] == 2
+    assert bad['files'] == []
+    assert 'missing.json' in bad['error']
+
+
+def test_main_exits_nonzero_when_a_league_fails(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(batch_runner, 'CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(batch_runner, 'STAT_HISTORY_PATH', None)
+    jobs_file = tmp_path / 'jobs.json'
+    jobs_file.write_text('[{"league_id": 7, "teams": [1], "snapshot": "%s"}]' % (tmp_path / 'missing.json'))
+
+    with pytest.raises(SystemExit) as exit:
+        batch_runner.main(['analyze', '--jobs-file', str(jobs_file), '--output-dir', str(tmp_path)])
+    assert exit.value.code == 1
+    assert 'League 7 failed' in capsys.readouterr().out
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from analysis.lineup import hungarian, optimize_lineup, optimize_week, optimal_lineup, slot_list
+from config import ALL_CATEGORIES
+from utils.league_context import LeagueContext
+
+
+def brute_force(cost):
+    from itertools import permutations
+    n = len(cost)
+    return min(sum(cost[i, p[i]] for i in range(n)) for p in permutations(range(n)))
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_hungarian_finds_the_minimum_cost(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 7))
+    cost = rng.integers(-20, 20, (n, n)).astype(float)
+    assignment = hungarian(cost)
+    assert sorted(assignment.tolist()) == list(range(n))
+    assert cost[np.arange(n), assignment].sum() == brute_force(cost)
+
+
+def test_lineup_fills_every_slot_before_maximizing_value():
+    slots = slot_list({'C': 1, 'OF': 1})
+    eligibility = np.array([[True, False], [False, True], [True, True]])
+    # The best player can play either slot; filling both wins over starting him at C
+    lineup = optimize_lineup([1.0, 0.5, 5.0], eligibility, slots)
+    assert sorted(lineup.tolist()) in ([0, 2], [1, 2])
+    assert (lineup >= 0).all()
+
+
+def test_optimize_week_benches_players_without_a_game():
+    slots = slot_list({'OF': 1})
+    players = [type('P', (), {'eligibleSlots': ['OF']})() for _ in range(2)]
+    lineups = optimize_week(players, [[1.0, 2.0], [1.0, np.nan]], slots)
+    assert lineups.tolist() == [[1], [0]]
+
+
+def test_optimal_lineup_solves_one_day_without_daily_values(live_league):
+    context = LeagueContext(live_league, ALL_CATEGORIES)
+    result = optimal_lineup(live_league, live_league.teams[0], context)
+    assert {row['day'] for row in result['lineup']} == {0}
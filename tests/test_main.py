@@ -0,0 +1,58 @@
+import json
+import os
+import pytest
+
+import main
+
+# Report key each subcommand adds to a team's results
+COMMAND_RESULTS = {
+    'analyze': ['analysis'],
+    'waivers': ['waivers'],
+    'trades': ['trades'],
+    'simulate': ['simulation'],
+    'lineup': ['lineup'],
+    'whatif': ['what_if'],
+    'search': ['search'],
+    'all': ['analysis', 'waivers', 'trades', 'simulation', 'lineup'],
+}
+
+
+@pytest.fixture
+def replay(snapshot_path, tmp_path, monkeypatch):
+    """Point main.py at the recorded snapshot, with its cache and history out of the way"""
+    monkeypatch.setattr(main, 'REPLAY_SNAPSHOT', snapshot_path)
+    monkeypatch.setattr(main, 'CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(main, 'STAT_HISTORY_PATH', None)
+    monkeypatch.setattr(main, 'INSTRUMENT', False)
+    monkeypatch.setattr(main, 'PROFILE_OUTPUT', None)
+    return tmp_path / 'reports'
+
+
+@pytest.mark.parametrize('command', sorted(COMMAND_RESULTS))
+def test_subcommand_runs_on_a_recorded_snapshot(replay, command, capsys):
+    argv = [command, '--team', '1', '--team', '2', '--output-dir', str(replay)]
+    if command == 'whatif':
+        argv += ['--scan', '--top', '3']
+    if command == 'search':
+        argv += ['--healthy', '--limit', '5']
+    main.main(argv)
+
+    out = capsys.readouterr().out
+    assert 'Error:' not in out
+    for team_id in (1, 2):
+        path = replay / f'team_{team_id}.json'
+        assert os.path.exists(path), out
+        with open(path) as f:
+            report = json.load(f)
+        for key in COMMAND_RESULTS[command]:
+            assert report.get(key) is not None, key
+
+
+def test_quiet_run_prints_only_the_written_files(replay, capsys):
+    main.main(['analyze', '--team', '1', '--output-dir', str(replay), '--quiet', '--format', 'both'])
+    lines = capsys.readouterr().out.splitlines()
+    connected = next(i for i, line in enumerate(lines) if line.startswith("Connected successfully"))
+    written = lines[connected + 1:]
+    assert any(line.endswith('team_1.json') for line in written)
+    assert any(line.endswith('.csv') for line in written)
+    assert all(line.startswith("Wrote ") for line in written)
@@ -0,0 +1,45 @@
+import sys
+import threading
+from utils.output import quiet_output
+
+
+def test_quiet_output_only_silences_the_current_thread(capsys):
+    stdout = sys.stdout
+    entered, printed = threading.Event(), threading.Event()
+
+    def other():
+        entered.wait()
+        print("from another thread")
+        printed.set()
+
+    thread = threading.Thread(target=other)
+    thread.start()
+    with quiet_output():
+        print("from the quiet block")
+        entered.set()
+        printed.wait()
+    thread.join()
+    print("after the block")
+
+    assert capsys.readouterr().out.splitlines() == ["from another thread", "after the block"]
+    assert sys.stdout is stdout
+
+
+def test_quiet_blocks_nest_across_threads(capsys):
+    stdout = sys.stdout
+    inner_done = threading.Event()
+
+    def worker():
+        with quiet_output():
+            print("worker")
+        inner_done.set()
+
+    with quiet_output():
+        thread = threading.Thread(target=worker)
+        thread.start()
+        inner_done.wait()
+        assert sys.stdout is not stdout  # still installed for this block
+        print("main")
+    thread.join()
+    assert sys.stdout is stdout
+    assert capsys.readouterr().out == ""
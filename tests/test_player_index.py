@@ -0,0 +1,39 @@
+import pandas as pd
+from utils.player_index import PlayerIndex
+
+
+def player_table(eligible):
+    return pd.DataFrame({
+        'id': [1, 2, 3],
+        'name': ['Short Stop', 'Second Base', 'Back Stop'],
+        'position': ['SS', '2B', 'C'],
+        'eligibleSlots': pd.Categorical(eligible),
+        'team': ['NYY', 'BOS', 'NYY'],
+        'injuryStatus': ['ACTIVE', 'ACTIVE', 'OUT'],
+        'free_agent': [True, False, True],
+        'HR': [10.0, 20.0, 5.0],
+    })
+
+
+def test_position_finds_every_eligible_player():
+    index = PlayerIndex(['HR'], player_table(['SS,2B/SS,2B,UTIL,BE,IL', '2B,UTIL,BE,IL', 'C,BE,IL']))
+    assert index.find(position='2B').tolist() == [0, 1]
+    assert index.find(position=['C', 'SS']).tolist() == [0, 2]
+    assert index.find(position='2B', free_agent=True).tolist() == [0]
+    assert index.find(position='2B', team='NYY', minimum={'HR': 5}).tolist() == [0]
+    # Bench and IL are slots, not positions
+    assert index.find(position='BE').tolist() == []
+    assert index.values('position')['UTIL'] == 2
+
+
+def test_position_postings_follow_eligibility_changes():
+    index = PlayerIndex(['HR'], player_table(['SS,2B,BE', '2B,BE', 'C,BE']))
+    assert index.update(player_table(['SS,BE', '2B,BE', 'C,1B,BE'])) == 2
+    assert index.find(position='2B').tolist() == [1]
+    assert index.find(position='1B').tolist() == [2]
+
+
+def test_primary_position_is_used_without_eligible_slots():
+    table = player_table(['', '', '']).drop(columns='eligibleSlots')
+    index = PlayerIndex(['HR'], table)
+    assert index.find(position='2B').tolist() == [1]
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from utils.player_stream import TopK, stream_pages
+
+
+class PagedTransport:
+    """Serves `players` (per position) a page at a time, like the free-agent endpoint"""
+
+    def __init__(self, players):
+        self.players = players
+        self.requests = []
+
+    def fetch_page(self, offset, limit, position):
+        self.requests.append((offset, limit, position))
+        return self.players[position][offset:offset + limit]
+
+
+class Player:
+    def __init__(self, player_id):
+        self.playerId = player_id
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_top_k_matches_sorting_the_whole_stream(seed):
+    rng = np.random.default_rng(seed)
+    categories = ['HR', 'SB', 'ERA']
+    keys = rng.integers(0, 20, (500, len(categories))).astype(float)
+    keys[rng.random(keys.shape) < 0.1] = np.inf
+    top = TopK(categories, 7)
+    for start in range(0, len(keys), 64):
+        top.push(keys[start:start + 64], list(range(start, min(start + 64, len(keys)))))
+
+    assert top.seen == len(keys)
+    results = top.results()
+    for j, cat in enumerate(categories):
+        ranked = [row for row in np.argsort(keys[:, j], kind='stable') if np.isfinite(keys[row, j])]
+        assert results[cat] == ranked[:7]
+
+
+def test_top_k_skips_unranked_and_empty_chunks():
+    top = TopK(['HR'], 3)
+    top.push(np.zeros((0, 1)), [])
+    top.push([[np.inf], [1.0]], ['a', 'b'])
+    assert top.results() == {'HR': ['b']}
+    assert len(top) == 1
+
+
+def test_stream_pages_stops_at_a_short_page():
+    transport = PagedTransport({None: [Player(i) for i in range(7)]})
+    pages = list(stream_pages(transport, page_size=3))
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [offset for offset, _, _ in transport.requests] == [0, 3, 6]
+
+
+def test_stream_pages_caps_each_query_and_skips_repeats_across_positions():
+    transport = PagedTransport({'C': [Player(i) for i in range(5)], 'SS': [Player(i) for i in range(3, 9)]})
+    pages = list(stream_pages(transport, page_size=2, positions=['C', 'SS'], max_players=5))
+    ids = [player.playerId for page in pages for player in page]
+    assert ids == [0, 1, 2, 3, 4, 5, 6, 7]
+    assert max(offset + limit for offset, limit, _ in transport.requests) == 5
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+import numpy as np
+from config import ALL_CATEGORIES
+from utils.scoring import ScoringSpec, league_spec
+from utils.snapshot_cache import load_league, record_snapshot, replay_snapshot
+
+# ESPN stat ids (espn_api.baseball.constant.STATS_MAP)
+HR, ERA = 5, 47
+
+
+def espn_settings(league, scoring_type='H2H_CATEGORY', items=None):
+    league.settings._raw_scoring_settings = {
+        'scoringType': scoring_type,
+        'scoringItems': items if items is not None else [
+            {'statId': HR, 'isReverseItem': True, 'points': 4.0},
+            {'statId': ERA, 'isReverseItem': False, 'points': -1.0},
+        ],
+    }
+    return league
+
+
+def test_cached_league_keeps_espn_scoring(live_league, tmp_path):
+    espn_settings(live_league)
+    cached = load_league('1', 2025, cache_dir=str(tmp_path), loader=lambda: live_league)
+    # A second load is served from the snapshot store alone
+    cached = load_league('1', 2025, cache_dir=str(tmp_path), loader=None)
+    spec = league_spec(cached, ALL_CATEGORIES)
+    assert spec.lower(['HR', 'ERA', 'R']).tolist() == [True, False, False]
+    assert spec.points is None
+
+
+def test_replayed_points_league(live_league, tmp_path):
+    espn_settings(live_league, scoring_type='H2H_POINTS')
+    path = str(tmp_path / 'snapshot.json')
+    record_snapshot(live_league, path, free_agent_sizes=(60,))
+    spec = league_spec(replay_snapshot(path), ['HR', 'ERA', 'R'])
+    assert spec.points.tolist() == [4.0, -1.0, 0.0]
+
+
+def test_league_without_scoring_items_uses_builtins():
+    spec = league_spec(SimpleNamespace(settings=SimpleNamespace(name='x')), ['ERA', 'HR', 'AVG'])
+    assert spec.lower_is_better.tolist() == [True, False, False]
+    assert spec.rate_volume == {'ERA': 'IP', 'AVG': 'AB'}
+
+
+def test_spec_bounds_and_format():
+    spec = ScoringSpec(['ERA', 'K', 'AVG'])
+    values = np.array([[3.5, 10, 0.3], [12.0, 0, np.nan]])
+    assert spec.valid(values, ['ERA', 'K', 'AVG']).tolist() == [[True, True, True], [False, False, False]]
+    assert spec.format('AVG', 0.2871) == '0.287'
+    assert spec.format('K', 101.4) == '101'
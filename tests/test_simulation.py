@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+import numpy as np
+from config import ALL_CATEGORIES
+import analysis.valuation
+from analysis.simulation import simulate_season
+from utils.league_context import LeagueContext
+from utils.snapshot_cache import record_snapshot, replay_snapshot
+
+
+def test_replayed_snapshot_simulates_remaining_weeks(live_league, replayed_league):
+    live = simulate_season(live_league, simulations=200, processes=1, seed=0)
+    replayed = simulate_season(replayed_league, simulations=200, processes=1, seed=0)
+    assert live['weeks_left'] > 0
+    assert replayed['weeks_left'] == live['weeks_left']
+    assert np.allclose(replayed['standings']['projected_points'], live['standings']['projected_points'])
+
+
+def test_daily_scoring_period_does_not_shorten_season(live_league, tmp_path):
+    # espn_api baseball's current_week is the daily scoring period
+    live_league.current_week = 120
+    path = str(tmp_path / 'snapshot.json')
+    record_snapshot(live_league, path, free_agent_sizes=(60,))
+    replayed = replay_snapshot(path)
+    assert replayed.currentMatchupPeriod == live_league.currentMatchupPeriod
+    assert simulate_season(replayed, simulations=50, processes=1, seed=0)['weeks_left'] > 0
+
+
+def test_snapshot_keeps_schedule_record_and_settings(live_league, tmp_path):
+    teams = live_league.teams
+    for i, team in enumerate(teams):
+        team.wins, team.ties = 10 + i, i % 2
+        partner = teams[i ^ 1]
+        team.schedule = [SimpleNamespace(home_team=team, away_team=partner) for _ in range(22)]
+    live_league.settings.reg_season_count = 20
+    live_league.settings.playoff_team_count = 4
+    path = str(tmp_path / 'snapshot.json')
+    record_snapshot(live_league, path, free_agent_sizes=(60,))
+
+    live = simulate_season(live_league, simulations=100, processes=1, seed=1)
+    replayed = simulate_season(replay_snapshot(path), simulations=100, processes=1, seed=1)
+    assert replayed['weeks_left'] == live['weeks_left'] == 20 - 10 + 1
+    assert replayed['playoff_teams'] == 4
+    assert list(replayed['standings']['current_points']) == list(live['standings']['current_points'])
+    assert list(replayed['standings']['next_opponent']) == list(live['standings']['next_opponent'])
+
+
+def test_weekly_rates_stay_on_season_stats_with_projections(live_league, monkeypatch):
+    season = simulate_season(live_league, LeagueContext(live_league, ALL_CATEGORIES),
+                             simulations=200, processes=1, seed=0)
+    monkeypatch.setattr(analysis.valuation, 'PROJECTIONS', True)
+    context = LeagueContext(live_league, ALL_CATEGORIES, projections=True)
+    projected = simulate_season(live_league, context, simulations=200, processes=1, seed=0)
+    assert np.allclose(projected['standings']['projected_points'], season['standings']['projected_points'])
+    assert np.allclose(projected['categories'], season['categories'])
@@ -0,0 +1,40 @@
+from utils.snapshot_cache import SnapshotStore, load_league
+
+
+def counting_loader(league):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return league
+    return loader, calls
+
+
+def test_fresh_snapshot_is_served_without_the_live_league(live_league, tmp_path):
+    loader, calls = counting_loader(live_league)
+    first = load_league('1', 2025, cache_dir=str(tmp_path), loader=loader)
+    second = load_league('1', 2025, cache_dir=str(tmp_path), loader=loader)
+    assert len(calls) == 1
+    assert [len(team.roster) for team in second.teams] == [len(team.roster) for team in first.teams]
+    assert second.teams[0].roster[0].stats == live_league.teams[0].roster[0].stats
+
+
+def test_stale_players_refresh_the_snapshot(live_league, tmp_path):
+    loader, calls = counting_loader(live_league)
+    load_league('1', 2025, cache_dir=str(tmp_path), loader=loader)
+    store = SnapshotStore(str(tmp_path / 'snapshots.sqlite3'))
+    # Age only the player rows past CACHE_TTL['player']; league and team rows stay fresh
+    store.conn.execute("UPDATE entities SET fetched_at=0 WHERE kind='player'")
+    store.conn.commit()
+    store.close()
+
+    league = load_league('1', 2025, cache_dir=str(tmp_path), loader=loader)
+    assert len(calls) == 2
+    assert league.teams[0].roster
+
+
+def test_stale_teams_refresh_the_snapshot(live_league, tmp_path):
+    loader, calls = counting_loader(live_league)
+    load_league('1', 2025, cache_dir=str(tmp_path), loader=loader)
+    load_league('1', 2025, cache_dir=str(tmp_path), loader=loader, ttl={'team': -1})
+    assert len(calls) == 2
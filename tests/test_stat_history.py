@@ -0,0 +1,34 @@
+import datetime
+import pandas as pd
+from utils.snapshot_cache import load_league
+from utils.stat_history import StatHistory, league_key, record_league, recent_table
+from utils.synthetic_league import SyntheticLeague
+
+
+def test_same_named_cached_leagues_keep_separate_history(tmp_path):
+    first = SyntheticLeague(teams=4, free_agents=0, seed=1)
+    second = SyntheticLeague(teams=4, free_agents=0, seed=2)
+    second.settings.name = first.settings.name
+    cached = [load_league(league_id, 2025, cache_dir=str(tmp_path), loader=lambda league=league: league)
+              for league_id, league in ((101, first), (202, second))]
+    assert [league_key(league) for league in cached] == ['101', '202']
+
+    history = StatHistory(str(tmp_path / 'history.sqlite'))
+    day = datetime.date(2025, 6, 1)
+    record_league(history, cached[0], day=day)
+    assert history.window('202', 7, end=day).empty
+    assert not history.window('101', 7, end=day).empty
+
+
+def test_league_without_id_is_skipped_instead_of_failing(tmp_path, capsys):
+    league = SyntheticLeague(teams=4, free_agents=0, seed=1)
+    del league.league_id
+    assert league_key(league) is None
+
+    history = StatHistory(str(tmp_path / 'history.sqlite'))
+    assert record_league(history, league) == 0
+    assert 'no league_id' in capsys.readouterr().out
+    table = pd.DataFrame({'id': [1, 2]})
+    recent = recent_table(history, league, table, 7, ['HR', 'AVG'])
+    assert list(recent.columns) == ['HR', 'AVG', 'days']
+    assert recent.isna().all().all()
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+from config import ALL_CATEGORIES
+from utils.league_context import LeagueContext
+from analysis.trade_engine import best_trades, standings_points
+
+
+def test_best_trades_keep_none_for_missing_drops(live_league):
+    context = LeagueContext(live_league, ALL_CATEGORIES)
+    trades = best_trades(context, live_league.teams[0], top_n=20)
+    assert not trades.empty
+    for column in ('drop', 'partner_drop'):
+        assert all(value is None or isinstance(value, str) for value in trades[column])
+    # A side receiving two players must name who it releases
+    for trade in trades.to_dict('records'):
+        assert (trade['drop'] is not None) == (len(trade['receive']) > len(trade['give']))
+        assert (trade['partner_drop'] is not None) == (len(trade['give']) > len(trade['receive']))
+
+
+def test_min_partner_gain_is_a_floor(live_league):
+    context = LeagueContext(live_league, ALL_CATEGORIES)
+    trades = best_trades(context, live_league.teams[0], top_n=50, min_partner_gain=1.0)
+    assert (trades.empty or (trades['partner_gain'] >= 1.0).all())
+    unlimited = best_trades(context, live_league.teams[0], top_n=50, min_partner_gain=None)
+    assert isinstance(unlimited, pd.DataFrame) and len(unlimited) >= len(trades)
+
+
+def test_standings_points_count_teams_beaten_and_half_ties():
+    others = np.array([[10.0, 3.0], [20.0, 4.0], [20.0, np.nan]])
+    lower_is_better = np.array([False, True])
+    values = np.array([[20.0, 3.5], [5.0, 3.0], [25.0, np.nan]])
+    points = standings_points(values, others, lower_is_better)
+    # 20 beats 10 and ties two 20s; an ERA of 3.5 only beats 4.0 (the NaN team is not ranked)
+    assert points.tolist() == [[2.0, 1.0], [0.0, 1.5], [3.0, 0.0]]
+
+
+def test_standings_points_match_pairwise_comparison():
+    rng = np.random.default_rng(0)
+    others = rng.integers(0, 5, (6, 4)).astype(float)
+    values = rng.integers(0, 5, (10, 4)).astype(float)
+    lower_is_better = np.array([False, True, False, True])
+    expected = np.zeros(values.shape)
+    for i, row in enumerate(values):
+        for other in others:
+            better = np.where(lower_is_better, row < other, row > other)
+            expected[i] += np.where(better, 1.0, np.where(row == other, 0.5, 0.0))
+    assert np.array_equal(standings_points(values, others, lower_is_better), expected)
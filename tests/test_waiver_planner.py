@@ -0,0 +1,100 @@
+import itertools
+import numpy as np
+import pytest
+from analysis.lineup import filled_slots, slot_list
+from analysis.trade_engine import category_values
+from analysis.waiver_planner import ClaimPlanner, LineupCoverage, _better
+
+SLOTS = slot_list({'C': 1, 'SS': 1, 'OF': 2})
+ADDS, DROPS, TEAMS = 6, 5, 5
+IS_RATE = np.array([False, False, False, False, True, True])
+LOWER_IS_BETTER = np.array([False, False, False, False, False, True])
+
+
+def eligible(*names):
+    return [slot in names for slot in SLOTS]
+
+
+def test_only_catcher_is_not_dropped_for_another_position():
+    mine = np.array([eligible('C'), eligible('SS'), eligible('OF'), eligible('OF'), eligible('OF')])
+    adds = np.array([eligible('SS'), eligible('C'), eligible('OF')])
+    coverage = LineupCoverage(mine, adds, SLOTS)
+    allowed = coverage.pairs()
+    assert not allowed[0, 0] and not allowed[2, 0]  # SS or OF for the only C
+    assert allowed[1, 0]  # C for C
+    assert allowed[0, 2] and allowed[2, 4]  # a spare OF can go for anyone
+    assert not allowed[2, 1]  # OF for the only SS
+
+
+def test_plans_are_checked_as_a_whole():
+    mine = np.array([eligible('C', 'SS'), eligible('C', 'SS'), eligible('SS'), eligible('OF'), eligible('OF')])
+    adds = np.array([eligible('OF'), eligible('OF')])
+    coverage = LineupCoverage(mine, adds, SLOTS)
+    # Either catcher can go on his own, but not both
+    assert coverage.pairs()[0, 0] and coverage.pairs()[1, 1]
+    assert coverage.feasible([(0, 0)])
+    assert not coverage.feasible([(0, 0), (1, 1)])
+    assert coverage.feasible([(0, 0), (1, 3)])
+
+
+def test_filled_slots_counts_the_largest_lineup():
+    roster = np.array([eligible('C', 'SS'), eligible('C'), eligible('OF'), eligible('OF'), eligible('OF')])
+    assert filled_slots(roster, SLOTS) == 4
+    assert filled_slots(roster[[0, 1]], SLOTS) == 2
+    assert filled_slots(np.zeros((0, len(SLOTS)), dtype=bool), SLOTS) == 0
+
+
+def random_planner(seed, **kwargs):
+    """A ClaimPlanner over random counting and rate stats, as plan_claims builds it"""
+    rng = np.random.default_rng(seed)
+    volume = rng.uniform(50, 150, (ADDS + DROPS, len(IS_RATE)))
+    num = rng.uniform(0, 30, volume.shape)
+    num = np.where(IS_RATE, num / 30 * volume, num)
+    den = np.where(IS_RATE, volume, 0.0)
+    value = rng.normal(size=ADDS + DROPS)
+    base_num, base_den = num[ADDS:].sum(axis=0), den[ADDS:].sum(axis=0)
+    others = np.array([category_values(base_num * rng.uniform(0.8, 1.2, len(IS_RATE)), base_den, IS_RATE)
+                       for _ in range(TEAMS)])
+    return ClaimPlanner(base_num, base_den, num[:ADDS], den[:ADDS], value[:ADDS],
+                        num[ADDS:], den[ADDS:], value[ADDS:], others, IS_RATE, LOWER_IS_BETTER, **kwargs)
+
+
+def best_plan_score(planner, moves):
+    """Exhaustive best (points, value) over every plan of at most `moves` allowed pairs"""
+    best = planner.score([])
+    for k in range(1, moves + 1):
+        for adds in itertools.permutations(range(ADDS), k):
+            for drops in itertools.combinations(range(DROPS), k):
+                plan = list(zip(adds, drops))
+                if all(planner.allowed[pair] for pair in plan) and (planner.feasible is None or planner.feasible(plan)):
+                    score = planner.score(plan)
+                    if _better(score, best):
+                        best = score
+    return best
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_single_claim_plan_is_the_best_pair(seed):
+    planner = random_planner(seed)
+    assert planner.score(planner.plan(1)) == pytest.approx(best_plan_score(planner, 1))
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_two_claim_plan_is_never_worse_than_the_best_single_claim(seed):
+    planner = random_planner(seed)
+    plan = planner.plan(2)
+    assert len(plan) <= 2
+    assert len({add for add, _ in plan}) == len(plan) == len({drop for _, drop in plan})
+    assert not _better(best_plan_score(planner, 1), planner.score(plan))
+    # Within a standings point of the exhaustive best (the search is a heuristic)
+    assert planner.score(plan)[0] >= best_plan_score(planner, 2)[0] - 1
+
+
+def test_planner_respects_allowed_pairs_and_feasibility():
+    allowed = np.zeros((ADDS, DROPS), dtype=bool)
+    allowed[:, :2] = True
+    planner = random_planner(0, allowed=allowed, feasible=lambda plan: len(plan) < 2 or plan[1][1] != 1)
+    plan = planner.plan(3)
+    assert {drop for _, drop in plan} <= {0, 1}
+    assert all(drop != 1 for _, drop in plan[1:])
+    assert planner.score(plan) == pytest.approx(best_plan_score(planner, 2))
@@ -0,0 +1,36 @@
+import pytest
+from config import ALL_CATEGORIES, WAIVER_PLAN_CANDIDATES
+import analysis.waiver_wire as waiver_wire
+from utils.league_context import LeagueContext
+from utils.synthetic_league import SyntheticLeague
+
+
+def recommend(league, streaming, include_injured, monkeypatch):
+    monkeypatch.setattr(waiver_wire, 'FREE_AGENT_STREAMING', streaming)
+    monkeypatch.setattr(waiver_wire, 'FREE_AGENT_POOL_SIZE', None)
+    monkeypatch.setattr(waiver_wire, 'STREAM_CHUNK_SIZE', 64)
+    context = LeagueContext(league, ALL_CATEGORIES)
+    return waiver_wire.waiver_recommendations(league, league.teams[0], context,
+                                              include_injured=include_injured, all_categories=True)
+
+
+@pytest.mark.parametrize('include_injured', [False, True])
+def test_streaming_plans_the_same_claims_as_the_table_path(include_injured, monkeypatch):
+    # More free agents than the planner pairs up, so its pool has to be cut the same way
+    league = SyntheticLeague(teams=6, free_agents=WAIVER_PLAN_CANDIDATES + 150, seed=4)
+    table = recommend(league, False, include_injured, monkeypatch)
+    streamed = recommend(league, True, include_injured, monkeypatch)
+    assert table['claims']
+    assert streamed['claims'] == table['claims']
+    assert streamed['recommendations'] == table['recommendations']
+
+
+def test_streaming_reports_every_player_scanned(monkeypatch, capsys):
+    league = SyntheticLeague(teams=6, free_agents=300, seed=4)
+    context = LeagueContext(league, ALL_CATEGORIES)
+    _, _, pool, scanned = waiver_wire.stream_free_agent_leaders(context, ALL_CATEGORIES, 5, False,
+                                                                max_players=None, chunk_size=64, candidates=20)
+    with_stats = len(context.free_agent_table(None))
+    assert scanned == with_stats
+    assert len(pool) == 20
+    assert pool['injuryStatus'].isin(waiver_wire.HEALTHY_STATUSES).all()
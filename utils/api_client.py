@@ -0,0 +1,281 @@
+import json
+import random
+import threading
+import time
+from collections import deque
+from utils.instrumentation import record, count
+
+# Statuses worth retrying: throttling and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class ApiError(Exception):
+    """Raised when a request still fails after every retry"""
+
+
+class TokenBucket:
+    """Token-bucket rate limiter: `rate` requests per second, bursts up to `burst`"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available; returns the seconds waited"""
+        if not self.rate:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class ApiMetrics:
+    """Request latencies and retry/throttle/de-duplication counts for one client"""
+
+    def __init__(self, samples=10000):
+        self.latencies = deque(maxlen=samples)
+        self.counters = {'requests': 0, 'attempts': 0, 'retries': 0, 'throttled': 0,
+                         'failures': 0, 'deduplicated': 0, 'rate_limited_seconds': 0.0}
+        self._lock = threading.Lock()
+
+    def add(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+        count(f"api_{name}", amount)
+
+    def observe(self, seconds):
+        with self._lock:
+            self.latencies.append(seconds)
+        record('api.request', seconds)
+
+    def summary(self):
+        """Counters plus p50/p90/p99/max latency (seconds) over the recent attempts"""
+        with self._lock:
+            latencies = sorted(self.latencies)
+            summary = dict(self.counters)
+        for name, q in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+            summary[name] = latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else None
+        summary['max'] = latencies[-1] if latencies else None
+        return summary
+
+    def report(self):
+        summary = self.summary()
+        print("\n--- API CLIENT ---")
+        print(f"Requests: {summary['requests']} ({summary['attempts']} attempts, {summary['retries']} retries, "
+              f"{summary['throttled']} throttled, {summary['failures']} failed, "
+              f"{summary['deduplicated']} de-duplicated)")
+        if summary['p50'] is not None:
+            print(f"Latency ms: p50 {summary['p50'] * 1000:.1f}  p90 {summary['p90'] * 1000:.1f}  "
+                  f"p99 {summary['p99'] * 1000:.1f}  max {summary['max'] * 1000:.1f}")
+        if summary['rate_limited_seconds']:
+            print(f"Waited {summary['rate_limited_seconds']:.2f}s for the rate limiter")
+
+
+class _Pending:
+    """An in-flight request other callers with the same key wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+class ApiClient:
+    """Pooled, rate-limited HTTP GET client with retries and request de-duplication
+
+    One `requests.Session` keeps up to `max_connections` pooled connections and
+    a semaphore caps requests in flight at the same number. Every attempt
+    takes a token from a `rate`/`burst` token bucket. Connection errors,
+    timeouts and RETRY_STATUSES are retried up to `retries` times with
+    exponential backoff and full jitter (honouring Retry-After). Identical GETs
+    issued while one is already in flight share its response.
+    """
+
+    def __init__(self, max_connections=8, rate=5.0, burst=10, retries=5, backoff=0.5,
+                 max_backoff=30.0, timeout=30.0, session=None):
+        if session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        self.session = session
+        self.bucket = TokenBucket(rate, burst)
+        self.slots = threading.BoundedSemaphore(max_connections)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.metrics = ApiMetrics()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+    def close(self):
+        self.session.close()
+
+    def _key(self, url, params, headers, cookies):
+        return json.dumps([url, params, headers, cookies], sort_keys=True, default=str)
+
+    def get(self, url, params=None, headers=None, cookies=None):
+        """GET with retries; returns the final response (non-retryable statuses included)"""
+        key = self._key(url, params, headers, cookies)
+        with self._lock:
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._inflight[key] = _Pending()
+        if not owner:
+            self.metrics.add('deduplicated')
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.response
+
+        try:
+            pending.response = self._get_with_retries(url, params, headers, cookies)
+            return pending.response
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            pending.done.set()
+
+    def get_json(self, url, params=None, headers=None, cookies=None):
+        response = self.get(url, params=params, headers=headers, cookies=cookies)
+        if response.status_code != 200:
+            raise ApiError(f"{url} returned HTTP {response.status_code}")
+        return response.json()
+
+    def _delay(self, attempt, response=None):
+        """Backoff before retry `attempt` (1-based): Retry-After if given, else jittered exponential"""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return min(self.max_backoff, float(retry_after))
+            except ValueError:
+                pass
+        return self._random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+    def _get_with_retries(self, url, params, headers, cookies):
+        import requests
+        self.metrics.add('requests')
+        attempt = 0
+        while True:
+            waited = self.bucket.acquire()
+            if waited:
+                self.metrics.add('rate_limited_seconds', waited)
+            response = None
+            error = None
+            started = time.perf_counter()
+            with self.slots:
+                try:
+                    response = self.session.get(url, params=params, headers=headers, cookies=cookies,
+                                                timeout=self.timeout)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+            self.metrics.observe(time.perf_counter() - started)
+            self.metrics.add('attempts')
+
+            if response is not None and response.status_code == 429:
+                self.metrics.add('throttled')
+            if error is None and response.status_code not in RETRY_STATUSES:
+                return response
+            if attempt >= self.retries:
+                self.metrics.add('failures')
+                if error is not None:
+                    raise ApiError(f"GET {url} failed after {attempt + 1} attempts: {error}") from error
+                # Let the caller interpret the final status (espn_api raises its own errors)
+                return response
+            attempt += 1
+            self.metrics.add('retries')
+            time.sleep(self._delay(attempt, response))
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def default_client(create=True):
+    """Process-wide client configured from config.py (None if not created yet and not `create`)"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None and create:
+            from config import (API_MAX_CONNECTIONS, API_RATE_LIMIT, API_BURST, API_MAX_RETRIES,
+                                API_BACKOFF, API_MAX_BACKOFF, API_TIMEOUT)
+            _default_client = ApiClient(max_connections=API_MAX_CONNECTIONS, rate=API_RATE_LIMIT,
+                                        burst=API_BURST, retries=API_MAX_RETRIES, backoff=API_BACKOFF,
+                                        max_backoff=API_MAX_BACKOFF, timeout=API_TIMEOUT)
+        return _default_client
+
+
+def report_metrics():
+    """Print the default client's metrics if it made any requests"""
+    client = default_client(create=False)
+    if client is not None and client.metrics.counters['requests']:
+        client.metrics.report()
+
+
+def route_espn_requests(espn_request, client):
+    """Send an espn_api EspnFantasyRequests' GETs through `client`
+
+    Replaces league_get/get/news_get on the instance, so every helper built on
+    them (get_league, get_pro_players, free-agent pages...) is pooled,
+    rate-limited and retried. Status handling stays espn_api's own.
+    """
+    def log(endpoint, params, headers, response):
+        if espn_request.logger:
+            espn_request.logger.log_request(endpoint=endpoint, params=params, headers=headers, response=response)
+
+    def league_get(params=None, headers=None, extend=""):
+        endpoint = espn_request.LEAGUE_ENDPOINT + extend
+        r = client.get(endpoint, params=params, headers=headers, cookies=espn_request.cookies)
+        alternate = espn_request.checkRequestStatus(r.status_code, extend=extend, params=params, headers=headers)
+        response = alternate if alternate else r.json()
+        log(endpoint, params, headers, response)
+        return response[0] if isinstance(response, list) else response
+
+    def get(params=None, headers=None, extend=""):
+        endpoint = espn_request.ENDPOINT + extend
+        r = client.get(endpoint, params=params, headers=headers, cookies=espn_request.cookies)
+        if r.status_code == 404:
+            return espn_request.checkRequestStatus(r.status_code, extend=extend)
+        espn_request.checkRequestStatus(r.status_code)
+        response = r.json()
+        log(endpoint, params, headers, response)
+        return response
+
+    def news_get(params=None, headers=None, extend=""):
+        endpoint = espn_request.NEWS_ENDPOINT + extend
+        response = client.get(endpoint, params=params, headers=headers, cookies=espn_request.cookies).json()
+        log(endpoint, params, headers, response)
+        return response
+
+    espn_request.league_get = league_get
+    espn_request.get = get
+    espn_request.news_get = news_get
+    return espn_request
+
+
+def load_live_league(league_id, year, espn_s2=None, swid=None, client=None):
+    """Build an espn_api League whose requests all go through `client` (default: default_client())"""
+    from espn_api.baseball import League
+    league = League(league_id=league_id, year=year, espn_s2=espn_s2, swid=swid, fetch_league=False)
+    route_espn_requests(league.espn_request, client or default_client())
+    league.fetch_league()
+    return league
@@ -1,40 +1,32 @@
-def get_league_averages(league, categories):
-    """Calculate league average stats for each category
-    
-    Returns the average stats across all teams in the league, 
-    calculated as the mean of each team's average per active/starting player.
-    """
-    # Initialize stats collection by team
-    team_stats = {team.team_name: {cat: [] for cat in categories} for team in league.teams}
-    
-    # Track active players per team
-    active_player_counts = {team.team_name: 0 for team in league.teams}
+from utils.instrumentation import timed
+
+def collect_team_stats(team, categories):
+    """Collect each category's player values and the active player count for one team"""
+    stats = {cat: [] for cat in categories}
+    active_players = 0
     
-    # Collect stats from all teams
-    print("Calculating league averages...")
-    for team in league.teams:
-        print(f"Processing team: {team.team_name}")
-        team_name = team.team_name
-        
-        for player in team.roster:
-            # Skip players with no stats
-            if not hasattr(player, 'stats') or not player.stats:
-                continue
-                
-            # Extract player stats
-            player_stats = extract_player_stats_from_espn(player, categories)
-            if not player_stats:
-                continue
-                
-            # Add each category to team collection
-            for cat in categories:
-                if cat in player_stats and player_stats[cat] is not None:
-                    team_stats[team_name][cat].append(player_stats[cat])
+    for player in team.roster:
+        # Skip players with no stats
+        if not hasattr(player, 'stats') or not player.stats:
+            continue
             
-            # Count this player as active
-            active_player_counts[team_name] += 1
+        # Extract player stats
+        player_stats = extract_player_stats_from_espn(player, categories)
+        if not player_stats:
+            continue
+            
+        # Add each category to team collection
+        for cat in categories:
+            if cat in player_stats and player_stats[cat] is not None:
+                stats[cat].append(player_stats[cat])
+        
+        # Count this player as active
+        active_players += 1
     
-    # Calculate team averages first, then league average
+    return stats, active_players
+
+def average_team_stats(team_stats, active_player_counts, categories):
+    """League average of each team's average per active player"""
     league_avgs = {}
     for cat in categories:
         team_avgs = []
@@ -53,6 +45,25 @@ def get_league_averages(league, categories):
     
     return league_avgs
 
+@timed()
+def get_league_averages(league, categories):
+    """Calculate league average stats for each category
+    
+    Returns the average stats across all teams in the league, 
+    calculated as the mean of each team's average per active/starting player.
+    """
+    team_stats = {}
+    active_player_counts = {}
+    
+    # Collect stats from all teams
+    print("Calculating league averages...")
+    for team in league.teams:
+        print(f"Processing team: {team.team_name}")
+        team_stats[team.team_name], active_player_counts[team.team_name] = collect_team_stats(team, categories)
+    
+    return average_team_stats(team_stats, active_player_counts, categories)
+
+@timed()
 def extract_player_stats_from_espn(player, categories):
     # Skip players with no stats attribute
     if not hasattr(player, 'stats') or not player.stats:
@@ -95,17 +106,8 @@ def extract_player_stats_from_espn(player, categories):
     
     return player_stats
 
-def extract_player_stats(player, categories):
-    """Extract stats for a single player into a dictionary format for analysis"""
-    if not hasattr(player, 'stats') or not player.stats:
-        return None
-        
-    # Get stats from ESPN format
-    stats = extract_player_stats_from_espn(player, categories)
-    if not stats:
-        return None
-    
-    # Add player metadata
+def build_player_data(player, stats, categories):
+    """Combine player metadata with already-extracted stats"""
     player_data = {
         'id': getattr(player, 'playerId', 0),
         'name': getattr(player, 'name', 'Unknown'),
@@ -128,4 +130,17 @@ def extract_player_stats(player, categories):
         if stat in stats:
             player_data[stat] = stats[stat]
     
-    return player_data
\ No newline at end of file
+    return player_data
+
+@timed()
+def extract_player_stats(player, categories):
+    """Extract stats for a single player into a dictionary format for analysis"""
+    if not hasattr(player, 'stats') or not player.stats:
+        return None
+        
+    # Get stats from ESPN format
+    stats = extract_player_stats_from_espn(player, categories)
+    if not stats:
+        return None
+    
+    return build_player_data(player, stats, categories)
\ No newline at end of file
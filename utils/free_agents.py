@@ -0,0 +1,144 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.instrumentation import timed, count
+
+
+class EspnFreeAgentTransport:
+    """Fetches free-agent pages straight from the ESPN API
+
+    Issues the same kona_player_info request as League.free_agents(), plus an
+    offset so pages beyond the first can be read.
+    """
+
+    def __init__(self, league):
+        self.league = league
+
+    def fetch_page(self, offset, limit, position=None):
+        from espn_api.baseball.player import Player
+        from espn_api.baseball.constant import POSITION_MAP
+
+        slot_filter = [POSITION_MAP[position]] if position and position in POSITION_MAP else []
+        params = {
+            'view': 'kona_player_info',
+            'scoringPeriodId': self.league.current_week,
+        }
+        filters = {
+            'players': {
+                'filterStatus': {'value': ['FREEAGENT', 'WAIVERS']},
+                'filterSlotIds': {'value': slot_filter},
+                'limit': limit,
+                'offset': offset,
+                'sortPercOwned': {'sortPriority': 1, 'sortAsc': False},
+                'sortDraftRanks': {'sortPriority': 100, 'sortAsc': True, 'value': 'STANDARD'},
+            }
+        }
+        headers = {'x-fantasy-filter': json.dumps(filters)}
+        data = self.league.espn_request.league_get(params=params, headers=headers)
+        return [Player(player, self.league.year) for player in data['players']]
+
+
+class LeagueFreeAgentTransport:
+    """Pages over any object exposing free_agents(size=..., position=...)
+
+    Used for leagues without direct ESPN access (cached or replayed snapshots).
+    """
+
+    def __init__(self, league):
+        self.league = league
+
+    def fetch_page(self, offset, limit, position=None):
+        players = self.league.free_agents(size=offset + limit, position=position)
+        return players[offset:offset + limit]
+
+
+class LocalFreeAgentTransport:
+    """In-memory stand-in for the ESPN free-agent endpoint
+
+    Serves pages from a list of players with optional simulated latency, so the
+    fetcher can be benchmarked and exercised offline.
+    """
+
+    def __init__(self, players, latency=0.0):
+        self.players = list(players)
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def fetch_page(self, offset, limit, position=None):
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        players = self.players
+        if position:
+            players = [p for p in players
+                       if getattr(p, 'position', None) == position
+                       or position in (getattr(p, 'eligibleSlots', None) or [])]
+        return players[offset:offset + limit]
+
+
+def free_agent_transport(league):
+    """Pick the most direct transport available for a league object"""
+    if hasattr(league, 'free_agent_transport'):
+        return league.free_agent_transport()
+    if hasattr(league, 'espn_request'):
+        return EspnFreeAgentTransport(league)
+    return LeagueFreeAgentTransport(league)
+
+
+@timed()
+def fetch_free_agents(transport, max_players=None, page_size=50, concurrency=4, positions=None):
+    """Fetch the free-agent pool in parallel pages
+
+    Pages are requested concurrently for every position in `positions` (or once
+    unfiltered when None). With `max_players` set, exactly that many players
+    per query are requested; with None, pages are fetched in waves until a
+    short page marks the end of the pool. Results are merged in query/page
+    order and de-duplicated by playerId.
+    """
+    queries = list(positions) if positions else [None]
+    results = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        if max_players is not None:
+            futures = {}
+            for position in queries:
+                for offset in range(0, max_players, page_size):
+                    limit = min(page_size, max_players - offset)
+                    futures[(position, offset)] = pool.submit(transport.fetch_page, offset, limit, position)
+            for key, future in futures.items():
+                results[key] = future.result()
+        else:
+            # Pool size unknown: request waves of pages until every query hits a short page
+            open_queries = {position: 0 for position in queries}
+            while open_queries:
+                pages_per_query = max(1, concurrency // len(open_queries))
+                futures = {}
+                for position, start in open_queries.items():
+                    for i in range(pages_per_query):
+                        offset = start + i * page_size
+                        futures[(position, offset)] = pool.submit(transport.fetch_page, offset, page_size, position)
+                for key, future in futures.items():
+                    results[key] = future.result()
+                open_queries = {
+                    position: start + pages_per_query * page_size
+                    for position, start in open_queries.items()
+                    if all(len(results[(position, start + i * page_size)]) == page_size
+                           for i in range(pages_per_query))
+                }
+    count('free_agent_pages', len(results))
+
+    merged = []
+    seen = set()
+    for position in queries:
+        offsets = sorted(offset for (p, offset) in results if p == position)
+        for offset in offsets:
+            for player in results[(position, offset)]:
+                player_id = getattr(player, 'playerId', None)
+                if player_id in seen:
+                    continue
+                seen.add(player_id)
+                merged.append(player)
+    return merged
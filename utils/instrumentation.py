@@ -0,0 +1,178 @@
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+
+# Off by default: timers and counters cost one flag check when disabled
+_enabled = False
+_lock = threading.Lock()
+_stages = {}
+_counters = {}
+_http_patch = None
+
+
+def enable(track_http=True):
+    """Start collecting timings and counters (and HTTP request/byte counts)"""
+    global _enabled
+    _enabled = True
+    if track_http:
+        _install_http_tracking()
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    _remove_http_tracking()
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+
+def record(stage, seconds):
+    with _lock:
+        entry = _stages.setdefault(stage, {'calls': 0, 'total': 0.0, 'max': 0.0})
+        entry['calls'] += 1
+        entry['total'] += seconds
+        entry['max'] = max(entry['max'], seconds)
+
+
+def count(name, amount=1):
+    """Add `amount` to a named counter"""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+@contextlib.contextmanager
+def timer(stage):
+    """Time the enclosed block under `stage` (inclusive of nested stages)"""
+    if not _enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - started)
+
+
+def timed(stage=None):
+    """Decorator form of timer(); the stage defaults to module.function"""
+    def decorate(func):
+        name = stage or f"{func.__module__}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+def _install_http_tracking():
+    """Count requests and response bytes for everything sent through `requests`"""
+    global _http_patch
+    if _http_patch is not None:
+        return
+    try:
+        import requests
+    except ImportError:
+        return
+    original = requests.Session.send
+
+    def send(session, request, **kwargs):
+        started = time.perf_counter()
+        response = original(session, request, **kwargs)
+        if _enabled:
+            record('http', time.perf_counter() - started)
+            count('api_requests')
+            count('api_bytes', len(response.content or b''))
+        return response
+
+    requests.Session.send = send
+    _http_patch = (requests.Session, original)
+
+
+def _remove_http_tracking():
+    global _http_patch
+    if _http_patch is not None:
+        cls, original = _http_patch
+        cls.send = original
+        _http_patch = None
+
+
+def snapshot():
+    """Current timings and counters as plain data"""
+    with _lock:
+        return {
+            'stages': {name: dict(entry) for name, entry in _stages.items()},
+            'counters': dict(_counters),
+        }
+
+
+def report():
+    """Print per-stage wall time and call counts, slowest first, then counters"""
+    data = snapshot()
+    if not data['stages'] and not data['counters']:
+        print("\nNo instrumentation data collected.")
+        return
+    print("\n--- TIMINGS ---")
+    print(f"{'stage':<52} {'calls':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9}")
+    for name, entry in sorted(data['stages'].items(), key=lambda item: -item[1]['total']):
+        mean = entry['total'] / entry['calls'] if entry['calls'] else 0.0
+        print(f"{name:<52} {entry['calls']:>7} {entry['total'] * 1000:>10.1f} "
+              f"{mean * 1000:>9.2f} {entry['max'] * 1000:>9.1f}")
+    if data['counters']:
+        print("\nCounters:")
+        for name, value in sorted(data['counters'].items()):
+            print(f"  {name}: {value}")
+
+
+def dump_json(path):
+    """Write the timings and counters collected so far as a JSON trace"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(snapshot(), f, indent=2)
+    return path
+
+
+@contextlib.contextmanager
+def profile(path=None):
+    """Instrument the enclosed block; with `path`, also write <path>.prof and <path>.json
+
+    The .prof file is a cProfile dump readable with pstats or snakeviz.
+    """
+    enable()
+    profiler = cProfile.Profile() if path else None
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            profiler.dump_stats(f"{path}.prof")
+            dump_json(f"{path}.json")
+        report()
+        disable()
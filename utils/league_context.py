@@ -0,0 +1,217 @@
+import hashlib
+import threading
+from utils.free_agents import fetch_free_agents, free_agent_transport
+from utils.player_index import PlayerIndex
+from utils.player_records import PlayerRegistry, VOLUME_STATS
+from utils.player_table import records_to_table
+from utils.scoring import league_spec
+from utils.team_totals import TeamTotals
+from utils.instrumentation import timed, timer, count
+
+
+def roster_fingerprint(team):
+    """Hash of a team's roster, lineup slots and raw stat breakdowns"""
+    digest = hashlib.sha1()
+    for player in team.roster:
+        season = (getattr(player, 'stats', None) or {}).get(0, {})
+        breakdown = season.get('breakdown') or season.get('projected_breakdown') or {}
+        digest.update(repr((
+            getattr(player, 'playerId', None),
+            getattr(player, 'lineupSlot', None),
+            getattr(player, 'injuryStatus', None),
+            sorted(breakdown.items()),
+        )).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class LeagueContext:
+    """Session-scoped, memoized league-wide stats
+
+    Player stats are extracted once per team and cached under the team's roster
+    fingerprint. League averages are only recomputed when at least one team's
+    fingerprint changes, and then only the changed teams are re-scanned.
+    Team aggregates and league averages come from running per-team sums
+    (TeamTotals): a re-scanned team only adds or subtracts the players that
+    actually changed, and league means are re-derived from the team sums.
+    Players are held as compact PlayerRecords (slotted objects with one stat
+    array, strings interned by a registry that refreshes can share); the
+    per-team records plus the free-agent pool, once fetched, are assembled
+    into a single columnar player table that the analyses filter.
+    Category direction, volumes, bounds and points are compiled once into
+    `spec` (a ScoringSpec, from the league's settings and config.py).
+    All cache access is serialized with a re-entrant lock, so one context can
+    be shared by threads analyzing different teams.
+    """
+
+    def __init__(self, league, categories, history=None, registry=None, projections=False, spec=None):
+        self.league = league
+        self.history = history    # optional StatHistory for recent-form queries
+        self.categories = list(categories)
+        self.spec = spec if spec is not None else league_spec(league, self.categories)
+        # Records keep projected breakdowns too when projections are blended
+        if (registry is None or registry.categories != self.categories
+                or registry.projections != projections):
+            registry = PlayerRegistry(self.categories, projections=projections)
+        self.registry = registry
+        self._teams = {}          # team_id -> per-team cache entry
+        self.totals = TeamTotals(self.categories, self.spec.rate_volume)
+        self._league_avgs = None
+        self._player_table = None
+        self._table_records = None
+        self._table_memo = {}     # results derived from the current player table
+        self._index = None        # PlayerIndex, updated in place when the table is rebuilt
+        self._index_table = None
+        self._free_agents = None  # raw free-agent list, largest pool fetched so far
+        self._free_agent_key = None
+        self._free_agent_records = None
+        self.scans = 0            # number of team rosters whose stats were extracted
+        # Guards the caches so teams of one league can be analyzed from worker threads
+        self._lock = threading.RLock()
+
+    @timed('LeagueContext.scan_team')
+    def _scan_team(self, team, fingerprint):
+        """Extract every player's stats for one team"""
+        records = self.registry.team_records(team)
+        vectors = {record.id: self.totals.record_vector(record, self.registry) for record in records}
+        self.scans += 1
+        return {
+            'fingerprint': fingerprint,
+            'team_name': team.team_name,
+            'records': records,
+            'vectors': vectors,
+            'memo': {},
+        }
+
+    def _entry(self, team):
+        """Return the cache entry for a team, re-scanning it if its roster changed"""
+        with self._lock:
+            fingerprint = roster_fingerprint(team)
+            entry = self._teams.get(team.team_id)
+            if entry is None or entry['fingerprint'] != fingerprint:
+                entry = self._scan_team(team, fingerprint)
+                self._teams[team.team_id] = entry
+                count('players_changed', self.totals.set_roster(team.team_id, entry['vectors']))
+                self._league_avgs = None
+                self._player_table = None
+            return entry
+
+    def refresh(self):
+        """Re-fingerprint every team; returns the ids of teams that were re-scanned"""
+        with self._lock:
+            changed = []
+            for team in self.league.teams:
+                before = self._teams.get(team.team_id)
+                if self._entry(team) is not before:
+                    changed.append(team.team_id)
+            # Drop teams that left the league
+            live_ids = {team.team_id for team in self.league.teams}
+            for team_id in list(self._teams):
+                if team_id not in live_ids:
+                    del self._teams[team_id]
+                    self.totals.drop_team(team_id)
+                    self._league_avgs = None
+                    self._player_table = None
+            return changed
+
+    def team_table(self, team):
+        """View of the player table restricted to one team's roster"""
+        self._entry(team)
+        table = self.player_table()
+        return table[table['fantasy_team_id'] == team.team_id]
+
+    def league_averages(self):
+        """League average of each team's per-active-player average"""
+        with self._lock:
+            self.refresh()
+            if self._league_avgs is None:
+                self._league_avgs = self.totals.league_averages([team.team_id for team in self.league.teams])
+            return self._league_avgs
+
+    def team_aggregates(self, team):
+        """(team_totals, team_active_avgs, total_players, active_players) from the running sums"""
+        with self._lock:
+            self._entry(team)
+            return self.totals.team_aggregates(team.team_id)
+
+    def memoize(self, team, name, compute):
+        """Cache compute() for a team until that team's roster changes"""
+        with self._lock:
+            memo = self._entry(team)['memo']
+            if name not in memo:
+                memo[name] = compute()
+            return memo[name]
+
+    def free_agents(self, size=100, page_size=50, concurrency=4, positions=None):
+        """Free-agent pool (None size = every available player), fetched once per session"""
+        with self._lock:
+            key = (float('inf') if size is None else size, tuple(positions or ()))
+            if (self._free_agents is None or self._free_agent_key[1] != key[1]
+                    or self._free_agent_key[0] < key[0]):
+                with timer('LeagueContext.fetch_free_agents'):
+                    self._free_agents = fetch_free_agents(free_agent_transport(self.league), max_players=size,
+                                                          page_size=page_size, concurrency=concurrency,
+                                                          positions=positions)
+                count('free_agents_fetched', len(self._free_agents))
+                self._free_agent_key = key
+                self._free_agent_records = self.registry.free_agent_records(self._free_agents)
+                self._player_table = None
+            if positions:
+                # Merged per-position queries are returned whole
+                return self._free_agents
+            return self._free_agents[:size]
+
+    def fetched_free_agents(self):
+        """Free agents fetched so far this session (empty before any fetch)"""
+        return list(self._free_agents or [])
+
+    def free_agent_table(self, size=100, **fetch_options):
+        """View of the player table restricted to the fetched free agents"""
+        self.free_agents(size, **fetch_options)
+        table = self.player_table()
+        view = table['free_agent']
+        if size is not None and not fetch_options.get('positions'):
+            view = view & (table['fa_rank'] < size)
+        return table[view]
+
+    def player_table(self):
+        """Columnar table of every rostered player and every fetched free agent"""
+        with self._lock:
+            self.refresh()
+            if self._player_table is None:
+                records = [record for team in self.league.teams for record in self._teams[team.team_id]['records']]
+                if self._free_agent_records is not None:
+                    records.extend(self._free_agent_records)
+                with timer('LeagueContext.build_player_table'):
+                    self._player_table = records_to_table(records, self.registry)
+                self._table_records = records
+                self._table_memo = {}
+            return self._player_table
+
+    def table_records(self):
+        """The PlayerRecords behind player_table(), row for row"""
+        with self._lock:
+            self.player_table()
+            return self._table_records
+
+    def player_index(self):
+        """PlayerIndex over the current player table (row ids index player_table())
+
+        Built on first use; after a refresh or free-agent fetch it is updated
+        in place, re-filing only the players that changed.
+        """
+        with self._lock:
+            table = self.player_table()
+            if self._index is None:
+                self._index = PlayerIndex(self.categories + VOLUME_STATS, rate_volume=self.spec.rate_volume)
+            if self._index_table is not table:
+                count('index_players_changed', self._index.update(table))
+                self._index_table = table
+            return self._index
+
+    def memoize_table(self, name, compute):
+        """Cache compute(table) until the player table is rebuilt"""
+        with self._lock:
+            table = self.player_table()
+            if name not in self._table_memo:
+                self._table_memo[name] = compute(table)
+            return self._table_memo[name]
@@ -0,0 +1,108 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+
+class MockEspnServer:
+    """Local HTTP server standing in for the ESPN fantasy API, for testing the client
+
+    `routes` maps a path to a JSON payload or to a callable(query, headers)
+    returning one; unknown paths echo the path and query. Failures can be
+    injected: `failures` is a list of statuses returned by the first requests
+    in order (e.g. [429, 503]), `error_rate` fails that share of the rest with
+    503, `rate_limit` answers 429 with Retry-After once more than that many
+    requests arrive within a second, and `latency` delays every response.
+
+        with MockEspnServer(failures=[429, 500]) as server:
+            client.get(server.url + '/apis/v3/games/flb/seasons/2025')
+    """
+
+    def __init__(self, routes=None, failures=(), error_rate=0.0, rate_limit=None, latency=0.0, seed=0):
+        self.routes = dict(routes or {})
+        self.failures = list(failures)
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.latency = latency
+        self.requests = 0
+        self.statuses = {}
+        self._random = random.Random(seed)
+        self._recent = []
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, payload, headers = mock._respond(self.path, dict(self.headers))
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mock-espn', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _status(self):
+        """Status for the next request under the configured failure injection"""
+        with self._lock:
+            self.requests += 1
+            now = time.monotonic()
+            self._recent = [t for t in self._recent if now - t < 1.0] + [now]
+            if self.failures:
+                return self.failures.pop(0)
+            if self.rate_limit and len(self._recent) > self.rate_limit:
+                return 429
+            if self.error_rate and self._random.random() < self.error_rate:
+                return 503
+            return 200
+
+    def _respond(self, path, headers):
+        if self.latency:
+            time.sleep(self.latency)
+        status = self._status()
+        with self._lock:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status == 429:
+            return status, {'messages': ['Too many requests']}, {'Retry-After': '0.05'}
+        if status != 200:
+            return status, {'messages': [f"HTTP {status}"]}, {}
+
+        parts = urlsplit(path)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        route = self.routes.get(parts.path)
+        if route is None:
+            return 200, {'path': parts.path, 'query': query}, {}
+        return 200, route(query, headers) if callable(route) else route, {}
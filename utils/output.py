@@ -0,0 +1,102 @@
+import contextlib
+import csv
+import io
+import json
+import math
+import os
+import sys
+import threading
+
+_thread_targets = threading.local()
+_quiet_lock = threading.Lock()
+_quiet_blocks = 0
+
+
+def to_builtin(value):
+    """Convert numpy/pandas scalars and containers into JSON-friendly Python types"""
+    if isinstance(value, dict):
+        return {str(k): to_builtin(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [to_builtin(v) for v in value]
+    if hasattr(value, 'tolist') and not isinstance(value, str):
+        # numpy arrays and numpy scalars
+        return to_builtin(value.tolist())
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+class _ThreadStdout:
+    """sys.stdout stand-in that sends a thread's writes to its own target, if it set one"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def _target(self):
+        return getattr(_thread_targets, 'target', None) or self.stream
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        return self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+@contextlib.contextmanager
+def quiet_output():
+    """Discard what the current thread prints while the block runs
+
+    Unlike contextlib.redirect_stdout, other threads (another job, the
+    prefetch worker, warnings) keep printing as usual. The pass-through
+    stdout is installed by the first quiet block and removed by the last.
+    """
+    global _quiet_blocks
+    with _quiet_lock:
+        if not _quiet_blocks and not isinstance(sys.stdout, _ThreadStdout):
+            sys.stdout = _ThreadStdout(sys.stdout)
+        _quiet_blocks += 1
+    previous = getattr(_thread_targets, 'target', None)
+    _thread_targets.target = io.StringIO()
+    try:
+        yield
+    finally:
+        _thread_targets.target = previous
+        with _quiet_lock:
+            _quiet_blocks -= 1
+            if not _quiet_blocks and isinstance(sys.stdout, _ThreadStdout):
+                sys.stdout = sys.stdout.stream
+
+
+def write_json(data, path):
+    """Write results as indented JSON, creating the parent directory if needed"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(to_builtin(data), f, indent=2)
+    return path
+
+
+def write_csv(rows, path):
+    """Write a list of flat dicts as CSV; list values are joined with ', '"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    rows = [to_builtin(row) for row in rows]
+    fieldnames = []
+    for row in rows:
+        for key in row:
+            if key not in fieldnames:
+                fieldnames.append(key)
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: ', '.join(map(str, v)) if isinstance(v, list) else v
+                             for k, v in row.items()})
+    return path
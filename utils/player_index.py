@@ -0,0 +1,365 @@
+import bisect
+import difflib
+import re
+import unicodedata
+import numpy as np
+from utils.scoring import RATE_VOLUME
+from utils.instrumentation import timed
+
+# Table columns with an inverted index (value -> rows)
+INDEXED_COLUMNS = ['position', 'team', 'owner', 'fantasy_team', 'fantasy_team_id', 'injuryStatus', 'free_agent']
+
+# Columns filed under several values per player: position is every slot a
+# player is eligible at (the table's comma-joined eligibleSlots plus the
+# primary position), so a 2B-eligible shortstop is found under 2B
+MULTI_VALUED_COLUMNS = {'position'}
+
+# Eligible slots that are not positions
+NON_POSITION_SLOTS = {'BE', 'IL'}
+
+# Injury statuses still treated as available (as in the waiver filter)
+HEALTHY_STATUSES = ['ACTIVE', 'NA', 'PROBABLE', 'QUESTIONABLE']
+
+EMPTY_ROWS = np.empty(0, dtype=np.int64)
+
+
+def normalize_name(name):
+    """Lower-case, accent-free name with punctuation removed ("José Ramírez Jr." -> "jose ramirez jr")"""
+    text = unicodedata.normalize('NFKD', str(name))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return ' '.join(re.sub(r"[^\w\s]", '', text.lower()).split())
+
+
+def _as_list(value):
+    return list(value) if isinstance(value, (list, tuple, set, frozenset)) else [value]
+
+
+def _positions(table):
+    """Per row, the sorted tuple of positions a player can be found under"""
+    primary = table['position'].astype(object).to_numpy() if 'position' in table.columns else np.full(len(table), None)
+    if 'eligibleSlots' not in table.columns:
+        return [() if value is None or value != value else (value,) for value in primary]
+    eligible = table['eligibleSlots'].astype(object).to_numpy()
+    cache = {}
+    result = []
+    for main, slots in zip(primary.tolist(), eligible.tolist()):
+        key = (main, slots)
+        if key not in cache:
+            values = set(slots.split(',')) if isinstance(slots, str) and slots else set()
+            if isinstance(main, str):
+                values.add(main)
+            cache[key] = tuple(sorted(values - NON_POSITION_SLOTS))
+        result.append(cache[key])
+    return result
+
+
+class PlayerIndex:
+    """In-memory index over a league player table, queried for row positions
+
+    Every player gets a stable slot keyed by player id. Slots are filed in an
+    inverted index per INDEXED_COLUMNS value (each of a player's values for
+    MULTI_VALUED_COLUMNS) and in a sorted list of name
+    tokens (prefix search by bisection, fuzzy search with difflib over the
+    distinct tokens); stat ranges use a per-stat sorted order built on first
+    use. Query results are slots mapped to the rows of the table last passed
+    to update(), returned as a sorted int64 array that can be fed back in as
+    `rows` or combined with np.intersect1d/np.union1d.
+
+    update() compares the new table with the indexed one and only re-files
+    players whose metadata or stats changed, so a refresh that touches a few
+    rosters costs a few postings, not a rebuild. `rate_volume` maps rate stats
+    to their volume stat (a ScoringSpec's).
+    """
+
+    def __init__(self, stats, table=None, rate_volume=None):
+        self.stats = list(stats)
+        self.rate_volume = RATE_VOLUME if rate_volume is None else rate_volume
+        self._slots = {}                  # player id -> slot
+        self._ids = []                    # slot -> player id
+        self._keys = []                   # slot -> indexed values (None for a free slot)
+        self._names = []                  # slot -> normalized name
+        self._labels = []                 # slot -> name as given, to spot renames cheaply
+        self._free = []                   # released slots for reuse
+        self._values = np.full((0, len(self.stats)), np.nan)
+        self._row = np.full(0, -1, dtype=np.int64)
+        self._codes = np.full((0, len(INDEXED_COLUMNS)), -1, dtype=np.int32)  # slot -> value code per column
+        self._code_of = {col: {} for col in INDEXED_COLUMNS}
+        self._postings = {col: {} for col in INDEXED_COLUMNS}
+        self._arrays = {}                 # (column, value) -> sorted slot array
+        self._tokens = []                 # sorted (token, slot) pairs
+        self._vocabulary = None           # distinct tokens, for fuzzy matching
+        self._stat_order = {}             # stat -> (slots sorted by value, sorted values)
+        self.changes = 0
+        if table is not None:
+            self.update(table)
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _file(self, slot, keys, label):
+        name = normalize_name(label)
+        for c, (col, value) in enumerate(zip(INDEXED_COLUMNS, keys)):
+            if col in MULTI_VALUED_COLUMNS:
+                # No single code to mask on; these are filtered through their postings
+                for item in value:
+                    self._postings[col].setdefault(item, set()).add(slot)
+                    self._arrays.pop((col, item), None)
+                continue
+            self._postings[col].setdefault(value, set()).add(slot)
+            self._arrays.pop((col, value), None)
+            codes = self._code_of[col]
+            self._codes[slot, c] = codes.setdefault(value, len(codes))
+        for token in set(name.split()) | {name}:
+            bisect.insort(self._tokens, (token, slot))
+        self._keys[slot] = keys
+        self._names[slot] = name
+        self._labels[slot] = label
+        self._vocabulary = None
+
+    def _unfile(self, slot):
+        keys, name = self._keys[slot], self._names[slot]
+        for col, value in zip(INDEXED_COLUMNS, keys):
+            postings = self._postings[col]
+            for item in (value if col in MULTI_VALUED_COLUMNS else (value,)):
+                postings[item].discard(slot)
+                if not postings[item]:
+                    del postings[item]
+                self._arrays.pop((col, item), None)
+        for token in set(name.split()) | {name}:
+            i = bisect.bisect_left(self._tokens, (token, slot))
+            if i < len(self._tokens) and self._tokens[i] == (token, slot):
+                del self._tokens[i]
+        self._keys[slot] = None
+        self._codes[slot] = -1
+        self._vocabulary = None
+
+    def _new_slot(self, player_id):
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._ids)
+            self._ids.append(None)
+            self._keys.append(None)
+            self._names.append(None)
+            self._labels.append(None)
+        if slot >= len(self._values):
+            grow = max(64, len(self._values))
+            self._values = np.vstack([self._values, np.full((grow, len(self.stats)), np.nan)])
+            self._row = np.concatenate([self._row, np.full(grow, -1, dtype=np.int64)])
+            self._codes = np.vstack([self._codes, np.full((grow, len(INDEXED_COLUMNS)), -1, dtype=np.int32)])
+        self._ids[slot] = player_id
+        self._slots[player_id] = slot
+        return slot
+
+    @timed('PlayerIndex.update')
+    def update(self, table):
+        """Re-point the index at `table`, re-filing only new, changed and removed players
+
+        Returns the number of players added, changed or removed.
+        """
+        ids = table['id'].to_numpy()
+        # Missing values (free agents' owner, unknown statuses) are filed under None
+        columns = [_positions(table) if col in MULTI_VALUED_COLUMNS
+                   else table[col].astype(object).where(table[col].notna(), None).to_numpy() if col in table.columns
+                   else np.full(len(table), None) for col in INDEXED_COLUMNS]
+        names = table['name'].to_numpy(dtype=object)
+        values = np.column_stack([table[stat].to_numpy(dtype=float, na_value=np.nan) if stat in table.columns
+                                  else np.full(len(table), np.nan) for stat in self.stats]).reshape(
+            len(table), len(self.stats))
+        # The table fills missing categories with 0; a rate without its volume (a hitter's ERA) is no value
+        for j, stat in enumerate(self.stats):
+            if self.rate_volume.get(stat) in self.stats:
+                volume = values[:, self.stats.index(self.rate_volume[stat])]
+                values[~(volume > 0), j] = np.nan
+
+        slots = np.empty(len(table), dtype=np.int64)
+        touched = np.zeros(len(table), dtype=bool)
+        for row, player_id in enumerate(ids.tolist()):
+            keys = tuple(col[row] for col in columns)
+            slot = self._slots.get(player_id)
+            if slot is None:
+                slot = self._new_slot(player_id)
+            elif keys == self._keys[slot] and names[row] == self._labels[slot]:
+                slots[row] = slot
+                continue
+            else:
+                self._unfile(slot)
+            self._file(slot, keys, names[row])
+            slots[row] = slot
+            touched[row] = True
+
+        # Stats are compared for every row in one pass; sorted orders are only dropped if one moved
+        old = self._values[slots]
+        differs = (~((old == values) | (np.isnan(old) & np.isnan(values)))).any(axis=1)
+        if differs.any():
+            self._values[slots[differs]] = values[differs]
+            self._stat_order = {}
+        changed = int((touched | differs).sum())
+
+        live = set(ids.tolist())
+        for player_id in [pid for pid in self._slots if pid not in live]:
+            slot = self._slots.pop(player_id)
+            self._unfile(slot)
+            self._ids[slot] = None
+            self._values[slot] = np.nan
+            self._free.append(slot)
+            changed += 1
+
+        self._row[:] = -1
+        self._row[slots] = np.arange(len(table))
+        if changed:
+            self._stat_order = {}
+        self.changes += changed
+        return changed
+
+    def _rows(self, slots):
+        """Sorted table rows for an array of slots"""
+        rows = self._row[slots]
+        return np.sort(rows[rows >= 0])
+
+    def _posting(self, col, value):
+        key = (col, value)
+        array = self._arrays.get(key)
+        if array is None:
+            array = np.fromiter(self._postings[col].get(value, ()), dtype=np.int64)
+            array.sort()
+            self._arrays[key] = array
+        return array
+
+    def _union(self, col, values):
+        """Sorted slots whose `col` is any of `values`"""
+        if len(values) == 1:
+            return self._posting(col, values[0])
+        return np.unique(np.concatenate([self._posting(col, value) for value in values]))
+
+    def values(self, column):
+        """Distinct indexed values of a column with their player counts"""
+        return {value: len(slots) for value, slots in self._postings[column].items()}
+
+    def name_slots(self, text, fuzzy=False, limit=None, cutoff=0.75):
+        """Slots whose full name or any name token starts with `text` (or, with fuzzy, resembles it)"""
+        prefix = normalize_name(text)
+        if not prefix:
+            return EMPTY_ROWS
+        found = set()
+        i = bisect.bisect_left(self._tokens, (prefix, -1))
+        while i < len(self._tokens) and self._tokens[i][0].startswith(prefix):
+            found.add(self._tokens[i][1])
+            i += 1
+        if fuzzy and not found:
+            if self._vocabulary is None:
+                self._vocabulary = sorted({token for token, _ in self._tokens})
+            for token in difflib.get_close_matches(prefix, self._vocabulary, n=limit or 10, cutoff=cutoff):
+                i = bisect.bisect_left(self._tokens, (token, -1))
+                while i < len(self._tokens) and self._tokens[i][0] == token:
+                    found.add(self._tokens[i][1])
+                    i += 1
+        slots = np.fromiter(found, dtype=np.int64)
+        slots.sort()
+        return slots
+
+    def _stat_order_of(self, stat):
+        """(live slots with a value, sorted by it; the sorted values), built on first use"""
+        order = self._stat_order.get(stat)
+        if order is None:
+            live = np.flatnonzero(self._row >= 0)
+            column = self._values[live, self.stats.index(stat)]
+            keep = ~np.isnan(column)
+            live, column = live[keep], column[keep]
+            by_value = np.argsort(column, kind='stable')
+            order = self._stat_order[stat] = (live[by_value], column[by_value])
+        return order
+
+    def _stat_range(self, stat, low=None, high=None):
+        """Slots (unsorted) with low <= stat <= high; missing values never match"""
+        slots, sorted_values = self._stat_order_of(stat)
+        start = 0 if low is None else np.searchsorted(sorted_values, low, side='left')
+        end = len(sorted_values) if high is None else np.searchsorted(sorted_values, high, side='right')
+        return slots[start:end]
+
+    @timed('PlayerIndex.find')
+    def find(self, name=None, fuzzy=False, position=None, team=None, owner=None, fantasy_team=None,
+             fantasy_team_id=None, injury_status=None, healthy=None, free_agent=None,
+             minimum=None, maximum=None, rows=None):
+        """Table rows matching every given criterion, as a sorted int64 array
+
+        Each metadata criterion takes one value or a list (any of them);
+        `position` matches any slot a player is eligible at;
+        `healthy` keeps (or with False, drops) HEALTHY_STATUSES; `minimum` and
+        `maximum` map stats to inclusive bounds; `rows` restricts the result to
+        rows from an earlier query. No criteria returns every row.
+
+        The most selective criterion supplies the candidate slots (a posting
+        list, a name match or a stat range); every other one is applied as a
+        vectorized mask over those candidates' value codes and stats.
+        """
+        meta = []  # (column position, column, values, their codes)
+        for c, (col, value) in enumerate(zip(INDEXED_COLUMNS, (position, team, owner, fantasy_team, fantasy_team_id,
+                                                                 injury_status, free_agent))):
+            if value is None:
+                continue
+            known = self._postings[col] if col in MULTI_VALUED_COLUMNS else self._code_of[col]
+            values = [v for v in _as_list(value) if v in known]
+            if not values:
+                return EMPTY_ROWS
+            meta.append((c, col, values, [self._code_of[col].get(v) for v in values]))
+        bounds = {stat: [low, None] for stat, low in (minimum or {}).items()}
+        for stat, high in (maximum or {}).items():
+            bounds.setdefault(stat, [None, None])[1] = high
+
+        # Candidates from the smallest source
+        sources = []
+        if name is not None:
+            name_slots = self.name_slots(name, fuzzy=fuzzy)
+            sources.append((len(name_slots), lambda: name_slots))
+        for _, col, values, _ in meta:
+            size = sum(len(self._postings[col].get(value, ())) for value in values)
+            sources.append((size, lambda col=col, values=values: self._union(col, values)))
+        for stat, (low, high) in bounds.items():
+            stat_slots = self._stat_range(stat, low, high)
+            sources.append((len(stat_slots), lambda stat_slots=stat_slots: stat_slots))
+        if sources:
+            slots = min(sources, key=lambda source: source[0])[1]()
+        else:
+            slots = np.flatnonzero(self._row >= 0)
+
+        if len(slots):
+            keep = np.ones(len(slots), dtype=bool)
+            codes_at = self._codes[slots]
+            for c, col, values, codes in meta:
+                if col in MULTI_VALUED_COLUMNS:
+                    keep &= np.isin(slots, self._union(col, values), assume_unique=True)
+                else:
+                    keep &= codes_at[:, c] == codes[0] if len(codes) == 1 else np.isin(codes_at[:, c], codes)
+            if healthy is not None:
+                column = INDEXED_COLUMNS.index('injuryStatus')
+                healthy_codes = [self._code_of['injuryStatus'][status] for status in HEALTHY_STATUSES
+                                 if status in self._code_of['injuryStatus']]
+                is_healthy = np.isin(codes_at[:, column], healthy_codes)
+                keep &= is_healthy if healthy else ~is_healthy
+            for stat, (low, high) in bounds.items():
+                values = self._values[slots, self.stats.index(stat)]
+                if low is not None:
+                    keep &= values >= low
+                if high is not None:
+                    keep &= values <= high
+            slots = slots[keep]
+
+        result = self._rows(slots)
+        if rows is not None:
+            result = np.intersect1d(result, np.asarray(rows, dtype=np.int64), assume_unique=True)
+        return result
+
+    def search(self, text, limit=10, cutoff=0.6):
+        """Rows for a name lookup, best first: exact name, then prefix matches, then fuzzy ones"""
+        query = normalize_name(text)
+        slots = self.name_slots(query)
+        if not len(slots):
+            slots = self.name_slots(query, fuzzy=True, limit=limit, cutoff=cutoff)
+        ranked = sorted(slots.tolist(), key=lambda slot: (
+            self._names[slot] != query,
+            not self._names[slot].startswith(query),
+            -difflib.SequenceMatcher(None, query, self._names[slot]).ratio(),
+            self._names[slot]))
+        rows = self._row[np.array(ranked, dtype=np.int64)] if ranked else EMPTY_ROWS
+        return rows[rows >= 0][:limit]
@@ -0,0 +1,178 @@
+import sys
+import numpy as np
+from utils.instrumentation import timed
+
+# Volume stats used to weight rate categories (AVG/OBP by AB/PA, ERA/WHIP by IP)
+VOLUME_STATS = ['AB', 'PA', 'IP']
+
+
+class PlayerRecord:
+    """One player's metadata plus a fixed-order float64 stat vector
+
+    `stats` follows the registry's `fields` (categories, then VOLUME_STATS);
+    NaN marks a stat the breakdown does not have. `projected` is the same
+    layout for the projected breakdown when the registry keeps projections
+    (the very array in `stats` when the season breakdown was empty, None
+    when there is no projection). `eligibleSlots` is the player's ESPN
+    eligible slots joined with commas. String fields are interned by the
+    registry, so the same name or team is stored once however many records
+    and snapshots refer to it.
+    """
+
+    __slots__ = ('id', 'name', 'position', 'team', 'injured', 'injuryStatus', 'lineupSlot',
+                 'fantasy_team', 'fantasy_team_id', 'owner', 'fa_rank', 'stats', 'projected', 'eligibleSlots')
+
+    def __init__(self, player_id, name, position, team, injured, injury_status, lineup_slot, stats,
+                 fantasy_team=None, fantasy_team_id=-1, owner=None, fa_rank=-1, projected=None,
+                 eligible_slots=''):
+        self.id = player_id
+        self.name = name
+        self.position = position
+        self.team = team
+        self.injured = injured
+        self.injuryStatus = injury_status
+        self.lineupSlot = lineup_slot
+        self.stats = stats
+        self.fantasy_team = fantasy_team
+        self.fantasy_team_id = fantasy_team_id
+        self.owner = owner
+        self.fa_rank = fa_rank
+        self.projected = projected
+        self.eligibleSlots = eligible_slots
+
+    @property
+    def rostered(self):
+        return self.fantasy_team is not None
+
+    def __repr__(self):
+        return f"PlayerRecord({self.id}, {self.name})"
+
+
+class PlayerRegistry:
+    """Builds PlayerRecords for one category layout and interns their strings
+
+    Ids and strings (names, positions, pro teams, slots, statuses, fantasy
+    teams, owners) are looked up in one table, so repeated values across
+    teams, free-agent pools and refreshes share a single object. With
+    `intern_names=False` ids and names are left alone and the table only
+    holds the low-cardinality values, for one-pass streams over huge pools.
+    With `projections`, records also carry the projected breakdown.
+    """
+
+    def __init__(self, categories, intern_names=True, projections=False):
+        self.categories = list(categories)
+        self.intern_names = intern_names
+        self.projections = projections
+        self.fields = self.categories + VOLUME_STATS
+        self.index = {field: i for i, field in enumerate(self.fields)}
+        self._category_count = len(self.categories)
+        self._interned = {}
+
+    def intern(self, value):
+        """Canonical copy of a string or id (other values pass through)"""
+        if isinstance(value, str):
+            return self._interned.setdefault(value, sys.intern(value))
+        if isinstance(value, int):
+            return self._interned.setdefault(value, value)
+        return value
+
+    def _season(self, player):
+        """(season breakdown dict, projected breakdown dict) of an espn_api-style player"""
+        stats = getattr(player, 'stats', None)
+        if not stats or 0 not in stats or 'breakdown' not in stats[0]:
+            return None, None
+        return stats[0]['breakdown'], stats[0].get('projected_breakdown')
+
+    def breakdown_vector(self, breakdown):
+        """A breakdown as a float64 vector in `fields` order, or None if it has none of them
+
+        AVG is approximated from OBP when only OBP/SLG are given, and IP is
+        derived from OUTS, as in data_helpers.extract_player_stats_from_espn.
+        """
+        if not breakdown:
+            return None
+        vector = np.full(len(self.fields), np.nan)
+        found = False
+        for i, cat in enumerate(self.categories):
+            value = breakdown.get(cat)
+            if value is None and cat not in breakdown:
+                if cat == 'AVG' and 'OBP' in breakdown and 'SLG' in breakdown:
+                    value = breakdown['OBP'] * 0.8
+                else:
+                    continue
+            found = True
+            if value is not None:
+                vector[i] = value
+        offset = self._category_count
+        for i, stat in enumerate(VOLUME_STATS):
+            if stat == 'IP' and 'IP' not in breakdown and 'OUTS' in breakdown:
+                value = breakdown['OUTS'] / 3
+            elif stat in breakdown:
+                value = breakdown[stat]
+            else:
+                continue
+            found = True
+            if value is not None:
+                vector[offset + i] = value
+        return vector if found else None
+
+    def stat_vector(self, player):
+        """Season stats as a float64 vector in `fields` order, or None without usable stats
+
+        Same rules as data_helpers.extract_player_stats_from_espn: the season
+        breakdown, or the projected one when it is empty.
+        """
+        breakdown, projected = self._season(player)
+        if breakdown is None:
+            return None
+        return self.breakdown_vector(breakdown or projected)
+
+    @timed('PlayerRegistry.record')
+    def record(self, player, fantasy_team=None, fantasy_team_id=-1, owner=None, fa_rank=-1):
+        """PlayerRecord for an espn_api-style player, or None when it has no usable stats"""
+        breakdown, projected_breakdown = self._season(player)
+        if breakdown is None:
+            return None
+        stats = self.breakdown_vector(breakdown or projected_breakdown)
+        if stats is None:
+            return None
+        projected = None
+        if self.projections:
+            projected = self.breakdown_vector(projected_breakdown) if breakdown else stats
+        intern = self.intern
+        unique = intern if self.intern_names else (lambda value: value)
+        return PlayerRecord(
+            unique(getattr(player, 'playerId', 0)),
+            unique(getattr(player, 'name', 'Unknown')),
+            intern(getattr(player, 'position', 'Unknown')),
+            intern(getattr(player, 'proTeam', 'Unknown')),
+            bool(getattr(player, 'injured', False)),
+            intern(getattr(player, 'injuryStatus', 'NA')),
+            intern(getattr(player, 'lineupSlot', 'Unknown')),
+            stats,
+            intern(fantasy_team), fantasy_team_id, intern(owner), fa_rank, projected,
+            intern(','.join(getattr(player, 'eligibleSlots', None) or [])),
+        )
+
+    def team_records(self, team):
+        """Records for every player on a fantasy team's roster that has stats"""
+        owner = getattr(team, 'owner', 'Unknown')
+        records = []
+        for player in team.roster:
+            record = self.record(player, team.team_name, team.team_id, owner)
+            if record is not None:
+                records.append(record)
+        return records
+
+    def free_agent_records(self, players):
+        """Records for free agents with stats, remembering each one's position in the list"""
+        records = []
+        for rank, player in enumerate(players):
+            record = self.record(player, fa_rank=rank)
+            if record is not None:
+                records.append(record)
+        return records
+
+    def stats_dict(self, record):
+        """A record's stats as {stat: value}, leaving out missing ones"""
+        return {field: float(value) for field, value in zip(self.fields, record.stats) if not np.isnan(value)}
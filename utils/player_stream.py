@@ -0,0 +1,104 @@
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from utils.instrumentation import timed, count
+
+
+def stream_pages(transport, page_size=50, positions=None, max_players=None):
+    """Yield free-agent pages in pool order, one query after another
+
+    The next page is requested while the current one is processed, so at most
+    two pages are held at a time. With `max_players`, each query stops after
+    that many players; otherwise it runs until a short page. Players already
+    seen under an earlier position query are skipped (only then are ids kept).
+    """
+    queries = list(positions) if positions else [None]
+    seen = set() if len(queries) > 1 else None
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        for position in queries:
+            def request(offset):
+                limit = page_size if max_players is None else min(page_size, max_players - offset)
+                return pool.submit(transport.fetch_page, offset, limit, position), limit
+
+            offset = 0
+            pending = request(offset) if max_players is None or max_players > 0 else None
+            while pending is not None:
+                future, limit = pending
+                page = future.result()
+                count('free_agent_pages')
+                offset += limit
+                more = len(page) == limit and (max_players is None or offset < max_players)
+                pending = request(offset) if more else None
+                if seen is not None:
+                    page = [player for player in page if getattr(player, 'playerId', None) not in seen]
+                    seen.update(getattr(player, 'playerId', None) for player in page)
+                yield page
+
+
+def stream_records(pages, registry, chunk_size=1000):
+    """Group streamed players into lists of PlayerRecords of about `chunk_size`
+
+    Players without usable stats are dropped; fa_rank is each player's
+    position in the stream, as with PlayerRegistry.free_agent_records().
+    """
+    chunk = []
+    rank = 0
+    for page in pages:
+        for player in page:
+            record = registry.record(player, fa_rank=rank)
+            rank += 1
+            if record is not None:
+                chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class TopK:
+    """Running k best items per category over a stream of chunks
+
+    push() takes a (rows x categories) matrix of ranking keys (smaller is
+    better, +inf never ranks, as from analysis.ranking.ranking_keys) and the
+    chunk's items. Each chunk is cut to its own k best per category with
+    a partition before touching the heaps, so memory is k items per category
+    whatever the stream length. Ties go to the item seen first, matching
+    rank_category_leaders on a single table.
+    """
+
+    def __init__(self, categories, k):
+        self.categories = list(categories)
+        self.k = k
+        self.seen = 0
+        self._heaps = {cat: [] for cat in self.categories}  # (-key, -sequence, item), worst on top
+
+    @timed('TopK.push')
+    def push(self, keys, items):
+        keys = np.asarray(keys, dtype=float).reshape(len(items), len(self.categories))
+        base = self.seen
+        self.seen += len(items)
+        if not len(items) or self.k <= 0:
+            return
+        for j, cat in enumerate(self.categories):
+            column = keys[:, j]
+            rows = np.flatnonzero(np.isfinite(column))
+            if len(rows) > self.k:
+                # Keep everything tied with the chunk's k-th best so ties still go to the earliest row
+                threshold = np.partition(column[rows], self.k - 1)[self.k - 1]
+                rows = rows[column[rows] <= threshold]
+            heap = self._heaps[cat]
+            for row in rows.tolist():
+                entry = (-column[row], -(base + row), items[row])
+                if len(heap) < self.k:
+                    heapq.heappush(heap, entry)
+                elif entry[:2] > heap[0][:2]:
+                    heapq.heapreplace(heap, entry)
+
+    def __len__(self):
+        return sum(len(heap) for heap in self._heaps.values())
+
+    def results(self):
+        """{category: items, best first}"""
+        return {cat: [entry[2] for entry in sorted(heap, key=lambda entry: (-entry[0], -entry[1]))]
+                for cat, heap in self._heaps.items()}
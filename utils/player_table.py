@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from utils.player_records import VOLUME_STATS
+from utils.instrumentation import timed
+
+# Low-cardinality string columns stored as pandas categoricals
+CATEGORICAL_COLUMNS = ['position', 'team', 'injuryStatus', 'lineupSlot', 'eligibleSlots', 'fantasy_team', 'owner']
+
+META_COLUMNS = ['id', 'name', 'position', 'team', 'injured', 'injuryStatus', 'lineupSlot', 'eligibleSlots']
+OWNERSHIP_COLUMNS = ['fantasy_team', 'fantasy_team_id', 'owner', 'rostered', 'fa_rank']
+
+
+@timed()
+def records_to_table(records, registry):
+    """Build the typed, columnar DataFrame from PlayerRecords in one step"""
+    categories = registry.categories
+    data = {
+        'id': np.fromiter((record.id for record in records), dtype=np.int64, count=len(records)),
+        'name': np.array([record.name for record in records], dtype=object),
+        'injured': np.fromiter((record.injured for record in records), dtype=bool, count=len(records)),
+    }
+    for col in CATEGORICAL_COLUMNS:
+        data[col] = pd.Categorical([getattr(record, col) for record in records])
+    stats = np.vstack([record.stats for record in records]) if records else np.empty((0, len(registry.fields)))
+    # Missing categories count as 0, missing volume stats as NaN (as in extract_player_stats)
+    for j, col in enumerate(categories):
+        data[col] = np.nan_to_num(stats[:, j], nan=0.0)
+    for col in VOLUME_STATS:
+        data[col] = stats[:, registry.index[col]].copy()
+    data['fantasy_team_id'] = np.fromiter((record.fantasy_team_id for record in records), dtype=np.int64,
+                                          count=len(records))
+    data['rostered'] = np.fromiter((record.rostered for record in records), dtype=bool, count=len(records))
+    data['free_agent'] = ~data['rostered']
+    data['fa_rank'] = np.fromiter((record.fa_rank for record in records), dtype=np.int64, count=len(records))
+    order = META_COLUMNS + list(categories) + VOLUME_STATS + OWNERSHIP_COLUMNS + ['free_agent']
+    return pd.DataFrame(data, columns=order)
+
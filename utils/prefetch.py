@@ -0,0 +1,119 @@
+import threading
+import time
+from utils.instrumentation import timer, count
+
+
+class LeagueSnapshot:
+    """A loaded league and its warmed LeagueContext, published as one version
+
+    Snapshots are never modified after publishing; a refresh builds a new one,
+    so an analysis holding a snapshot keeps a consistent view while the next
+    version loads.
+    """
+
+    def __init__(self, version, league, context, fingerprint):
+        self.version = version
+        self.league = league
+        self.context = context
+        self.fingerprint = fingerprint
+        self.loaded_at = time.time()
+
+
+def league_fingerprint(league):
+    """Roster fingerprints of every team, in league order"""
+    # Imported here so the worker thread, not the caller, pays for pandas
+    from utils.league_context import roster_fingerprint
+    return tuple((team.team_id, roster_fingerprint(team)) for team in league.teams)
+
+
+class PrefetchWorker:
+    """Loads the league on a background thread and keeps it fresh
+
+    `load()` returns a league (the snapshot cache decides whether that means
+    disk or network) and `build(league)` returns a context with rosters, free
+    agents and player stats already fetched. The first load starts as soon as
+    the worker does; afterwards it reloads every `interval` seconds and only
+    publishes a new version when some roster actually changed. Readers call
+    current() or wait(), which never touch the network themselves.
+    """
+
+    def __init__(self, load, build, interval=600):
+        self.load = load
+        self.build = build
+        self.interval = interval
+        self.error = None
+        self._snapshot = None
+        self._version = 0
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='league-prefetch', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def refresh_now(self):
+        """Ask the worker to reload without waiting for the interval"""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def refresh(self):
+        """Load once and publish a new snapshot if any roster changed; returns the current one"""
+        try:
+            with timer('prefetch.refresh'):
+                league = self.load()
+                fingerprint = league_fingerprint(league)
+                current = self.current()
+                if current is not None and current.fingerprint == fingerprint:
+                    count('prefetch_unchanged')
+                    return current
+                context = self.build(league)
+            with self._lock:
+                self._version += 1
+                snapshot = LeagueSnapshot(self._version, league, context, fingerprint)
+                self._snapshot = snapshot
+                self.error = None
+            count('prefetch_versions')
+            return snapshot
+        except Exception as e:
+            # Keep serving the last good snapshot; readers see the error only
+            # while there is none
+            with self._lock:
+                self.error = e
+            count('prefetch_errors')
+            return self.current()
+        finally:
+            self._ready.set()
+
+    def current(self):
+        """Latest published snapshot, or None before the first load finishes"""
+        with self._lock:
+            return self._snapshot
+
+    def wait(self, timeout=None):
+        """Latest snapshot, blocking only until the first load has finished
+
+        Raises the load error when no snapshot could be built.
+        """
+        self._ready.wait(timeout)
+        with self._lock:
+            if self._snapshot is not None:
+                return self._snapshot
+            if self.error is not None:
+                raise self.error
+        raise TimeoutError("League data is still loading")
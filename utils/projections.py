@@ -0,0 +1,98 @@
+import numpy as np
+from utils.scoring import RATE_VOLUME
+
+
+class ProjectionBlender:
+    """Rest-of-season projections from season, projected and recent stats, for all players at once
+
+    Inputs are (players x fields) matrices in a PlayerRegistry's field order
+    with NaN for missing values. Every category becomes a rate per unit of
+    playing time: batting counting stats per PA (AB when PA is missing),
+    pitching counting stats per IP, and AVG/OBP/ERA/WHIP as they are. The
+    sources' rates are averaged with sample-size weights: the season's volume,
+    the recent window's volume times `recent_weight` (on top of its share of
+    the season), and a fixed `stabilization` volume for the projection, so a
+    small sample regresses toward the projection and a full season outweighs
+    it. Counting stats are scaled back by the projected playing time (the
+    season's without a projection). Players with season stats only keep
+    their season line exactly. `rate_volume` maps rate categories to their
+    volume stat (a ScoringSpec's).
+    """
+
+    def __init__(self, fields, categories, batting_categories, pitching_categories, stabilization,
+                 recent_weight=1.0, rate_volume=None):
+        rate_volume = RATE_VOLUME if rate_volume is None else rate_volume
+        self.fields = list(fields)
+        index = {field: j for j, field in enumerate(self.fields)}
+        self.categories = [cat for cat in categories if cat in index]
+        self.recent_weight = recent_weight
+        missing = len(self.fields)  # index of the all-NaN column appended to every matrix
+
+        primary, fallback = [], []
+        for cat in self.categories:
+            if cat in rate_volume:
+                volumes = [rate_volume[cat]]
+            elif cat in pitching_categories:
+                volumes = ['IP']
+            elif cat in batting_categories:
+                volumes = ['PA', 'AB']
+            else:
+                volumes = []
+            volumes = [volume for volume in volumes if volume in index] + [None, None]
+            primary.append(index.get(volumes[0], missing))
+            fallback.append(index.get(volumes[1], missing))
+        self._columns = np.array([index[cat] for cat in self.categories], dtype=np.int64)
+        self._primary = np.array(primary, dtype=np.int64)
+        self._fallback = np.array(fallback, dtype=np.int64)
+        self._is_rate = np.array([cat in rate_volume for cat in self.categories])
+        self._stabilization = np.array([stabilization.get(self.fields[j], 0.0) if j < missing else 0.0
+                                        for j in primary], dtype=float)
+        self._volume_columns = np.array(sorted({j for j in primary + fallback if j < missing}), dtype=np.int64)
+
+    def _pad(self, matrix, rows):
+        if matrix is None:
+            return np.full((rows, len(self.fields) + 1), np.nan)
+        matrix = np.asarray(matrix, dtype=float)
+        return np.hstack([matrix, np.full((len(matrix), 1), np.nan)])
+
+    def _rates(self, padded):
+        """(values, playing time, rate) per category for one source"""
+        values = padded[:, self._columns]
+        volume = padded[:, self._primary]
+        volume = np.where(volume > 0, volume, padded[:, self._fallback])
+        volume = np.where(volume > 0, volume, np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = np.where(self._is_rate, values, values / volume)
+        return values, volume, rate
+
+    def blend(self, season, projected=None, recent=None):
+        """Blended (players x fields) matrix: projected categories and playing time"""
+        rows = len(season)
+        season_values, season_volume, season_rate = self._rates(self._pad(season, rows))
+        _, projected_volume, projected_rate = self._rates(self._pad(projected, rows))
+        _, recent_volume, recent_rate = self._rates(self._pad(recent, rows))
+
+        season_weight = np.where(np.isfinite(season_rate) & (season_volume > 0), season_volume, 0.0)
+        projected_weight = np.where(np.isfinite(projected_rate), self._stabilization, 0.0)
+        recent_weight = np.where(np.isfinite(recent_rate) & (recent_volume > 0),
+                                 self.recent_weight * recent_volume, 0.0)
+        total = season_weight + projected_weight + recent_weight
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = (np.nan_to_num(season_rate) * season_weight + np.nan_to_num(projected_rate) * projected_weight
+                    + np.nan_to_num(recent_rate) * recent_weight) / total
+        playing_time = np.where(projected_volume > 0, projected_volume, season_volume)
+        values = np.where(self._is_rate, rate, rate * playing_time)
+
+        # Season-only players (and anyone the sources cannot combine) keep their season line
+        season_only = (projected_weight == 0) & (recent_weight == 0)
+        projected_values = self._pad(projected, rows)[:, self._columns]
+        fallback = np.where(np.isnan(season_values), projected_values, season_values)
+        values = np.where(season_only | ~np.isfinite(values), fallback, values)
+
+        result = np.array(season, dtype=float, copy=True)
+        if projected is not None:
+            projected = np.asarray(projected, dtype=float)
+            volumes = self._volume_columns
+            result[:, volumes] = np.where(projected[:, volumes] > 0, projected[:, volumes], result[:, volumes])
+        result[:, self._columns] = values
+        return result
@@ -0,0 +1,127 @@
+import numpy as np
+
+# Built-in category metadata: 'lower' marks stats where less is better,
+# 'volume' the AB/PA/IP a rate stat is weighted by, 'bounds' the exclusive
+# range a value must fall in to be ranked (keeps position players out of
+# pitching leaderboards and drops junk rates) and 'decimals' how it is shown.
+# Stats not listed are higher-is-better counting stats.
+STAT_SPECS = {
+    'AVG': {'volume': 'AB'},
+    'OBP': {'volume': 'PA'},
+    'SLG': {'volume': 'AB'},
+    'OPS': {'volume': 'PA'},
+    'W': {'bounds': (0, None)},
+    'L': {'lower': True},
+    'SV': {'bounds': (0, None)},
+    'HLD': {'bounds': (0, None)},
+    'SVHD': {'bounds': (0, None)},
+    'QS': {'bounds': (0, None)},
+    'K': {'bounds': (0, None)},
+    'ERA': {'lower': True, 'volume': 'IP', 'bounds': (0, 10)},
+    'WHIP': {'lower': True, 'volume': 'IP', 'bounds': (0, 10)},
+    'K/9': {'volume': 'IP', 'bounds': (0, None)},
+    'K/BB': {'volume': 'IP', 'bounds': (0, None)},
+}
+
+# Rate categories and the volume stat each one is weighted by
+RATE_VOLUME = {cat: spec['volume'] for cat, spec in STAT_SPECS.items() if spec.get('volume')}
+
+# ESPN scoring types where players earn points instead of winning categories
+POINTS_SCORING_TYPES = ('H2H_POINTS', 'ROTO_POINTS', 'TOTAL_SEASON_POINTS')
+
+
+class ScoringSpec:
+    """Per-league category metadata compiled into arrays aligned with `categories`
+
+    `overrides` ({stat: {'lower', 'volume', 'bounds', 'decimals'}}) are laid
+    over STAT_SPECS. Built once per league, so analyses select columns with
+    columns() and apply direction, volume and bounds to whole (players x
+    categories) matrices instead of testing category names. With `points`
+    ({stat: points}) the league is a points league and a player's value is
+    one matrix product of stats and points.
+    """
+
+    def __init__(self, categories, overrides=None, points=None):
+        self.categories = list(categories)
+        self.index = {cat: j for j, cat in enumerate(self.categories)}
+        overrides = overrides or {}
+        specs = [dict(STAT_SPECS.get(cat, {}), **overrides.get(cat, {})) for cat in self.categories]
+        self.lower_is_better = np.array([bool(spec.get('lower')) for spec in specs], dtype=bool)
+        self.sign = np.where(self.lower_is_better, -1.0, 1.0)
+        self.volumes = [spec.get('volume') for spec in specs]
+        self.is_rate = np.array([volume is not None for volume in self.volumes], dtype=bool)
+        self.rate_volume = {cat: volume for cat, volume in zip(self.categories, self.volumes) if volume}
+        bounds = [spec.get('bounds') or (None, None) for spec in specs]
+        self.lower_bounds = np.array([-np.inf if low is None else low for low, _ in bounds], dtype=float)
+        self.upper_bounds = np.array([np.inf if high is None else high for _, high in bounds], dtype=float)
+        self.decimals = [spec.get('decimals', 3 if spec.get('volume') else 0) for spec in specs]
+        self.points = None
+        if points is not None:
+            self.points = np.array([float(points.get(cat, 0.0)) for cat in self.categories])
+
+    def __repr__(self):
+        kind = 'points' if self.points is not None else 'categories'
+        return f"ScoringSpec({kind}: {', '.join(self.categories)})"
+
+    def columns(self, categories):
+        """Positions of `categories` in the compiled arrays (unknown ones raise KeyError)"""
+        return np.array([self.index[cat] for cat in categories], dtype=np.int64)
+
+    def lower(self, categories):
+        """Lower-is-better mask for `categories`"""
+        return self.lower_is_better[self.columns(categories)]
+
+    def valid(self, values, categories):
+        """Mask of a (players x categories) matrix: present and inside the sanity bounds"""
+        columns = self.columns(categories)
+        return ~np.isnan(values) & (values > self.lower_bounds[columns]) & (values < self.upper_bounds[columns])
+
+    def points_value(self, values, categories=None):
+        """Fantasy points for a (players x categories) matrix; missing stats score nothing"""
+        points = self.points if categories is None else self.points[self.columns(categories)]
+        return np.nan_to_num(values) @ points
+
+    def format(self, cat, value):
+        """A category value as it is printed (rates to 3 decimals, counting stats whole)"""
+        decimals = self.decimals[self.index[cat]] if cat in self.index else 0
+        return f"{value:.{decimals}f}"
+
+
+def espn_scoring(league):
+    """(overrides, points) read from an espn_api league's scoring settings
+
+    Direction comes from each scoring item's isReverseItem and points from
+    its points, for points leagues only. Leagues without scoring items (local
+    snapshots, synthetic leagues) give ({}, None).
+    """
+    settings = getattr(league, 'settings', None)
+    raw = getattr(settings, '_raw_scoring_settings', None) or {}
+    items = raw.get('scoringItems') or []
+    if not items:
+        return {}, None
+    from espn_api.baseball.constant import STATS_MAP
+    overrides, points = {}, {}
+    for item in items:
+        stat = STATS_MAP.get(item.get('statId'))
+        if stat is None:
+            continue
+        overrides[stat] = {'lower': bool(item.get('isReverseItem'))}
+        points[stat] = float(item.get('points', 0.0))
+    scoring_type = raw.get('scoringType') or getattr(settings, 'scoring_type', None)
+    return overrides, points if scoring_type in POINTS_SCORING_TYPES else None
+
+
+def league_spec(league, categories):
+    """ScoringSpec for a league: built-ins, then its ESPN settings, then config.py
+
+    CATEGORY_SPECS in config.py overrides single fields of any category and
+    POINTS_SCORING, when set, turns the league into a points league whatever
+    ESPN reports.
+    """
+    from config import CATEGORY_SPECS, POINTS_SCORING
+    overrides, points = espn_scoring(league)
+    for cat, spec in CATEGORY_SPECS.items():
+        overrides[cat] = dict(overrides.get(cat, {}), **spec)
+    if POINTS_SCORING is not None:
+        points = POINTS_SCORING
+    return ScoringSpec(categories, overrides, points)
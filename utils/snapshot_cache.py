@@ -0,0 +1,458 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+from utils.free_agents import free_agent_transport, LocalFreeAgentTransport
+
+# Player attributes the analysis modules read off espn_api Player objects
+PLAYER_FIELDS = ['playerId', 'name', 'position', 'proTeam', 'injured',
+                 'injuryStatus', 'eligibleSlots']
+
+# Default time-to-live (seconds) per cached entity kind
+DEFAULT_TTL = {
+    'league': 24 * 60 * 60,
+    'team': 15 * 60,
+    'player': 15 * 60,
+    'free_agents': 10 * 60,
+}
+
+
+def _fingerprint(payload):
+    """Stable hash of a JSON-serializable payload"""
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+def _restore_keys(stats):
+    """JSON turns the integer scoring-period keys of player.stats into strings"""
+    return {int(k) if isinstance(k, str) and k.lstrip('-').isdigit() else k: v
+            for k, v in (stats or {}).items()}
+
+
+def _team_owner(team):
+    owner = getattr(team, 'owner', None)
+    if owner:
+        return owner
+    owners = getattr(team, 'owners', None) or []
+    if owners and isinstance(owners[0], dict):
+        first = owners[0]
+        full_name = f"{first.get('firstName', '')} {first.get('lastName', '')}".strip()
+        return full_name or first.get('displayName', 'Unknown')
+    return 'Unknown'
+
+
+def serialize_player(player):
+    """Convert an espn_api Player into a plain dict that can be stored on disk"""
+    data = {field: getattr(player, field, None) for field in PLAYER_FIELDS}
+    stats = {}
+    for period, period_stats in (getattr(player, 'stats', None) or {}).items():
+        stats[period] = {key: value for key, value in period_stats.items()
+                         if key in ('breakdown', 'projected_breakdown', 'points', 'projected_points')}
+    data['stats'] = stats
+    return data
+
+
+def _team_id(team):
+    return getattr(team, 'team_id', team)
+
+
+def serialize_team(team):
+    """Convert an espn_api Team into a dict that references its players (and opponents) by id"""
+    return {
+        'team_id': team.team_id,
+        'team_name': team.team_name,
+        'owner': _team_owner(team),
+        'wins': getattr(team, 'wins', 0),
+        'losses': getattr(team, 'losses', 0),
+        'ties': getattr(team, 'ties', 0),
+        'schedule': [{'home_team': _team_id(getattr(matchup, 'home_team', None)),
+                      'away_team': _team_id(getattr(matchup, 'away_team', None))}
+                     for matchup in getattr(team, 'schedule', None) or []],
+        'roster': [{'playerId': getattr(p, 'playerId', None),
+                    'lineupSlot': getattr(p, 'lineupSlot', 'Unknown')}
+                   for p in team.roster],
+    }
+
+
+def league_settings(meta):
+    """The league settings the analyses read, rebuilt from serialize_league() output"""
+    scoring = meta.get('scoring_settings') or {}
+    return SimpleNamespace(name=meta.get('name', 'Unknown'),
+                           reg_season_count=meta.get('reg_season_count'),
+                           playoff_team_count=meta.get('playoff_team_count'),
+                           scoring_type=scoring.get('scoringType'),
+                           _raw_scoring_settings=scoring)
+
+
+def serialize_league(league):
+    settings = getattr(league, 'settings', None)
+    # Only the parts of ESPN's scoringSettings that utils.scoring reads
+    raw_scoring = getattr(settings, '_raw_scoring_settings', None) or {}
+    return {
+        'league_id': getattr(league, 'league_id', None),
+        'name': getattr(settings, 'name', 'Unknown'),
+        'scoring_type': getattr(league, 'scoring_type', None),
+        'current_week': getattr(league, 'current_week', None),
+        'current_matchup_period': getattr(league, 'currentMatchupPeriod', None),
+        'reg_season_count': getattr(settings, 'reg_season_count', None),
+        'playoff_team_count': getattr(settings, 'playoff_team_count', None),
+        'scoring_settings': {key: raw_scoring[key] for key in ('scoringType', 'scoringItems') if key in raw_scoring},
+        'year': getattr(league, 'year', None),
+        'team_ids': [team.team_id for team in league.teams],
+    }
+
+
+class CachedPlayer:
+    """Lightweight stand-in for espn_api's Player, rebuilt from a snapshot"""
+
+    def __init__(self, data, lineup_slot=''):
+        for field in PLAYER_FIELDS:
+            setattr(self, field, data.get(field))
+        if self.injured is None:
+            self.injured = False
+        self.lineupSlot = lineup_slot
+        self.stats = _restore_keys(data.get('stats'))
+
+    def __repr__(self):
+        return f"Player({self.name})"
+
+
+class CachedTeam:
+    """Lightweight stand-in for espn_api's Team, rebuilt from a snapshot"""
+
+    def __init__(self, data, roster):
+        self.team_id = data['team_id']
+        self.team_name = data['team_name']
+        self.owner = data.get('owner', 'Unknown')
+        self.wins = data.get('wins', 0)
+        self.losses = data.get('losses', 0)
+        self.ties = data.get('ties', 0)
+        # Matchups keep team ids; analysis.simulation accepts either ids or Team objects
+        self.schedule = [SimpleNamespace(**matchup) for matchup in data.get('schedule', [])]
+        self.roster = roster
+
+    def __repr__(self):
+        return f"Team({self.team_name})"
+
+
+class SnapshotStore:
+    """SQLite-backed store of league entities with a per-kind TTL
+
+    Every row is keyed by (league, kind, key) and carries a fingerprint of its
+    payload, so writing an unchanged entity only bumps its fetch time.
+    """
+
+    def __init__(self, path, ttl=None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl = dict(DEFAULT_TTL)
+        if ttl:
+            self.ttl.update(ttl)
+        # One connection shared by the free-agent fetch threads, so serialize access
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entities ("
+            " league TEXT NOT NULL, kind TEXT NOT NULL, key TEXT NOT NULL,"
+            " payload TEXT NOT NULL, fingerprint TEXT NOT NULL, fetched_at REAL NOT NULL,"
+            " PRIMARY KEY (league, kind, key))"
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def is_fresh(self, fetched_at, kind, now=None):
+        now = time.time() if now is None else now
+        return now - fetched_at <= self.ttl.get(kind, 0)
+
+    def get(self, league, kind, key, fresh_only=True):
+        """Return the stored payload, or None if missing (or stale when fresh_only)"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT payload, fetched_at FROM entities WHERE league=? AND kind=? AND key=?",
+                (league, kind, str(key))
+            ).fetchone()
+        if row is None:
+            return None
+        if fresh_only and not self.is_fresh(row[1], kind):
+            return None
+        return json.loads(row[0])
+
+    def get_many(self, league, kind, keys, fresh_only=False):
+        """Return {key: payload} for the stored keys (only those within the TTL when fresh_only)"""
+        keys = [str(k) for k in keys]
+        found = {}
+        now = time.time()
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            with self.lock:
+                rows = self.conn.execute(
+                    f"SELECT key, payload, fetched_at FROM entities"
+                    f" WHERE league=? AND kind=? AND key IN ({placeholders})",
+                    [league, kind] + chunk
+                ).fetchall()
+            found.update({key: json.loads(payload) for key, payload, fetched_at in rows
+                          if not fresh_only or self.is_fresh(fetched_at, kind, now)})
+        return found
+
+    def put(self, league, kind, key, payload, commit=True):
+        """Store an entity, returning True if its content changed"""
+        fingerprint = _fingerprint(payload)
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT fingerprint FROM entities WHERE league=? AND kind=? AND key=?",
+                (league, kind, str(key))
+            ).fetchone()
+            if row is not None and row[0] == fingerprint:
+                self.conn.execute(
+                    "UPDATE entities SET fetched_at=? WHERE league=? AND kind=? AND key=?",
+                    (now, league, kind, str(key))
+                )
+                changed = False
+            else:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO entities VALUES (?, ?, ?, ?, ?, ?)",
+                    (league, kind, str(key), json.dumps(payload, default=str), fingerprint, now)
+                )
+                changed = True
+            if commit:
+                self.conn.commit()
+        return changed
+
+    def commit(self):
+        with self.lock:
+            self.conn.commit()
+
+
+class CachedLeague:
+    """League facade served from a SnapshotStore
+
+    Exposes the parts of espn_api's League the analyses use (settings.name,
+    teams[*].roster and free_agents()). The live league is only built, through
+    `loader`, when a cached entity is missing or has outlived its TTL.
+    """
+
+    def __init__(self, store, league_key, loader=None, league_id=None):
+        self.store = store
+        self.league_key = league_key
+        self.league_id = league_id
+        self._loader = loader
+        self._live = None
+        self.refreshed = {'league': 0, 'team': 0, 'player': 0, 'free_agents': 0}
+        self.teams = []
+        self.settings = SimpleNamespace(name='Unknown')
+        self.scoring_type = None
+        self.current_week = None
+        self.currentMatchupPeriod = None
+        self.year = None
+
+    def live_league(self):
+        """Build (once) the underlying live league"""
+        if self._live is None:
+            if self._loader is None:
+                raise RuntimeError("Snapshot is stale or incomplete and no league loader was given")
+            self._live = self._loader()
+        return self._live
+
+    def load(self, refresh=False):
+        """Populate teams and rosters, from disk when every entity is fresh"""
+        meta = None if refresh else self.store.get(self.league_key, 'league', 'meta')
+        teams = None
+        if meta is not None:
+            teams = self.store.get_many(self.league_key, 'team', meta['team_ids'], fresh_only=True)
+            if len(teams) < len(meta['team_ids']):
+                teams = None
+
+        refreshed = teams is None
+        if refreshed:
+            meta, teams = self._refresh_from_live()
+
+        player_ids = [entry['playerId'] for team in teams.values() for entry in team['roster']]
+        players = self.store.get_many(self.league_key, 'player', player_ids, fresh_only=not refreshed)
+        if not refreshed and len(players) < len({str(pid) for pid in player_ids}):
+            # A rostered player is missing or older than CACHE_TTL['player']
+            meta, teams = self._refresh_from_live()
+            player_ids = [entry['playerId'] for team in teams.values() for entry in team['roster']]
+            players = self.store.get_many(self.league_key, 'player', player_ids)
+
+        self._apply_meta(meta)
+        self.teams = []
+        for team_id in meta['team_ids']:
+            team = teams[str(team_id)]
+            roster = [CachedPlayer(players[str(entry['playerId'])], entry['lineupSlot'])
+                      for entry in team['roster'] if str(entry['playerId']) in players]
+            self.teams.append(CachedTeam(team, roster))
+        return self
+
+    def _apply_meta(self, meta):
+        self.settings = league_settings(meta)
+        self.scoring_type = meta.get('scoring_type')
+        self.current_week = meta.get('current_week')
+        self.currentMatchupPeriod = meta.get('current_matchup_period')
+        self.year = meta.get('year')
+
+    def _refresh_from_live(self):
+        """Fetch the live league and write only the entities whose content changed"""
+        league = self.live_league()
+        meta = serialize_league(league)
+        teams = {}
+        if self.store.put(self.league_key, 'league', 'meta', meta, commit=False):
+            self.refreshed['league'] += 1
+        for team in league.teams:
+            team_data = serialize_team(team)
+            teams[str(team.team_id)] = team_data
+            if self.store.put(self.league_key, 'team', team.team_id, team_data, commit=False):
+                self.refreshed['team'] += 1
+            for player in team.roster:
+                if self.store.put(self.league_key, 'player', player.playerId,
+                                  serialize_player(player), commit=False):
+                    self.refreshed['player'] += 1
+        self.store.commit()
+        return meta, teams
+
+    def free_agents(self, week=None, size=50, position=None, position_id=None):
+        """Cached equivalent of League.free_agents()"""
+        key = f"{week}:{size}:{position}:{position_id}"
+        ids = self.store.get(self.league_key, 'free_agents', key)
+        if ids is None:
+            players = self.live_league().free_agents(week=week, size=size,
+                                                     position=position, position_id=position_id)
+            ids = [p.playerId for p in players]
+            for player in players:
+                self.store.put(self.league_key, 'player', player.playerId,
+                               serialize_player(player), commit=False)
+            if self.store.put(self.league_key, 'free_agents', key, ids, commit=False):
+                self.refreshed['free_agents'] += 1
+            self.store.commit()
+        stored = self.store.get_many(self.league_key, 'player', ids)
+        return [CachedPlayer(stored[str(pid)]) for pid in ids if str(pid) in stored]
+
+    def free_agent_transport(self):
+        """Free-agent page transport that serves fresh pages from the store"""
+        return CachedFreeAgentTransport(self)
+
+
+class CachedFreeAgentTransport:
+    """Caches each free-agent page (offset, limit, position) under its own TTL"""
+
+    def __init__(self, league):
+        self.league = league
+        self._live = None
+        self._live_lock = threading.Lock()
+
+    def _live_transport(self):
+        with self._live_lock:
+            if self._live is None:
+                self._live = free_agent_transport(self.league.live_league())
+            return self._live
+
+    def fetch_page(self, offset, limit, position=None):
+        store, league_key = self.league.store, self.league.league_key
+        key = f"page:{offset}:{limit}:{position}"
+        ids = store.get(league_key, 'free_agents', key)
+        if ids is None:
+            players = self._live_transport().fetch_page(offset, limit, position)
+            ids = [p.playerId for p in players]
+            for player in players:
+                store.put(league_key, 'player', player.playerId, serialize_player(player), commit=False)
+            if store.put(league_key, 'free_agents', key, ids, commit=False):
+                self.league.refreshed['free_agents'] += 1
+            store.commit()
+        stored = store.get_many(league_key, 'player', ids)
+        return [CachedPlayer(stored[str(pid)]) for pid in ids if str(pid) in stored]
+
+
+def load_league(league_id, year, espn_s2=None, swid=None, cache_dir='.cache',
+                ttl=None, refresh=False, loader=None):
+    """Return a league served from the local snapshot cache
+
+    `loader` builds the live league when the cache needs refreshing; by default
+    it connects to ESPN through the shared, rate-limited ApiClient. Pass a
+    replay loader to run fully offline.
+    """
+    if loader is None:
+        def loader():
+            from utils.api_client import load_live_league
+            return load_live_league(league_id, year, espn_s2=espn_s2, swid=swid)
+
+    store = SnapshotStore(os.path.join(cache_dir, 'snapshots.sqlite3'), ttl=ttl)
+    league = CachedLeague(store, f"{league_id}:{year}", loader=loader, league_id=league_id)
+    return league.load(refresh=refresh)
+
+
+def record_snapshot(league, path, free_agent_sizes=(100,)):
+    """Write a league (teams, rosters, stats and free-agent pages) to a JSON file"""
+    players = {}
+    teams = []
+    for team in league.teams:
+        teams.append(serialize_team(team))
+        for player in team.roster:
+            players[str(player.playerId)] = serialize_player(player)
+    free_agents = {}
+    for size in free_agent_sizes:
+        page = league.free_agents(size=size)
+        free_agents[str(size)] = [p.playerId for p in page]
+        for player in page:
+            players.setdefault(str(player.playerId), serialize_player(player))
+
+    snapshot = {
+        'league': serialize_league(league),
+        'teams': teams,
+        'players': players,
+        'free_agents': free_agents,
+        'recorded_at': time.time(),
+    }
+    with open(path, 'w') as f:
+        json.dump(snapshot, f, default=str)
+    return snapshot
+
+
+class ReplayLeague:
+    """League rebuilt from a recorded JSON snapshot, without any network access"""
+
+    def __init__(self, snapshot):
+        meta = snapshot['league']
+        self.league_id = meta.get('league_id')
+        self.settings = league_settings(meta)
+        self.scoring_type = meta.get('scoring_type')
+        self.current_week = meta.get('current_week')
+        self.currentMatchupPeriod = meta.get('current_matchup_period')
+        self.year = meta.get('year')
+        self._players = snapshot['players']
+        self._free_agents = {int(size): ids for size, ids in snapshot.get('free_agents', {}).items()}
+        self.teams = []
+        for team in snapshot['teams']:
+            roster = [CachedPlayer(self._players[str(entry['playerId'])], entry['lineupSlot'])
+                      for entry in team['roster'] if str(entry['playerId']) in self._players]
+            self.teams.append(CachedTeam(team, roster))
+
+    def free_agents(self, week=None, size=50, position=None, position_id=None):
+        # Serve the smallest recorded page that covers the request
+        sizes = sorted(s for s in self._free_agents if s >= size) or sorted(self._free_agents)[-1:]
+        if not sizes:
+            return []
+        ids = self._free_agents[sizes[0]][:size]
+        players = [CachedPlayer(self._players[str(pid)]) for pid in ids if str(pid) in self._players]
+        if position:
+            players = [p for p in players
+                       if p.position == position or position in (p.eligibleSlots or [])]
+        return players
+
+    def free_agent_transport(self):
+        # Page over the largest recorded free-agent list
+        return LocalFreeAgentTransport(self.free_agents(size=max(self._free_agents, default=0)))
+
+
+def replay_snapshot(path):
+    """Load a recorded snapshot file as an offline league"""
+    with open(path) as f:
+        return ReplayLeague(json.load(f))
@@ -0,0 +1,255 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import date
+import numpy as np
+import pandas as pd
+# Rate stats and the volume they are averaged over (utils.scoring.STAT_SPECS);
+# rolling windows rebuild them from volume-weighted differences (e.g. hits = AVG * AB)
+from utils.scoring import RATE_VOLUME
+
+
+def day_number(day=None):
+    """Day ordinal for a date, ISO string or None (today)"""
+    if day is None:
+        return date.today().toordinal()
+    if isinstance(day, int):
+        return day
+    if isinstance(day, str):
+        return date.fromisoformat(day).toordinal()
+    return day.toordinal()
+
+
+def numeric_breakdown(player, stats=None):
+    """A player's season breakdown as {stat: float}, with IP derived from OUTS"""
+    season = (getattr(player, 'stats', None) or {}).get(0, {})
+    breakdown = season.get('breakdown') or {}
+    values = {}
+    for key, value in breakdown.items():
+        if stats is not None and key not in stats and not (key == 'OUTS' and 'IP' in stats):
+            continue
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[str(key)] = float(value)
+    if 'IP' not in values and 'OUTS' in values:
+        values['IP'] = values['OUTS'] / 3
+    return values
+
+
+class StatHistory:
+    """Append-only daily snapshots of player stat breakdowns in SQLite
+
+    Each row holds one player's breakdown for one day as a packed float32
+    vector; the stat names of each vector layout are stored once. A player is
+    only written when their breakdown differs from their latest snapshot, so
+    idle days (and repeat runs) cost nothing. Rows are keyed by
+    (league, player, day) with a second index on (league, day).
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS stat_layouts ("
+            " layout_id INTEGER PRIMARY KEY, names TEXT NOT NULL UNIQUE)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS stat_snapshots ("
+            " league TEXT NOT NULL, player_id INTEGER NOT NULL, day INTEGER NOT NULL,"
+            " layout_id INTEGER NOT NULL, stat_values BLOB NOT NULL,"
+            " PRIMARY KEY (league, player_id, day)) WITHOUT ROWID"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS stat_snapshots_day ON stat_snapshots (league, day)")
+        self.conn.commit()
+        self._layouts = {}      # layout_id -> tuple of stat names
+        self._layout_ids = {}   # tuple of stat names -> layout_id
+        for layout_id, names in self.conn.execute("SELECT layout_id, names FROM stat_layouts"):
+            self._remember_layout(layout_id, tuple(json.loads(names)))
+
+    def close(self):
+        self.conn.close()
+
+    def _remember_layout(self, layout_id, names):
+        self._layouts[layout_id] = names
+        self._layout_ids[names] = layout_id
+
+    def _layout_id(self, names):
+        if names not in self._layout_ids:
+            cursor = self.conn.execute("INSERT INTO stat_layouts (names) VALUES (?)", (json.dumps(names),))
+            self._remember_layout(cursor.lastrowid, names)
+        return self._layout_ids[names]
+
+    def _latest_rows(self, league, day):
+        """Each player's most recent (player_id, day, layout_id, blob) at or before `day`"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT s.player_id, s.day, s.layout_id, s.stat_values FROM stat_snapshots s"
+                " JOIN (SELECT player_id, MAX(day) AS day FROM stat_snapshots"
+                "       WHERE league=? AND day<=? GROUP BY player_id) m"
+                " ON s.player_id = m.player_id AND s.day = m.day WHERE s.league=?",
+                (str(league), day, str(league))
+            ).fetchall()
+
+    def record(self, league, snapshots, day=None):
+        """Store {player_id: {stat: value}} for `day`; returns the number of rows written"""
+        day = day_number(day)
+        with self.lock:
+            latest = {player_id: (layout_id, blob)
+                      for player_id, _, layout_id, blob in self._latest_rows(league, day)}
+            rows = []
+            for player_id, values in snapshots.items():
+                if not values:
+                    continue
+                names = tuple(sorted(values))
+                layout_id = self._layout_id(names)
+                blob = np.array([values[name] for name in names], dtype='<f4').tobytes()
+                if latest.get(player_id) == (layout_id, blob):
+                    continue
+                rows.append((str(league), int(player_id), day, layout_id, blob))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO stat_snapshots (league, player_id, day, layout_id, stat_values)"
+                " VALUES (?, ?, ?, ?, ?)", rows)
+            self.conn.commit()
+        return len(rows)
+
+    def snapshot(self, league, day=None, stats=None):
+        """Latest known stats per player as of `day` (DataFrame indexed by player id)
+
+        Includes a 'day' column with the date ordinal each row was recorded on.
+        """
+        rows = self._latest_rows(league, day_number(day))
+        if not rows:
+            return pd.DataFrame(columns=(list(stats) if stats else []) + ['day'])
+        names = list(stats) if stats else sorted({name for row in rows for name in self._layouts[row[2]]})
+        column_of = {name: j for j, name in enumerate(names)}
+        matrix = np.full((len(rows), len(names)), np.nan)
+
+        # Decode all rows sharing a layout in one frombuffer call
+        by_layout = {}
+        for i, row in enumerate(rows):
+            by_layout.setdefault(row[2], []).append(i)
+        for layout_id, positions in by_layout.items():
+            layout = self._layouts[layout_id]
+            values = np.frombuffer(b''.join(rows[i][3] for i in positions), dtype='<f4')
+            values = values.reshape(len(positions), len(layout)).astype(float)
+            src = [k for k, name in enumerate(layout) if name in column_of]
+            dst = [column_of[layout[k]] for k in src]
+            matrix[np.ix_(positions, dst)] = values[:, src]
+
+        table = pd.DataFrame(matrix, columns=names, index=pd.Index([row[0] for row in rows], name='id'))
+        table['day'] = [row[1] for row in rows]
+        return table.sort_index()
+
+    def window(self, league, days, end=None, stats=None):
+        """Stats accumulated over the `days` days ending at `end`
+
+        Counting stats are the difference between each player's snapshot at
+        `end` and at the window start. Rate stats are rebuilt from
+        volume-weighted differences, e.g. window AVG = delta(AVG * AB) /
+        delta(AB). Players without a snapshot at or before the window start get
+        NaN, since their first snapshot already holds season totals, and so does
+        everyone when no snapshot was recorded inside the window.
+        """
+        end = day_number(end)
+        start = end - days
+        needed = None
+        if stats:
+            needed = list(dict.fromkeys(list(stats) + [RATE_VOLUME[s] for s in stats if s in RATE_VOLUME]))
+        after = self.snapshot(league, end, needed)
+        before = self.snapshot(league, start, needed).reindex(index=after.index, columns=after.columns)
+        names = [name for name in after.columns if name != 'day']
+        current = after[names].to_numpy(dtype=float)
+        previous = before[names].to_numpy(dtype=float)
+        delta = current - previous
+
+        column_of = {name: j for j, name in enumerate(names)}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for rate, volume in RATE_VOLUME.items():
+                if rate not in column_of or volume not in column_of:
+                    continue
+                r, v = column_of[rate], column_of[volume]
+                weighted = (np.nan_to_num(current[:, r]) * np.nan_to_num(current[:, v])
+                            - np.nan_to_num(previous[:, r]) * np.nan_to_num(previous[:, v]))
+                rate_delta = np.where(delta[:, v] > 0, weighted / delta[:, v], np.nan)
+                delta[:, r] = np.where(np.isnan(previous[:, v]), np.nan, rate_delta)
+
+        result = pd.DataFrame(delta, columns=names, index=after.index)
+        if stats:
+            result = result[[s for s in stats if s in result.columns]]
+        # Days since each player's baseline snapshot; NaN when there is no
+        # baseline or nothing at all was recorded inside the window
+        result['days'] = end - before['day']
+        if len(after) and after['day'].max() <= start:
+            result[:] = np.nan
+        return result
+
+    def deltas(self, league, categories, windows=(7, 14, 30), end=None):
+        """Per-category window values side by side, as columns like 'HR_7', 'AVG_30'"""
+        frames = []
+        for days in windows:
+            frame = self.window(league, days, end=end, stats=categories).drop(columns='days')
+            frames.append(frame.add_suffix(f"_{days}"))
+        return pd.concat(frames, axis=1) if frames else pd.DataFrame()
+
+    def prune(self, league, before):
+        """Drop snapshots older than `before` except each player's latest one"""
+        cutoff = day_number(before)
+        with self.lock:
+            cursor = self.conn.execute(
+                "DELETE FROM stat_snapshots WHERE league=? AND day<? AND (player_id, day) NOT IN"
+                " (SELECT player_id, MAX(day) FROM stat_snapshots WHERE league=? AND day<? GROUP BY player_id)",
+                (str(league), cutoff, str(league), cutoff))
+            self.conn.commit()
+        return cursor.rowcount
+
+
+def league_key(league):
+    """Identifier the history is stored under for a league: its ESPN league id
+
+    League names are not unique, so a league without an id gets None and
+    no history rather than sharing another league's.
+    """
+    league_id = getattr(league, 'league_id', None)
+    return None if league_id is None else str(league_id)
+
+
+def record_league(history, league, free_agents=None, day=None, stats=None):
+    """Record every rostered player (and any fetched free agents) for `day`
+
+    History is optional, so a league without a league_id is skipped with a
+    note instead of failing the run; returns the number of rows written.
+    """
+    key = league_key(league)
+    if key is None:
+        print("Stat history skipped: the league has no league_id")
+        return 0
+    snapshots = {}
+    for team in league.teams:
+        for player in team.roster:
+            snapshots[getattr(player, 'playerId', None)] = numeric_breakdown(player, stats)
+    for player in free_agents or []:
+        snapshots[getattr(player, 'playerId', None)] = numeric_breakdown(player, stats)
+    snapshots.pop(None, None)
+    return history.record(key, snapshots, day)
+
+
+def recent_table(history, league, table, days, categories, end=None):
+    """Window stats aligned row-for-row with a player table (matched on 'id')
+
+    All NaN (no recent form) for a league without a league_id.
+    """
+    key = league_key(league)
+    if key is None:
+        window = pd.DataFrame(columns=list(categories) + ['days'], dtype=float)
+    else:
+        window = history.window(key, days, end=end, stats=categories)
+    recent = window.reindex(table['id'].to_numpy())
+    recent.index = table.index
+    for column in ('rostered', 'fantasy_team_id', 'lineupSlot'):
+        if column in table.columns:
+            recent[column] = table[column]
+    return recent
@@ -0,0 +1,205 @@
+import random
+from utils.free_agents import LocalFreeAgentTransport
+
+HITTER_POSITIONS = ['C', '1B', '2B', '3B', 'SS', 'OF', 'OF', 'OF', 'DH']
+PRO_TEAMS = ['Ari', 'Atl', 'Bal', 'Bos', 'ChC', 'ChW', 'Cin', 'Cle', 'Col', 'Det',
+             'Hou', 'KC', 'LAA', 'LAD', 'Mia', 'Mil', 'Min', 'NYM', 'NYY', 'Oak',
+             'Phi', 'Pit', 'SD', 'SF', 'Sea', 'StL', 'TB', 'Tex', 'Tor', 'Wsh']
+INJURY_STATUSES = ['DAY_TO_DAY', 'TEN_DAY_DL', 'FIFTEEN_DAY_DL', 'SIXTY_DAY_DL', 'OUT']
+
+# Starting lineup used for rostered players; everyone past it sits on the bench
+LINEUP_SLOTS = ['C', '1B', '2B', '3B', 'SS', 'OF', 'OF', 'OF', 'UTIL',
+                'SP', 'SP', 'SP', 'SP', 'SP', 'RP', 'RP', 'P', 'P']
+
+
+def hitter_breakdown(rng, scale=1.0):
+    """Season batting line with internally consistent rate stats"""
+    pa = max(1, int(rng.triangular(20, 700, 450) * scale))
+    bb = int(pa * rng.uniform(0.04, 0.15))
+    hbp = int(pa * rng.uniform(0.0, 0.02))
+    sf = int(pa * rng.uniform(0.0, 0.01))
+    ab = max(1, pa - bb - hbp - sf)
+    h = int(ab * rng.gauss(0.250, 0.030))
+    h = min(max(h, 0), ab)
+    hr = int(h * rng.uniform(0.02, 0.25))
+    doubles = int((h - hr) * rng.uniform(0.15, 0.30))
+    triples = int((h - hr - doubles) * rng.uniform(0.0, 0.05))
+    return {
+        'AB': ab, 'H': h, '1B': h - hr - doubles - triples, '2B': doubles, '3B': triples, 'HR': hr,
+        'B_BB': bb, 'HBP': hbp, 'SF': sf, 'PA': pa,
+        'R': int(h * rng.uniform(0.35, 0.65) + bb * 0.3),
+        'RBI': int(hr * rng.uniform(1.4, 1.9) + (h - hr) * rng.uniform(0.2, 0.4)),
+        'SB': int(rng.expovariate(1 / 6.0) * scale),
+        'CS': int(rng.expovariate(1 / 2.0) * scale),
+        'B_SO': int(pa * rng.uniform(0.12, 0.32)),
+        'AVG': h / ab,
+        'OBP': (h + bb + hbp) / pa,
+        'SLG': (h + doubles + 2 * triples + 3 * hr) / ab,
+    }
+
+
+def pitcher_breakdown(rng, starter, scale=1.0):
+    """Season pitching line; ERA/WHIP follow from ER, hits and walks over OUTS"""
+    innings = rng.triangular(20, 200, 150) if starter else rng.triangular(5, 80, 55)
+    outs = max(1, int(innings * 3 * scale))
+    hits = int(outs / 3 * rng.uniform(0.65, 1.15))
+    walks = int(outs / 3 * rng.uniform(0.2, 0.5))
+    earned = int(outs / 27 * rng.uniform(2.2, 6.0))
+    games = int(outs / 3 / (rng.uniform(5, 6.5) if starter else 1.0)) or 1
+    saves = 0 if starter else int(rng.random() < 0.3) * rng.randint(0, 40)
+    return {
+        'GP': games, 'GS': games if starter else 0, 'OUTS': outs,
+        'P_H': hits, 'P_BB': walks, 'ER': earned,
+        'K': int(outs / 3 * rng.uniform(0.6, 1.4)),
+        'W': int(games * rng.uniform(0.2, 0.45)) if starter else rng.randint(0, 8),
+        'L': int(games * rng.uniform(0.15, 0.4)) if starter else rng.randint(0, 6),
+        'SV': saves, 'SVO': saves + rng.randint(0, 5) if saves else 0,
+        'HLD': 0 if starter else rng.randint(0, 25),
+        'QS': int(games * rng.uniform(0.2, 0.6)) if starter else 0,
+        'ERA': earned * 27 / outs,
+        'WHIP': (hits + walks) * 3 / outs,
+    }
+
+
+def slot_position(lineup_slot, rng):
+    """Primary position for a player filling `lineup_slot` (bench/FA: random mix)"""
+    if lineup_slot in HITTER_POSITIONS or lineup_slot in ('SP', 'RP'):
+        return lineup_slot
+    if lineup_slot == 'UTIL':
+        return rng.choice(HITTER_POSITIONS)
+    if lineup_slot == 'P' or rng.random() < 0.45:
+        return 'SP' if rng.random() < 0.55 else 'RP'
+    return rng.choice(HITTER_POSITIONS)
+
+
+class SyntheticPlayer:
+    """Mimics the espn_api baseball Player attributes the analyzers read"""
+
+    def __init__(self, player_id, rng, lineup_slot=''):
+        self.playerId = player_id
+        self.proTeam = rng.choice(PRO_TEAMS)
+        self.lineupSlot = lineup_slot
+        self.acquisitionType = 'DRAFT' if lineup_slot else ''
+        # Bench/free-agent depth plays less
+        scale = 1.0 if lineup_slot not in ('', 'BE', 'IL') else rng.uniform(0.2, 1.0)
+        position = slot_position(lineup_slot, rng)
+        if position in ('SP', 'RP'):
+            self.position = position
+            self.eligibleSlots = [self.position, 'P', 'BE', 'IL']
+            breakdown = pitcher_breakdown(rng, position == 'SP', scale)
+        else:
+            self.position = position
+            self.eligibleSlots = [self.position, 'UTIL', 'BE', 'IL']
+            if self.position in ('1B', '3B'):
+                self.eligibleSlots.insert(1, '1B/3B')
+            elif self.position in ('2B', 'SS'):
+                self.eligibleSlots.insert(1, '2B/SS')
+            breakdown = hitter_breakdown(rng, scale)
+        # Rest-of-season projection from its own generator, so the season draws above are unchanged
+        projection_rng = random.Random(player_id)
+        if position in ('SP', 'RP'):
+            projection = pitcher_breakdown(projection_rng, position == 'SP', scale)
+        else:
+            projection = hitter_breakdown(projection_rng, scale)
+        self.name = f"Synthetic {self.position} {player_id}"
+        self.injured = lineup_slot == 'IL' or rng.random() < 0.08
+        self.injuryStatus = rng.choice(INJURY_STATUSES) if self.injured else 'ACTIVE'
+        # Some players (call-ups, prospects) only have projections
+        if rng.random() < 0.03:
+            self.stats = {0: {'breakdown': {}, 'projected_breakdown': breakdown}}
+        else:
+            self.stats = {0: {'breakdown': breakdown, 'projected_breakdown': projection}}
+        self.total_points = 0
+        self.projected_total_points = 0
+
+    def __repr__(self):
+        return f"Player({self.name})"
+
+
+class SyntheticTeam:
+    """Mimics the espn_api baseball Team attributes the analyzers read"""
+
+    def __init__(self, team_id, roster):
+        self.team_id = team_id
+        self.team_abbrev = f"T{team_id}"
+        self.team_name = f"Synthetic Team {team_id}"
+        self.owners = [{'id': f"{{OWNER-{team_id}}}", 'displayName': f"owner{team_id}",
+                        'firstName': 'Owner', 'lastName': str(team_id)}]
+        self.roster = roster
+        self.wins = self.losses = self.ties = 0
+        self.standing = team_id
+
+    def __repr__(self):
+        return f"Team({self.team_name})"
+
+
+class SyntheticSettings:
+    def __init__(self, name, team_count):
+        self.name = name
+        self.team_count = team_count
+        self.scoring_type = 'H2H_CATEGORY'
+
+
+class SyntheticLeague:
+    """Offline stand-in for espn_api.baseball.League with generated players
+
+    Free agents are served through a LocalFreeAgentTransport, optionally with
+    simulated per-request latency.
+    """
+
+    def __init__(self, teams=12, roster_size=26, free_agents=300, injured_reserve=1, seed=0, latency=0.0):
+        rng = random.Random(seed)
+        self.league_id = seed
+        self.year = 2025
+        self.current_week = 10
+        self.currentMatchupPeriod = 10
+        self.scoring_type = 'H2H_CATEGORY'
+        self.settings = SyntheticSettings(f"Synthetic League ({teams} teams, {free_agents} FA)", teams)
+        self.latency = latency
+
+        next_id = 1
+        self.teams = []
+        for team_id in range(1, teams + 1):
+            roster = []
+            for i in range(roster_size):
+                if i < len(LINEUP_SLOTS):
+                    slot = LINEUP_SLOTS[i]
+                elif i >= roster_size - injured_reserve:
+                    slot = 'IL'
+                else:
+                    slot = 'BE'
+                roster.append(SyntheticPlayer(next_id, rng, slot))
+                next_id += 1
+            self.teams.append(SyntheticTeam(team_id, roster))
+
+        self._free_agents = [SyntheticPlayer(next_id + i, rng) for i in range(free_agents)]
+
+    def free_agent_transport(self):
+        return LocalFreeAgentTransport(self._free_agents, latency=self.latency)
+
+    def free_agents(self, week=None, size=50, position=None, position_id=None):
+        players = self._free_agents
+        if position:
+            players = [p for p in players if p.position == position or position in p.eligibleSlots]
+        return players[:size]
+
+
+
+class GeneratedFreeAgentTransport:
+    """Free-agent pages generated on request from a seed, holding no players itself
+
+    Each player is derived from (seed, position in the pool), so any page is
+    reproducible and pools of any size can be streamed without first being
+    built in memory. Position filters are ignored.
+    """
+
+    def __init__(self, count, seed=0, first_id=1000000):
+        self.count = count
+        self.seed = seed
+        self.first_id = first_id
+        self.requests = 0
+
+    def fetch_page(self, offset, limit, position=None):
+        self.requests += 1
+        return [SyntheticPlayer(self.first_id + i, random.Random(self.seed * 1000003 + i))
+                for i in range(offset, min(offset + limit, self.count))]
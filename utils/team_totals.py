@@ -0,0 +1,193 @@
+import numpy as np
+from utils.scoring import RATE_VOLUME
+
+# Lineup slots that do not count toward a team's active players
+INACTIVE_SLOTS = ('BE', 'IL')
+
+# Volume sums below this are float residue from adding and removing players
+VOLUME_EPSILON = 1e-9
+
+
+class TeamTotals:
+    """Running per-team sums behind team aggregates and league averages
+
+    Each player is reduced once to a contribution vector: per category whether
+    the stat is present, its value and, for rate stats, value * volume and
+    volume (AB/PA/IP), plus the player and active-player counts. A team's sums
+    are the sum of its players' vectors, so an add, drop or trade is one
+    vector addition or subtraction per affected team and nothing is re-read
+    for the rest of the league. League averages are derived from the per-team
+    sums, at a cost of O(teams x categories) however big the rosters are.
+    `rate_volume` maps rate categories to their volume stat (a ScoringSpec's).
+    """
+
+    def __init__(self, categories, rate_volume=None):
+        self.categories = list(categories)
+        self.rate_volume = RATE_VOLUME if rate_volume is None else rate_volume
+        self._is_rate = np.array([cat in self.rate_volume for cat in self.categories], dtype=bool)
+        width = len(self.categories)
+        # Offsets of the blocks inside a contribution vector
+        self._present = slice(0, width)
+        self._value = slice(width, 2 * width)
+        self._weighted = slice(2 * width, 3 * width)
+        self._volume = slice(3 * width, 4 * width)
+        self._players = 4 * width
+        self.active_index = 4 * width + 1
+        self.size = 4 * width + 2
+        self._sums = {}     # team_id -> summed contribution vector
+        self._members = {}  # team_id -> {player_id: contribution vector}
+
+    def record_vector(self, record, registry):
+        """Contribution vector for a PlayerRecord, read straight off its stat array"""
+        stats = record.stats
+        values = np.array([stats[registry.index[cat]] for cat in self.categories])
+        volumes = np.array([stats[registry.index[self.rate_volume[cat]]] if cat in self.rate_volume else np.nan
+                            for cat in self.categories])
+        present = ~np.isnan(values)
+        values = np.where(present, values, 0.0)
+        has_volume = ~np.isnan(volumes)
+        vector = np.zeros(self.size)
+        vector[self._present] = present
+        vector[self._value] = values
+        vector[self._weighted] = np.where(has_volume, values * np.nan_to_num(volumes), 0.0)
+        vector[self._volume] = np.where(has_volume, volumes, 0.0)
+        vector[self._players] = 1.0
+        vector[self.active_index] = 0.0 if record.lineupSlot in INACTIVE_SLOTS else 1.0
+        return vector
+
+    def members(self, team_id):
+        """{player_id: contribution vector} for a team's players with stats"""
+        return dict(self._members.get(team_id, {}))
+
+    def add(self, team_id, player_id, vector):
+        """Add a player's contribution to a team"""
+        members = self._members.setdefault(team_id, {})
+        sums = self._sums.setdefault(team_id, np.zeros(self.size))
+        if player_id in members:
+            sums -= members[player_id]
+        members[player_id] = vector
+        sums += vector
+
+    def remove(self, team_id, player_id):
+        """Take a player's contribution off a team; returns the vector (None if absent)"""
+        members = self._members.get(team_id, {})
+        vector = members.pop(player_id, None)
+        if vector is not None:
+            if members:
+                self._sums[team_id] -= vector
+            else:
+                self._sums[team_id] = np.zeros(self.size)
+        return vector
+
+    def set_roster(self, team_id, vectors):
+        """Bring a team in line with {player_id: vector}, touching only changed players
+
+        Returns the number of players added, dropped or updated.
+        """
+        if team_id not in self._sums:
+            self._sums[team_id] = np.zeros(self.size)
+            self._members[team_id] = {}
+        members = self._members[team_id]
+        changed = 0
+        for player_id in [pid for pid in members if pid not in vectors]:
+            self.remove(team_id, player_id)
+            changed += 1
+        for player_id, vector in vectors.items():
+            current = members.get(player_id)
+            if current is None or not np.array_equal(current, vector):
+                self.add(team_id, player_id, vector)
+                changed += 1
+        return changed
+
+    def team_matrix(self, team_ids):
+        """Summed vectors for `team_ids` stacked as a (teams x size) array"""
+        return np.array([self._sums.get(team_id, np.zeros(self.size)) for team_id in team_ids]).reshape(
+            len(team_ids), self.size)
+
+    def table_vectors(self, table):
+        """Contribution vectors for every row of a player table, built column-wise"""
+        vectors = np.zeros((len(table), self.size))
+        for j, cat in enumerate(self.categories):
+            if cat not in table.columns:
+                continue
+            values = table[cat].to_numpy(dtype=float, na_value=np.nan)
+            vectors[:, self._present.start + j] = ~np.isnan(values)
+            vectors[:, self._value.start + j] = np.nan_to_num(values)
+            volume_stat = self.rate_volume.get(cat)
+            if volume_stat in table.columns:
+                volume = np.nan_to_num(table[volume_stat].to_numpy(dtype=float, na_value=np.nan))
+                vectors[:, self._weighted.start + j] = np.nan_to_num(values) * volume
+                vectors[:, self._volume.start + j] = volume
+        vectors[:, self._players] = 1.0
+        if 'lineupSlot' in table.columns:
+            vectors[:, self.active_index] = ~table['lineupSlot'].isin(INACTIVE_SLOTS).to_numpy()
+        else:
+            vectors[:, self.active_index] = 1.0
+        return vectors
+
+    def drop_team(self, team_id):
+        self._sums.pop(team_id, None)
+        self._members.pop(team_id, None)
+
+    def team_averages(self, team_id):
+        """{category: sum of present values / players}, only for categories the team has"""
+        sums = self._sums.get(team_id)
+        if sums is None or sums[self._players] <= 0:
+            return {}
+        present = sums[self._present]
+        values = sums[self._value]
+        return {cat: values[j] / sums[self._players]
+                for j, cat in enumerate(self.categories) if present[j] > 0}
+
+    def league_averages(self, team_ids=None):
+        """League average of each team's average per player with stats
+
+        Same definition as data_helpers.average_team_stats: teams without a
+        value in a category are left out of that category's mean.
+        """
+        averages = [self.team_averages(team_id) for team_id in (team_ids if team_ids is not None else self._sums)]
+        league_avgs = {}
+        for cat in self.categories:
+            team_avgs = [avgs[cat] for avgs in averages if cat in avgs]
+            league_avgs[cat] = sum(team_avgs) / len(team_avgs) if team_avgs else 0
+        return league_avgs
+
+    def summarize(self, sums):
+        """Per-category averages from summed vectors of any leading shape (..., size)
+
+        Returns (team_avgs, active_avgs, players, active): team_avgs is each
+        category's value per player with stats (NaN when the team has no value
+        in it), active_avgs the analyze_team figure, i.e. the AB/PA/IP-weighted
+        rate (the plain mean without volume) or the counting total per active
+        player.
+        """
+        sums = np.asarray(sums, dtype=float)
+        players = sums[..., self._players]
+        active = sums[..., self.active_index]
+        present = sums[..., self._present]
+        values = sums[..., self._value]
+        weighted = sums[..., self._weighted]
+        volume = sums[..., self._volume]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            per_player = values / players[..., None]
+            team_avgs = np.where((present > 0) & (players[..., None] > 0), per_player, np.nan)
+            rate = np.where(volume > VOLUME_EPSILON, weighted / volume,
+                            np.where(players[..., None] > 0, per_player, 0.0))
+            counting = np.where(active[..., None] > 0, values / active[..., None], 0.0)
+        active_avgs = np.where(self._is_rate, rate, counting)
+        return team_avgs, active_avgs, players, active
+
+    def team_aggregates(self, team_id):
+        """Team totals and per-active-player averages, as analyze_team reports them
+
+        Rate stats are AB/PA/IP-weighted over the whole roster (the plain mean
+        when there is no volume); counting stats are totalled and divided by
+        the active players. Returns (team_totals, team_active_avgs,
+        total_players, active_players).
+        """
+        sums = self._sums.get(team_id, np.zeros(self.size))
+        _, active_avgs, players, active = self.summarize(sums)
+        team_totals = {cat: float(sums[self._value.start + j])
+                       for j, cat in enumerate(self.categories) if not self._is_rate[j]}
+        team_active_avgs = {cat: float(active_avgs[j]) for j, cat in enumerate(self.categories)}
+        return team_totals, team_active_avgs, int(players), int(active)